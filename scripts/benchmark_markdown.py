@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Markdown Conversion Benchmark
+Compares the legacy regex-chain HTML converter with the Markdown IR
+tokenizer on every policy in the library
+
+The legacy converter is the one HtmlExporter and PdfExporter each ran
+before the IR: six header substitutions, bold, italic and code passes over
+the whole document, then a line loop for lists and paragraphs.  The IR is
+parsed once per policy and rendered per format, so the "HTML + PDF" rows
+show what a multi-format export pays for conversion.
+
+Usage:
+    python scripts/benchmark_markdown.py --repeat 10
+"""
+
+import argparse
+import gc
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+script_dir = Path(__file__).parent
+project_dir = script_dir.parent
+sys.path.insert(0, str(project_dir / 'src'))
+
+from generation.markdown_ir import blocks_to_html, parse_markdown
+from generation.package_builder import ClientConfig, PackageBuilder
+
+
+def legacy_markdown_to_html(content: str) -> str:
+    """HtmlExporter._markdown_to_html as it was before the IR"""
+    html = content
+
+    # Headers
+    html = re.sub(r'^###### (.+)$', r'<h6>\1</h6>', html, flags=re.MULTILINE)
+    html = re.sub(r'^##### (.+)$', r'<h5>\1</h5>', html, flags=re.MULTILINE)
+    html = re.sub(r'^#### (.+)$', r'<h4>\1</h4>', html, flags=re.MULTILINE)
+    html = re.sub(r'^### (.+)$', r'<h3>\1</h3>', html, flags=re.MULTILINE)
+    html = re.sub(r'^## (.+)$', r'<h2>\1</h2>', html, flags=re.MULTILINE)
+    html = re.sub(r'^# (.+)$', r'<h1>\1</h1>', html, flags=re.MULTILINE)
+
+    # Bold and italic
+    html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html)
+    html = re.sub(r'\*(.+?)\*', r'<em>\1</em>', html)
+
+    # Code
+    html = re.sub(r'`(.+?)`', r'<code>\1</code>', html)
+
+    # Lists
+    lines = html.split('\n')
+    in_list = False
+    result = []
+    for line in lines:
+        if line.strip().startswith('- ') or line.strip().startswith('* '):
+            if not in_list:
+                result.append('<ul>')
+                in_list = True
+            item = re.sub(r'^[\s]*[-*]\s+', '', line)
+            result.append(f'<li>{item}</li>')
+        else:
+            if in_list:
+                result.append('</ul>')
+                in_list = False
+            if line.strip():
+                if not line.startswith('<h') and not line.startswith('<'):
+                    result.append(f'<p>{line}</p>')
+                else:
+                    result.append(line)
+    if in_list:
+        result.append('</ul>')
+
+    return '\n'.join(result)
+
+
+def ir_to_html(content: str) -> str:
+    return blocks_to_html(parse_markdown(content))
+
+
+def legacy_html_and_pdf(content: str):
+    # Each exporter converted the Markdown itself
+    return legacy_markdown_to_html(content), legacy_markdown_to_html(content)
+
+
+def ir_html_and_pdf(content: str):
+    blocks = parse_markdown(content)
+    return blocks_to_html(blocks), blocks_to_html(blocks)
+
+
+def best_time(convert, documents, repeat: int) -> float:
+    """Fastest of `repeat` passes over all documents, in seconds (GC paused, as timeit does)"""
+    best = float('inf')
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for content in documents:
+                convert(content)
+            best = min(best, time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='Timed passes per converter (best is kept)')
+    parser.add_argument('--policies-dir', default=str(project_dir / 'policies'))
+    args = parser.parse_args()
+
+    builder = PackageBuilder(args.policies_dir)
+    result = builder.build_package(ClientConfig(name="Benchmark Corp"), include_all=True)
+    documents = [policy.content for policy in result.policies]
+    size = sum(len(content.encode('utf-8')) for content in documents)
+
+    print(f"Corpus: {len(documents)} rendered policies, {size / 1024 / 1024:.2f} MB")
+    print()
+    print(f"{'Converter':<28}{'Time':>10}{'Policies/s':>14}{'MB/s':>10}")
+    print("-" * 62)
+    rows = [
+        ("HTML, legacy regex chain", legacy_markdown_to_html),
+        ("HTML, IR parse + render", ir_to_html),
+        ("IR parse only", parse_markdown),
+        ("HTML + PDF, legacy", legacy_html_and_pdf),
+        ("HTML + PDF, shared IR", ir_html_and_pdf),
+    ]
+    times = {}
+    for label, convert in rows:
+        elapsed = times[label] = best_time(convert, documents, args.repeat)
+        print(f"{label:<28}{elapsed * 1000:>8.1f}ms{len(documents) / elapsed:>14,.0f}"
+              f"{size / 1024 / 1024 / elapsed:>10.1f}")
+    print()
+    print(f"HTML speedup:        {times[rows[0][0]] / times[rows[1][0]]:.2f}x")
+    print(f"HTML + PDF speedup:  {times[rows[3][0]] / times[rows[4][0]]:.2f}x")
+
+    # Linear time: doubling the input should double the parse time
+    print()
+    print("IR parse time vs input size (whole corpus as one document):")
+    corpus = '\n\n'.join(documents)
+    base = None
+    for factor in (1, 2, 4):
+        elapsed = best_time(parse_markdown, [corpus * factor], args.repeat)
+        base = base or elapsed
+        print(f"  x{factor}: {elapsed * 1000:8.1f}ms  ({elapsed / base:.2f}x)")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
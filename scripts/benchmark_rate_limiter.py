@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Benchmark
+Checks per second under thread contention, and memory per client, for the
+legacy sliding-window limiter and the GCRA limiter with each state backend
+
+The legacy limiter is the one RateLimiter used before GCRA: every request
+timestamp kept in per-minute and per-hour lists, both lists rebuilt on
+every check, all under one global lock.  Each run starts `threads` threads
+that check as fast as they can for `--seconds`; "spread" gives every
+thread its own clients, "hot" sends every thread at one client.  The
+SQLite backend pays a write transaction per check in exchange for one
+limit shared by every worker process; memory per client is only measured
+for the in-process limiters.
+
+Usage:
+    python scripts/benchmark_rate_limiter.py --threads 1 4 16 --seconds 2
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+
+# Add src to path
+script_dir = Path(__file__).parent
+project_dir = script_dir.parent
+sys.path.insert(0, str(project_dir / 'src'))
+
+from web.rate_limiter import RateLimiter, RateLimitConfig
+
+# High enough that nothing is blocked; the benchmark measures bookkeeping
+CONFIG = dict(requests_per_minute=10 ** 9, requests_per_hour=10 ** 9, burst_size=20)
+
+
+@dataclass
+class LegacyEntry:
+    minute_requests: list = field(default_factory=list)
+    hour_requests: list = field(default_factory=list)
+    blocked_until: float = 0
+
+
+class LegacyRateLimiter:
+    """RateLimiter.check_rate_limit as it was before GCRA (headers and blocking omitted)"""
+
+    def __init__(self, config: RateLimitConfig):
+        self.config = config
+        self._entries = defaultdict(LegacyEntry)
+        self._lock = Lock()
+
+    def check_rate_limit(self, client_id: str, cost: int = 1):
+        now = time.time()
+        with self._lock:
+            entry = self._entries[client_id]
+            minute_ago = now - 60
+            hour_ago = now - 3600
+            entry.minute_requests = [t for t in entry.minute_requests if t > minute_ago]
+            entry.hour_requests = [t for t in entry.hour_requests if t > hour_ago]
+
+            minute_count = len(entry.minute_requests) + cost - 1
+            hour_count = len(entry.hour_requests) + cost - 1
+            allowed = (minute_count < self.config.burst_size or
+                       (minute_count < self.config.requests_per_minute and
+                        hour_count < self.config.requests_per_hour))
+            if allowed:
+                entry.minute_requests.extend([now] * cost)
+                entry.hour_requests.extend([now] * cost)
+            return allowed, {}
+
+
+def run(limiter, threads: int, seconds: float, hot: bool, clients_per_thread: int = 50) -> float:
+    """Checks per second across all threads"""
+    stop = threading.Event()
+    counts = [0] * threads
+    start = threading.Barrier(threads + 1)
+
+    def worker(index):
+        clients = ["hot"] if hot else [f"ip:10.{index}.0.{i}" for i in range(clients_per_thread)]
+        check = limiter.check_rate_limit
+        done = 0
+        start.wait()
+        while not stop.is_set():
+            for client in clients:
+                check(client)
+            done += len(clients)
+        counts[index] = done
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    time.sleep(seconds)
+    stop.set()
+    for thread in pool:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - started)
+
+
+def bytes_per_client(make_limiter, requests: int, clients: int = 100) -> float:
+    """Memory held per client after each client made `requests` requests"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    limiter = make_limiter()
+    for i in range(clients):
+        for _ in range(requests):
+            limiter.check_rate_limit(f"ip:10.0.{i // 256}.{i % 256}")
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return total / clients
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--seconds', type=float, default=2.0, help='Duration of each run')
+    args = parser.parse_args()
+
+    # Switch threads often, so the locks are actually contended
+    sys.setswitchinterval(0.0005)
+
+    state_dir = tempfile.TemporaryDirectory()
+    sqlite_config = RateLimitConfig(**CONFIG, backend='sqlite',
+                                    state_path=str(Path(state_dir.name) / 'rate_limits.db'))
+
+    limiters = [
+        ("legacy, global lock", lambda: LegacyRateLimiter(RateLimitConfig(**CONFIG))),
+        ("GCRA, striped locks", lambda: RateLimiter(RateLimitConfig(**CONFIG))),
+    ]
+    shared = [("GCRA, SQLite shared", lambda: RateLimiter(sqlite_config))]
+
+    print(f"{'Limiter':<22}{'Load':<8}{'Threads':>8}{'Checks/s':>14}")
+    print("-" * 52)
+    for hot in (False, True):
+        for threads in args.threads:
+            for label, make_limiter in limiters + shared:
+                rate = run(make_limiter(), threads, args.seconds, hot)
+                print(f"{label:<22}{'hot' if hot else 'spread':<8}{threads:>8}{rate:>14,.0f}")
+        print()
+    state_dir.cleanup()
+
+    print("Memory per client:")
+    for requests in (10, 100, 1000):
+        row = ", ".join(f"{label.split(',')[0]} {bytes_per_client(make_limiter, requests):,.0f} B"
+                        for label, make_limiter in limiters)
+        print(f"  after {requests:>4} requests: {row}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
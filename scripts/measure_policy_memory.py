@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Policy Memory Footprint Comparison
+Measures the memory held by policy records in the legacy dict layout
+versus the slots-based PolicyRecord with interned identifiers
+
+Each copy of the library stands in for one client's overlay, so the
+strings are parsed independently per copy just as they would be when
+loading overlays from separate files.
+
+Usage:
+    python scripts/measure_policy_memory.py --copies 100
+"""
+
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+
+# Add src to path
+script_dir = Path(__file__).parent
+project_dir = script_dir.parent
+sys.path.insert(0, str(project_dir / 'src'))
+
+from core.library_snapshot import (
+    PolicyRecord, get_library_snapshot, intern_frontmatter, split_frontmatter
+)
+
+
+def legacy_record(path: Path, content: str) -> dict:
+    """Policy dict as PackageBuilder.load_policy used to build it"""
+    frontmatter, start, end, _ = split_frontmatter(content)
+    return {
+        'path': str(path),
+        'frontmatter': frontmatter,
+        'body': content[start:end],
+        'id': frontmatter.get('id', path.stem),
+        'title': frontmatter.get('title', ''),
+        'category': frontmatter.get('category', ''),
+        'frameworks': frontmatter.get('frameworks', {}),
+        'variables': frontmatter.get('variables', []),
+        'requires_customization': frontmatter.get('requires_customization', [])
+    }
+
+
+def legacy_index(path: Path, content: str) -> dict:
+    """Legacy dict without the body, to isolate the record layout itself"""
+    record = legacy_record(path, content)
+    del record['body']
+    return record
+
+
+def slots_record(path: Path, content: str) -> PolicyRecord:
+    """Slots-based record with interned identifiers and a lazy body"""
+    frontmatter, start, end, _ = split_frontmatter(content)
+    return PolicyRecord(str(path), intern_frontmatter(frontmatter),
+                        body_loader=lambda: path.read_text(encoding='utf-8')[start:end])
+
+
+def measure(build, sources, copies: int) -> int:
+    """Bytes still allocated after building `copies` copies of the library"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    records = [build(path, content) for _ in range(copies) for path, content in sources]
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del records
+    return used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--copies', type=int, default=20,
+                        help='Number of library copies (client overlays) to hold')
+    parser.add_argument('--policies-dir', default=str(project_dir / 'policies'))
+    args = parser.parse_args()
+
+    snapshot = get_library_snapshot(args.policies_dir)
+    sources = []
+    for entry in snapshot.valid_entries():
+        path = snapshot.absolute_path(entry)
+        sources.append((path, path.read_text(encoding='utf-8')))
+
+    count = len(sources) * args.copies
+    legacy = measure(legacy_record, sources, args.copies)
+    index = measure(legacy_index, sources, args.copies)
+    slots = measure(slots_record, sources, args.copies)
+
+    print(f"Records: {count} ({len(sources)} policies x {args.copies} copies)")
+    print()
+    print(f"{'Layout':<34}{'Total':>12}{'Per record':>14}")
+    print("-" * 60)
+    layouts = [
+        ("dict + eager body", legacy),
+        ("dict, body excluded", index),
+        ("PolicyRecord (slots, interned)", slots),
+    ]
+    for label, used in layouts:
+        print(f"{label:<34}{used / 1024 / 1024:>10.1f}MB{used / count:>12,.0f} B")
+    print()
+    print(f"Reduction vs dict + body:  {(1 - slots / legacy) * 100:.1f}%")
+    print(f"Reduction vs dict index:   {(1 - slots / index) * 100:.1f}%")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
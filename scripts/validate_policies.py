@@ -6,7 +6,6 @@ Validates converted Markdown + YAML policies
 
 import os
 import sys
-import yaml
 from pathlib import Path
 
 # Add src to path
@@ -14,53 +13,48 @@ script_dir = Path(__file__).parent
 project_dir = script_dir.parent
 sys.path.insert(0, str(project_dir / 'src'))
 
+from core.library_snapshot import get_library_snapshot
 
-def validate_frontmatter(content: str) -> tuple:
-    """Validate YAML frontmatter"""
-    if not content.startswith('---'):
-        return False, "Missing YAML frontmatter delimiter"
+REQUIRED_FIELDS = ['id', 'title', 'category', 'type', 'status']
 
-    try:
-        # Find end of frontmatter
-        end_idx = content.find('---', 3)
-        if end_idx == -1:
-            return False, "Missing closing YAML frontmatter delimiter"
 
-        yaml_content = content[3:end_idx].strip()
-        metadata = yaml.safe_load(yaml_content)
+def validate_content(content: str) -> list:
+    """Validate policy content structure"""
+    # Check for markdown content after frontmatter
+    end_idx = content.find('---', 3)
+    if end_idx == -1:
+        return []
+    return validate_body(content[end_idx + 3:].strip())
 
-        # Check required fields
-        required = ['id', 'title', 'category', 'type', 'status']
-        missing = [f for f in required if f not in metadata]
-        if missing:
-            return False, f"Missing required fields: {missing}"
 
-        return True, metadata
+def validate_body(body: str) -> list:
+    """Validate a stripped policy body"""
+    issues = []
 
-    except yaml.YAMLError as e:
-        return False, f"YAML parse error: {e}"
+    if not body:
+        issues.append("Empty policy body")
+    else:
+        # Check for section headings
+        if '##' not in body and '# ' not in body:
+            issues.append("No section headings found")
 
+        # Check approximate length
+        if len(body) < 200:
+            issues.append(f"Policy body very short ({len(body)} chars)")
 
-def validate_content(content: str) -> dict:
-    """Validate policy content structure"""
-    issues = []
+    return issues
 
-    # Check for markdown content after frontmatter
-    end_idx = content.find('---', 3)
-    if end_idx != -1:
-        body = content[end_idx + 3:].strip()
-        if not body:
-            issues.append("Empty policy body")
-        else:
-            # Check for section headings
-            if '##' not in body and '# ' not in body:
-                issues.append("No section headings found")
 
-            # Check approximate length
-            if len(body) < 200:
-                issues.append(f"Policy body very short ({len(body)} chars)")
+def validate_entry(entry) -> tuple:
+    """Validate the frontmatter of a compiled snapshot entry"""
+    if entry.error:
+        return False, entry.error
 
-    return issues
+    missing = [f for f in REQUIRED_FIELDS if f not in entry.frontmatter]
+    if missing:
+        return False, f"Missing required fields: {missing}"
+
+    return True, entry.frontmatter
 
 
 def main():
@@ -79,48 +73,46 @@ def main():
     all_ids = []
     all_references = []
 
-    for category_dir in sorted(policies_dir.iterdir()):
-        if not category_dir.is_dir():
+    # All frontmatter comes from the compiled library snapshot, which only
+    # re-parses files that changed since the last run
+    snapshot = get_library_snapshot(str(policies_dir))
+
+    for entry in snapshot.all_entries():
+        if '/' not in entry.path:
+            continue
+
+        category_name, policy_name = entry.path.split('/', 1)
+        if '/' in policy_name:
             continue
 
-        category_name = category_dir.name
-        category_stats[category_name] = {'total': 0, 'valid': 0, 'errors': []}
-
-        for policy_file in sorted(category_dir.glob('*.md')):
-            total += 1
-            category_stats[category_name]['total'] += 1
-
-            with open(policy_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # Validate frontmatter
-            fm_valid, fm_result = validate_frontmatter(content)
-
-            if not fm_valid:
-                errors += 1
-                category_stats[category_name]['errors'].append(
-                    f"{policy_file.name}: {fm_result}"
-                )
-                continue
-
-            metadata = fm_result
-            all_ids.append(metadata['id'])
-
-            # Track references
-            if metadata.get('references'):
-                all_references.extend(metadata['references'])
-
-            # Validate content
-            content_issues = validate_content(content)
-            if content_issues:
-                warnings += 1
-                for issue in content_issues:
-                    category_stats[category_name]['errors'].append(
-                        f"{policy_file.name}: WARNING - {issue}"
-                    )
-            else:
-                valid += 1
-                category_stats[category_name]['valid'] += 1
+        stats = category_stats.setdefault(category_name, {'total': 0, 'valid': 0, 'errors': []})
+        total += 1
+        stats['total'] += 1
+
+        # Validate frontmatter
+        fm_valid, fm_result = validate_entry(entry)
+
+        if not fm_valid:
+            errors += 1
+            stats['errors'].append(f"{policy_name}: {fm_result}")
+            continue
+
+        metadata = fm_result
+        all_ids.append(metadata['id'])
+
+        # Track references
+        if metadata.get('references'):
+            all_references.extend(metadata['references'])
+
+        # Validate content
+        content_issues = validate_body(snapshot.read_body(entry))
+        if content_issues:
+            warnings += 1
+            for issue in content_issues:
+                stats['errors'].append(f"{policy_name}: WARNING - {issue}")
+        else:
+            valid += 1
+            stats['valid'] += 1
 
     # Summary
     print()
@@ -180,15 +172,9 @@ def main():
 
     # Check what variables were detected
     all_vars = set()
-    for category_dir in policies_dir.iterdir():
-        if not category_dir.is_dir():
-            continue
-        for policy_file in category_dir.glob('*.md'):
-            with open(policy_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            fm_valid, fm_result = validate_frontmatter(content)
-            if fm_valid and fm_result.get('variables'):
-                all_vars.update(fm_result['variables'])
+    for entry in snapshot.valid_entries():
+        if entry.frontmatter.get('variables'):
+            all_vars.update(entry.frontmatter['variables'])
 
     print(f"  Variables detected: {sorted(all_vars)}")
 
@@ -295,33 +295,9 @@ class ChangeDetector:
         if not self.policies_dir.exists():
             return
 
-        import yaml
+        from core.policy_library import get_policy_library
 
-        for policy_file in self.policies_dir.rglob("*.md"):
-            try:
-                content = policy_file.read_text(encoding="utf-8")
-                if "---" not in content:
-                    continue
-
-                # Extract YAML frontmatter
-                parts = content.split("---", 2)
-                if len(parts) < 3:
-                    continue
-
-                frontmatter = yaml.safe_load(parts[1])
-                if not frontmatter:
-                    continue
-
-                policy_id = frontmatter.get("id", policy_file.stem)
-                frameworks = frontmatter.get("frameworks", {})
-
-                for fw_id in frameworks.keys():
-                    if fw_id not in self._policy_framework_map:
-                        self._policy_framework_map[fw_id] = []
-                    self._policy_framework_map[fw_id].append(policy_id)
-
-            except Exception:
-                continue
+        self._policy_framework_map = get_policy_library(str(self.policies_dir)).get_framework_map()
 
     def _determine_impact_type(self, change_type: str) -> str:
         """Determine impact type from change type"""
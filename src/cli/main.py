@@ -42,40 +42,64 @@ def get_output_dir():
 
 
 # Initialize lazy-loaded modules
-_compliance_mapper = None
-_gap_analyzer = None
 _package_builder = None
 
 
+def get_policy_library():
+    from core.policy_library import get_policy_library as shared_library
+    return shared_library(str(get_policies_dir()), str(get_frameworks_dir()))
+
+
 def get_compliance_mapper():
-    global _compliance_mapper
-    if _compliance_mapper is None:
-        from core.compliance_mapper import ComplianceMapper
-        _compliance_mapper = ComplianceMapper()
-        _compliance_mapper.load_all_frameworks(str(get_frameworks_dir()))
-    return _compliance_mapper
+    return get_policy_library().compliance_mapper
 
 
 def get_gap_analyzer():
-    global _gap_analyzer
-    if _gap_analyzer is None:
-        from core.gap_analyzer import GapAnalyzer
-        _gap_analyzer = GapAnalyzer(compliance_mapper=get_compliance_mapper())
-        _gap_analyzer.load_policy_library_from_dir(str(get_policies_dir()))
-    return _gap_analyzer
+    return get_policy_library().get_gap_analyzer()
 
 
 def get_package_builder():
     global _package_builder
     if _package_builder is None:
         from generation.package_builder import PackageBuilder
-        _package_builder = PackageBuilder(
-            str(get_policies_dir()),
-            str(get_frameworks_dir())
-        )
+        _package_builder = PackageBuilder(library=get_policy_library())
     return _package_builder
 
 
+# Written into Markdown packages; records the values set-var --regenerate reuses
+PACKAGE_MANIFEST = "00_PACKAGE.json"
+
+
+def write_package_manifest(md_dir: Path, result) -> Path:
+    """Record a Markdown package's client and generated dates in its directory"""
+    from generation.package_builder import dated_variables
+
+    manifest_file = md_dir / PACKAGE_MANIFEST
+    manifest_file.write_text(json.dumps({
+        "client": result.client_name,
+        "generated_at": result.generated_at.isoformat(),
+        "variables": dated_variables(result.variables_applied)
+    }, indent=2), encoding="utf-8")
+    return manifest_file
+
+
+def read_package_variables(md_dir: Path) -> dict:
+    """Variables recorded in a Markdown package's manifest ({} if it has none)"""
+    try:
+        manifest = json.loads((md_dir / PACKAGE_MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return manifest.get("variables", {})
+
+
+def write_markdown_policy(md_dir: Path, policy) -> Path:
+    """Write one rendered policy into a Markdown package directory"""
+    safe_id = policy.id.replace("/", "_")
+    policy_file = md_dir / f"{policy.category}_{safe_id}.md"
+    policy_file.write_text(f"# {policy.title}\n\n{policy.content}", encoding="utf-8")
+    return policy_file
+
+
 if CLICK_AVAILABLE:
     @click.group()
     @click.version_option(version="1.0.0", prog_name="policy-grc")
@@ -409,10 +433,8 @@ if CLICK_AVAILABLE:
 
             # Write each policy
             for policy in result.policies:
-                safe_id = policy.id.replace("/", "_")
-                policy_file = md_dir / f"{policy.category}_{safe_id}.md"
-                content = f"# {policy.title}\n\n{policy.content}"
-                policy_file.write_text(content, encoding="utf-8")
+                write_markdown_policy(md_dir, policy)
+            write_package_manifest(md_dir, result)
 
             click.echo(f"[OK] Markdown exported: {md_dir}")
 
@@ -571,8 +593,18 @@ if CLICK_AVAILABLE:
     @click.argument("client_id")
     @click.argument("variable")
     @click.argument("value")
-    def clients_set_var(client_id, variable, value):
-        """Set a variable for a client"""
+    @click.option("--regenerate", "-r", type=click.Path(exists=True, file_okay=False),
+                  help="Markdown package directory to update with the affected policies")
+    @click.option("--all-policies", is_flag=True, help="Package includes all policies regardless of framework")
+    def clients_set_var(client_id, variable, value, regenerate, all_policies):
+        """Set a variable for a client
+
+        With --regenerate, only the policies that use the variable are
+        re-rendered and rewritten in an existing Markdown package:
+            policy-grc clients set-var acme CSO_TITLE "CISO" --regenerate ./output/acme_policies_20250101
+        """
+        from generation.bulk_runner import client_config
+
         manager = get_client_manager()
         client = manager.get_client(client_id) or manager.get_client_by_name(client_id)
 
@@ -580,12 +612,114 @@ if CLICK_AVAILABLE:
             click.echo(f"Error: Client not found: {client_id}")
             return
 
-        variables = client.variables.copy()
-        variables[variable] = value
-        manager.update_client(client.id, variables=variables)
-
+        client = manager.set_variable(client.id, variable, value)
         click.echo(f"[OK] Set {variable}={value} for {client.name}")
 
+        if regenerate:
+            builder = get_package_builder()
+            package_variables = read_package_variables(Path(regenerate))
+            if not package_variables:
+                click.echo(f"[WARN] {regenerate} has no {PACKAGE_MANIFEST}; "
+                           "regenerated policies use today's dates")
+            updated = builder.rebuild_policies(client_config(client), [variable],
+                                               include_all=all_policies,
+                                               base_variables=package_variables)
+            for policy in updated:
+                write_markdown_policy(Path(regenerate), policy)
+            click.echo(f"[OK] Regenerated {len(updated)} policies using {variable} in {regenerate}")
+
+    @clients.command("generate")
+    @click.argument("client_id")
+    @click.option("--frameworks", "-f", help="Comma-separated framework IDs (default: the client's targets)")
+    @click.option("--format", type=click.Choice(["docx", "pdf", "html", "md"]), default="docx")
+    @click.option("--output", "-o", type=click.Path(), help="Output directory")
+    @click.option("--all-policies", is_flag=True, help="Include all policies regardless of framework")
+    @click.option("--delta", is_flag=True,
+                  help="Export only policies whose output changed since the client's last generation")
+    def clients_generate(client_id, frameworks, format, output, all_policies, delta):
+        """Generate a client's package and record it in the client's history
+
+        Each generation records a content hash per policy. With --delta, only
+        added and changed policies are exported, together with a JSON change
+        manifest listing added, changed and removed policies:
+            policy-grc clients generate acme --delta
+        """
+        from generation.bulk_runner import EXPORT_FORMATS, client_config, load_exporter
+        from generation.package_builder import dated_variables
+
+        manager = get_client_manager()
+        client = manager.get_client(client_id) or manager.get_client_by_name(client_id)
+
+        if not client:
+            click.echo(f"Error: Client not found: {client_id}")
+            return
+
+        fw_list = [f.strip().lower() for f in frameworks.split(",")] if frameworks else None
+        config = client_config(client, fw_list)
+        builder = get_package_builder()
+
+        base = manager.get_latest_generation(client.id, hashed_only=True) if delta else None
+        if delta and base is None:
+            click.echo("[WARN] No earlier generation with policy hashes; exporting the full package")
+
+        if base:
+            result, changes = builder.build_delta(config, manager.get_generation_hashes(base.id),
+                                                  base_generation=base.id, include_all=all_policies,
+                                                  base_variables=manager.get_generation_variables(base.id))
+            hashes = changes.hashes
+            incomplete_count = changes.incomplete_count
+        else:
+            result = builder.build_package(config, include_all=all_policies)
+            changes = None
+            hashes = {policy.id: policy.content_hash for policy in result.policies}
+            incomplete_count = result.incomplete_count
+
+        output_dir = Path(output) if output else get_output_dir()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        safe_name = client.name.lower().replace(" ", "_")
+        base_name = f"{safe_name}_{'delta_' if changes else ''}{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        output_path = None
+
+        if changes:
+            summary = changes.to_dict()["summary"]
+            click.echo(f"\nChanges since generation {base.id} ({base.generated_at[:16]}):")
+            click.echo(f"  Added: {summary['added']}, Changed: {summary['changed']}, "
+                       f"Removed: {summary['removed']}, Unchanged: {summary['unchanged']}")
+
+            output_path = output_dir / f"{base_name}_changes.json"
+            output_path.write_text(json.dumps({
+                "client": client.name,
+                "generated_at": result.generated_at.isoformat(),
+                **changes.to_dict()
+            }, indent=2), encoding="utf-8")
+            click.echo(f"[OK] Change manifest: {output_path}")
+
+        if result.policies:
+            if format == "md":
+                output_path = output_dir / base_name
+                output_path.mkdir(exist_ok=True)
+                for policy in result.policies:
+                    write_markdown_policy(output_path, policy)
+                write_package_manifest(output_path, result)
+            else:
+                exporter = load_exporter(format)
+                if exporter is None:
+                    click.echo(f"Error: {format} export is not available (missing dependency)")
+                    return
+                output_path = output_dir / f"{base_name}.{EXPORT_FORMATS[format]}"
+                exporter.export_package(result, str(output_path))
+            click.echo(f"[OK] Exported {result.total_policies} policies: {output_path}")
+        elif changes:
+            click.echo("[OK] No policies changed; nothing to export")
+
+        # Counts describe the client's full package, even when only a delta was exported
+        generation = manager.record_generation(
+            client.id, len(hashes), config.frameworks, format,
+            str(output_path or ""), incomplete_count=incomplete_count,
+            policy_hashes=hashes, variables=dated_variables(result.variables_applied)
+        )
+        click.echo(f"[OK] Recorded generation {generation.id}")
+
     @clients.command("delete")
     @click.argument("client_id")
     @click.confirmation_option(prompt="Are you sure you want to delete this client?")
@@ -779,116 +913,187 @@ if CLICK_AVAILABLE:
         """Bulk operations for multiple clients/policies"""
         pass
 
+    def get_run_manifest():
+        from generation.run_manifest import RunManifest
+        db_path = PROJECT_ROOT / "data" / "bulk_runs.db"
+        return RunManifest(str(db_path))
+
+    def get_output_cache(output_dir):
+        """Output cache kept in a run's output directory"""
+        from core.config import get_config
+        from generation.output_cache import OutputCache
+        config = get_config()
+        return OutputCache(str(output_dir), str(config.get_output_cache_db_path()),
+                           max_bytes=config.output_cache_mb * 1024 * 1024)
+
     @bulk.command("generate")
     @click.option("--clients", "-c", help="Comma-separated client IDs or 'all'")
     @click.option("--frameworks", "-f", help="Comma-separated framework IDs")
     @click.option("--format", type=click.Choice(["docx", "pdf", "html", "all"]), default="docx")
     @click.option("--output", "-o", type=click.Path(), help="Output directory")
     @click.option("--parallel", "-p", is_flag=True, help="Process clients in parallel")
-    def bulk_generate(clients, frameworks, format, output, parallel):
+    @click.option("--workers", "-w", type=click.IntRange(min=1),
+                  help="Worker processes for --parallel (default: CPU count)")
+    @click.option("--timeout", type=click.FloatRange(min=0, min_open=True),
+                  help="Per-client timeout in seconds")
+    @click.option("--results", type=click.Path(dir_okay=False),
+                  help="Write a JSON results file")
+    @click.option("--resume", "resume_run", metavar="RUN_ID",
+                  help="Resume a run: skip completed clients, retry the rest")
+    @click.option("--no-cache", is_flag=True, help="Rebuild every package, ignoring the output cache")
+    def bulk_generate(clients, frameworks, format, output, parallel, workers, timeout, results, resume_run,
+                      no_cache):
         """Generate packages for multiple clients at once
 
         Examples:
             policy-grc bulk generate --clients all --frameworks soc2
             policy-grc bulk generate --clients client1,client2 --format pdf
+            policy-grc bulk generate --clients all --format all --parallel --workers 16 --timeout 600 --results run.json
+            policy-grc bulk generate --resume 1a2b3c4d
         """
-        from generation.package_builder import ClientConfig
+        from generation.bulk_runner import (
+            BulkJob, BulkRunner, client_config, default_workers, write_results
+        )
 
         manager = get_client_manager()
         builder = get_package_builder()
+        manifest = get_run_manifest()
 
-        # Get client list
-        if clients == "all":
-            client_list = manager.list_clients()
-        elif clients:
-            client_ids = [c.strip() for c in clients.split(",")]
-            client_list = [manager.get_client(cid) or manager.get_client_by_name(cid) for cid in client_ids]
-            client_list = [c for c in client_list if c is not None]
+        if resume_run:
+            # Everything but the worker settings comes from the recorded run
+            run = manifest.get_run(resume_run)
+            if not run:
+                click.echo(f"Error: Bulk run not found: {resume_run}")
+                return
+
+            remaining = run.remaining()
+            if not remaining:
+                click.echo(f"Run {run.id} is already complete")
+                return
+
+            client_list = []
+            base_names = {}
+            for entry in remaining:
+                client = manager.get_client(entry.client_id)
+                if client:
+                    client_list.append(client)
+                    base_names[client.id] = entry.base_name
+                else:
+                    from generation.bulk_runner import BulkResult
+                    manifest.record_result(run.id, BulkResult(
+                        entry.client_id, entry.client_name, "error", error="Client not found"))
+
+            fw_list = run.frameworks
+            formats = run.formats
+            output_dir = Path(run.output_dir)
         else:
-            click.echo("Error: Please specify --clients (comma-separated IDs or 'all')")
-            return
+            # Get client list
+            if clients == "all":
+                client_list = manager.list_clients()
+            elif clients:
+                client_ids = [c.strip() for c in clients.split(",")]
+                client_list = [manager.get_client(cid) or manager.get_client_by_name(cid) for cid in client_ids]
+                # One job per client, however many times it was named
+                client_list = list({c.id: c for c in client_list if c is not None}.values())
+            else:
+                click.echo("Error: Please specify --clients (comma-separated IDs or 'all')")
+                return
 
-        if not client_list:
-            click.echo("Error: No clients found")
-            return
+            if not client_list:
+                click.echo("Error: No clients found")
+                return
 
-        # Parse frameworks
-        fw_list = [f.strip().lower() for f in frameworks.split(",")] if frameworks else []
+            # Parse frameworks
+            fw_list = [f.strip().lower() for f in frameworks.split(",")] if frameworks else []
+            formats = ["docx", "pdf", "html"] if format == "all" else [format]
+
+            # Set output directory
+            output_dir = Path(output) if output else get_output_dir()
+
+            timestamp = datetime.now().strftime("%Y%m%d")
+            base_names = {client.id: f"{client.name.lower().replace(' ', '_')}_{timestamp}"
+                          for client in client_list}
+            run = manifest.create_run(client_list, fw_list, formats, str(output_dir), base_names)
 
-        # Set output directory
-        output_dir = Path(output) if output else get_output_dir()
         output_dir.mkdir(parents=True, exist_ok=True)
 
+        worker_count = (workers or default_workers()) if parallel else 1
+
         click.echo(f"\nBulk Generation")
         click.echo("=" * 60)
+        click.echo(f"Run: {run.id}{' (resumed)' if resume_run else ''}")
         click.echo(f"Clients: {len(client_list)}")
         click.echo(f"Frameworks: {', '.join(fw_list) if fw_list else 'All'}")
-        click.echo(f"Format: {format}")
+        click.echo(f"Format: {', '.join(formats)}")
         click.echo(f"Output: {output_dir}")
+        if parallel:
+            click.echo(f"Workers: {worker_count}")
         click.echo("-" * 60)
 
-        results = []
-        for i, client in enumerate(client_list, 1):
-            click.echo(f"\n[{i}/{len(client_list)}] Processing: {client.name}")
+        jobs = [
+            BulkJob(
+                client_id=client.id,
+                config=client_config(client, fw_list),
+                output_dir=str(output_dir),
+                formats=formats,
+                base_name=base_names[client.id]
+            )
+            for client in client_list
+        ]
 
-            try:
-                # Build config
-                variables = client.variables.copy()
-                variables.setdefault('ORGANIZATION_NAME', client.name)
-                variables.setdefault('CSO_TITLE', 'Chief Security Officer')
-
-                config = ClientConfig(
-                    name=client.name,
-                    variables=variables,
-                    frameworks=fw_list or client.target_frameworks
-                )
+        def report(result, progress):
+            manifest.record_result(run.id, result)
+            eta = f", ETA {progress.eta:.0f}s" if progress.eta is not None else ""
+            click.echo(f"[{progress.completed}/{progress.total}] {result.client}: ", nl=False)
+            if result.status == "success":
+                source = "cached" if result.cached else "exported"
+                click.echo(f"[OK] {result.total_policies} policies, "
+                           f"{source} {', '.join(result.formats) or 'nothing'} ({result.duration:.1f}s)")
+            else:
+                click.echo(f"[{result.status.upper()}] {result.error}")
+            click.echo(f"    ok {progress.succeeded}, errors {progress.failed}, "
+                       f"timeouts {progress.timed_out} | {progress.rate:.2f} clients/s{eta}")
 
-                result = builder.build_package(config)
-                click.echo(f"    Policies: {result.total_policies}, Incomplete: {result.incomplete_count}")
-
-                # Export
-                safe_name = client.name.lower().replace(" ", "_")
-                timestamp = datetime.now().strftime("%Y%m%d")
-
-                exported = []
-                if format in ["docx", "all"]:
-                    try:
-                        from generation.docx_exporter import DocxExporter
-                        exporter = DocxExporter()
-                        path = output_dir / f"{safe_name}_{timestamp}.docx"
-                        exporter.export_package(result, str(path))
-                        exported.append("docx")
-                    except ImportError:
-                        pass
-
-                if format in ["pdf", "all"]:
-                    try:
-                        from generation.pdf_exporter import PdfExporter
-                        exporter = PdfExporter()
-                        path = output_dir / f"{safe_name}_{timestamp}.pdf"
-                        exporter.export_package(result, str(path))
-                        exported.append("pdf")
-                    except ImportError:
-                        pass
-
-                if format in ["html", "all"]:
-                    from generation.html_exporter import HtmlExporter
-                    exporter = HtmlExporter()
-                    path = output_dir / f"{safe_name}_{timestamp}.html"
-                    exporter.export_package(result, str(path))
-                    exported.append("html")
-
-                results.append({"client": client.name, "status": "success", "formats": exported})
-                click.echo(f"    [OK] Exported: {', '.join(exported)}")
-
-            except Exception as e:
-                results.append({"client": client.name, "status": "error", "error": str(e)})
-                click.echo(f"    [ERROR] {e}")
+        cache = None if no_cache else get_output_cache(output_dir)
+        runner = BulkRunner(builder, workers=worker_count, timeout=timeout, cache=cache)
+        run_results = runner.run(jobs, on_result=report)
 
         # Summary
-        success = sum(1 for r in results if r["status"] == "success")
+        progress = runner.progress
         click.echo(f"\n{'=' * 60}")
-        click.echo(f"Completed: {success}/{len(results)} clients")
+        click.echo(f"Completed: {progress.succeeded}/{progress.total} clients "
+                   f"in {progress.elapsed:.1f}s")
+        if progress.failed or progress.timed_out:
+            click.echo(f"Errors: {progress.failed}, Timeouts: {progress.timed_out}")
+
+        if results:
+            write_results(results, run_results, progress, run_id=run.id,
+                          workers=worker_count, formats=formats, output_dir=str(output_dir))
+            click.echo(f"Results written to: {results}")
+
+        run = manifest.finish_run(run.id)
+        if run.status != "complete":
+            click.echo(f"\n{len(run.remaining())} clients still need generating. "
+                       f"Retry them with: policy-grc bulk generate --resume {run.id}")
+
+    @bulk.command("runs")
+    @click.option("--limit", "-n", default=10, help="Number of runs to show")
+    def bulk_runs(limit):
+        """List recent bulk generation runs"""
+        runs = get_run_manifest().list_runs(limit)
+
+        if not runs:
+            click.echo("\nNo bulk runs recorded yet")
+            return
+
+        click.echo(f"\nBulk Runs ({len(runs)})")
+        click.echo("=" * 60)
+        for run in runs:
+            counts = run.counts()
+            click.echo(f"\n  {run.id}: {run.status} ({run.created_at[:16]})")
+            click.echo(f"     Clients: {len(run.clients)}, Succeeded: {counts.get('success', 0)}, "
+                       f"Remaining: {len(run.remaining())}")
+            click.echo(f"     Formats: {', '.join(run.formats)}  Output: {run.output_dir}")
 
     @bulk.command("export-audit")
     @click.option("--output", "-o", type=click.Path(), required=True, help="Output JSON file")
@@ -9,6 +9,8 @@ from .gap_analyzer import GapAnalyzer
 from .reference_validator import ReferenceValidator
 from .incompleteness import IncompletenessDetector
 from .remediation import RemediationReporter
+from .library_snapshot import LibrarySnapshot, PolicyRecord, SnapshotDelta, get_library_snapshot
+from .policy_library import PolicyLibrary, get_policy_library
 from .config import (
     AppConfig,
     get_config,
@@ -27,6 +29,12 @@ __all__ = [
     'ReferenceValidator',
     'IncompletenessDetector',
     'RemediationReporter',
+    'LibrarySnapshot',
+    'PolicyRecord',
+    'SnapshotDelta',
+    'get_library_snapshot',
+    'PolicyLibrary',
+    'get_policy_library',
     'AppConfig',
     'get_config',
     'set_config',
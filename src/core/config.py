@@ -28,6 +28,10 @@ class WebConfig:
         'POLICYUPDATE_SECRET_KEY',
         secrets.token_hex(32)
     ))
+    # Threads running background jobs (async package generation)
+    job_workers: int = 2
+    # Where rate-limit state is kept: 'memory' (per process) or 'sqlite' (shared by all workers)
+    rate_limit_backend: str = "memory"
 
 
 @dataclass
@@ -52,6 +56,11 @@ class AppConfig:
     output_dir: str = "output"
     data_dir: str = "data"
 
+    # Size limit of the exported package cache in the output directory,
+    # and the SQLite index of its files
+    output_cache_mb: int = 1024
+    output_cache_db: str = "data/output_cache.db"
+
     # Sub-configs
     database: DatabaseConfig = field(default_factory=DatabaseConfig)
     web: WebConfig = field(default_factory=WebConfig)
@@ -76,6 +85,10 @@ class AppConfig:
         path.mkdir(exist_ok=True)
         return path
 
+    def get_output_cache_db_path(self) -> Path:
+        """Get absolute path to the output cache index"""
+        return self.project_root / self.output_cache_db
+
     def get_data_path(self) -> Path:
         """Get absolute path to data directory"""
         path = self.project_root / self.data_dir
@@ -164,6 +177,10 @@ def load_config_from_env() -> AppConfig:
         POLICYUPDATE_SECRET_KEY: Flask secret key
         POLICYUPDATE_LOG_LEVEL: Logging level (DEBUG, INFO, WARNING, ERROR)
         POLICYUPDATE_LOG_FILE: Path to log file
+        POLICYUPDATE_OUTPUT_CACHE_MB: Size limit of the exported package cache
+        POLICYUPDATE_OUTPUT_CACHE_DB: Path of the exported package cache index
+        POLICYUPDATE_JOB_WORKERS: Threads running background jobs
+        POLICYUPDATE_RATE_LIMIT_BACKEND: Rate-limit state backend (memory, sqlite)
         POLICYUPDATE_SMTP_HOST: SMTP server host
         POLICYUPDATE_SMTP_PORT: SMTP server port
         POLICYUPDATE_SMTP_USER: SMTP username
@@ -178,6 +195,10 @@ def load_config_from_env() -> AppConfig:
         config.web.secret_key = os.environ['POLICYUPDATE_SECRET_KEY']
     if os.environ.get('POLICYUPDATE_DEBUG'):
         config.web.debug = os.environ['POLICYUPDATE_DEBUG'].lower() == 'true'
+    if os.environ.get('POLICYUPDATE_JOB_WORKERS'):
+        config.web.job_workers = int(os.environ['POLICYUPDATE_JOB_WORKERS'])
+    if os.environ.get('POLICYUPDATE_RATE_LIMIT_BACKEND'):
+        config.web.rate_limit_backend = os.environ['POLICYUPDATE_RATE_LIMIT_BACKEND'].lower()
 
     # Logging config
     if os.environ.get('POLICYUPDATE_LOG_LEVEL'):
@@ -185,6 +206,11 @@ def load_config_from_env() -> AppConfig:
     if os.environ.get('POLICYUPDATE_LOG_FILE'):
         config.log_file = os.environ['POLICYUPDATE_LOG_FILE']
 
+    if os.environ.get('POLICYUPDATE_OUTPUT_CACHE_MB'):
+        config.output_cache_mb = int(os.environ['POLICYUPDATE_OUTPUT_CACHE_MB'])
+    if os.environ.get('POLICYUPDATE_OUTPUT_CACHE_DB'):
+        config.output_cache_db = os.environ['POLICYUPDATE_OUTPUT_CACHE_DB']
+
     # Notification config
     if os.environ.get('POLICYUPDATE_SMTP_HOST'):
         config.notification.smtp_host = os.environ['POLICYUPDATE_SMTP_HOST']
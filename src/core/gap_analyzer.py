@@ -6,7 +6,8 @@ Identifies missing policies for compliance frameworks
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Set, Optional, Any
-import yaml
+
+from core.library_snapshot import get_library_snapshot
 
 
 @dataclass
@@ -100,35 +101,14 @@ class GapAnalyzer:
         if not policies_path.exists():
             raise FileNotFoundError(f"Policies directory not found: {policies_dir}")
 
-        policy_ids = set()
-        for md_file in policies_path.rglob("*.md"):
-            # Extract policy ID from frontmatter or filename
-            policy_id = self._extract_policy_id(md_file)
-            if policy_id:
-                policy_ids.add(policy_id)
+        # IDs come from the compiled library snapshot (frontmatter id, or
+        # filename for files without usable frontmatter)
+        snapshot = get_library_snapshot(str(policies_path))
+        policy_ids = set(snapshot.get_policy_ids())
 
         self.library = policy_ids
         return policy_ids
 
-    def _extract_policy_id(self, filepath: Path) -> Optional[str]:
-        """Extract policy ID from file"""
-        try:
-            content = filepath.read_text(encoding='utf-8')
-
-            # Try to extract from YAML frontmatter
-            if content.startswith('---'):
-                parts = content.split('---', 2)
-                if len(parts) >= 3:
-                    frontmatter = yaml.safe_load(parts[1])
-                    if frontmatter and 'id' in frontmatter:
-                        return frontmatter['id']
-
-            # Fall back to filename
-            return filepath.stem
-
-        except Exception:
-            return filepath.stem
-
     def analyze_framework(self, framework_id: str) -> GapReport:
         """
         Analyze gaps for a specific framework
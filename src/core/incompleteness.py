@@ -3,11 +3,71 @@ Incompleteness Detection Module
 Detects sections requiring customization for specific compliance requirements
 """
 
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 import re
 
 
+HEADING_PATTERN = re.compile(r'^(#{1,6}|[IVX]+\.|[A-Z]\.).*$', re.MULTILINE)
+
+_REGEX_METACHARACTERS = frozenset('.^$*+?{}[]\\|()')
+
+
+def markers_report(unreplaced: List[str], action_markers: List[str] = (),
+                   todo_markers: List[str] = ()) -> List[Dict[str, Any]]:
+    """Build incomplete-section entries from markers found in a policy"""
+    incomplete = []
+    if unreplaced:
+        incomplete.append({
+            'type': 'unreplaced_variables',
+            'variables': list(unreplaced),
+            'severity': 'high'
+        })
+    if action_markers:
+        incomplete.append({
+            'type': 'action_required',
+            'markers': list(action_markers),
+            'severity': 'high'
+        })
+    if todo_markers:
+        incomplete.append({
+            'type': 'todo',
+            'markers': list(todo_markers),
+            'severity': 'medium'
+        })
+    return incomplete
+
+
+class SectionIndex:
+    """
+    Heading offsets of a document, for bisect lookups of the section
+    containing a position instead of re-scanning the text before it.
+    """
+
+    __slots__ = ('content', 'ready', 'starts', 'ends')
+
+    def __init__(self, content: str):
+        self.content = content
+        # Offset from which each heading counts as "before" a position,
+        # i.e. once enough of its prefix is present to match
+        self.ready: List[int] = []
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        for match in HEADING_PATTERN.finditer(content):
+            prefix_end = match.start() + 1 if match.group(1)[0] == '#' else match.end(1)
+            self.ready.append(prefix_end)
+            self.starts.append(match.start())
+            self.ends.append(match.end())
+
+    def section_at(self, position: int) -> str:
+        """Heading line of the section containing a position"""
+        index = bisect_right(self.ready, position) - 1
+        if index < 0:
+            return "Unknown section"
+        return self.content[self.starts[index]:self.ends[index]][:50]
+
+
 @dataclass
 class IncompleteSection:
     """A section requiring customization"""
@@ -61,6 +121,11 @@ class IncompletenessDetector:
     def __init__(self):
         pass
 
+    # Patterns are matched case-sensitively against the lower-cased text,
+    # which is much faster than re.IGNORECASE over every policy body
+    _LOWERED = [(re.compile(pattern.lower()), priority)
+                for pattern, priority in INCOMPLETE_PATTERNS]
+
     def detect(self, policy_id: str, content: str,
                target_frameworks: List[str] = None) -> List[IncompleteSection]:
         """
@@ -75,15 +140,24 @@ class IncompletenessDetector:
             List of incomplete sections
         """
         incomplete = []
+        sections = SectionIndex(content)
+
+        lowered = content.lower()
+        if len(lowered) != len(content):
+            # Lower-casing changed offsets (rare non-ASCII text); match in place
+            patterns = [(re.compile(pattern, re.IGNORECASE), priority)
+                        for pattern, priority in self.INCOMPLETE_PATTERNS]
+            lowered = None
+        else:
+            patterns = self._LOWERED
 
         # Check generic patterns
-        for pattern, priority in self.INCOMPLETE_PATTERNS:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
+        for pattern, priority in patterns:
+            for match in pattern.finditer(lowered if lowered is not None else content):
                 incomplete.append(IncompleteSection(
                     policy_id=policy_id,
-                    section=self._find_section(content, match.start()),
-                    reason=f"Contains placeholder: {match.group()}",
+                    section=sections.section_at(match.start()),
+                    reason=f"Contains placeholder: {content[match.start():match.end()]}",
                     frameworks=[],
                     priority=priority
                 ))
@@ -93,10 +167,11 @@ class IncompletenessDetector:
             for framework in target_frameworks:
                 if framework in self.FRAMEWORK_REQUIREMENTS:
                     for req in self.FRAMEWORK_REQUIREMENTS[framework]:
-                        if re.search(req['pattern'], content, re.IGNORECASE):
+                        position = self._search(req['pattern'], content, lowered)
+                        if position >= 0:
                             incomplete.append(IncompleteSection(
                                 policy_id=policy_id,
-                                section=self._find_section_by_pattern(content, req['pattern']),
+                                section=sections.section_at(position),
                                 reason=f"{framework.upper()} requires: {req['required']}",
                                 frameworks=[framework],
                                 priority='high'
@@ -104,14 +179,18 @@ class IncompletenessDetector:
 
         return incomplete
 
+    @staticmethod
+    def _search(pattern: str, content: str, lowered: Optional[str]) -> int:
+        """Offset of the first case-insensitive match of a pattern, or -1"""
+        if lowered is not None and not _REGEX_METACHARACTERS.intersection(pattern):
+            # Plain phrase: a substring search is enough
+            return lowered.find(pattern.lower())
+        match = re.search(pattern, content, re.IGNORECASE)
+        return match.start() if match else -1
+
     def _find_section(self, content: str, position: int) -> str:
         """Find the section containing a position"""
-        # Look backwards for nearest heading
-        before = content[:position]
-        heading_match = re.findall(r'^(#{1,6}|[IVX]+\.|[A-Z]\.).*$', before, re.MULTILINE)
-        if heading_match:
-            return heading_match[-1][:50]
-        return "Unknown section"
+        return SectionIndex(content).section_at(position)
 
     def _find_section_by_pattern(self, content: str, pattern: str) -> str:
         """Find section containing a pattern"""
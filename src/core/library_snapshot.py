@@ -0,0 +1,521 @@
+"""
+Library Snapshot Module
+Compiled, on-disk snapshot of the Markdown policy library
+
+Parsing YAML frontmatter for every policy dominates cold start, and the
+package builder, gap analyzer, change detector and validation script all
+used to do it independently.  The snapshot parses each file once, stores
+the result in a single binary file keyed by a hash of the policies
+directory, and only re-parses files whose mtime or size changed.
+"""
+
+import hashlib
+import os
+import pickle
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from collections.abc import Mapping
+from typing import Callable, Dict, List, Optional, Any, Tuple
+
+import yaml
+
+from core.variable_engine import SubstitutionPlan
+
+
+# Bump when the entry layout changes so stale snapshot files are discarded
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_MAGIC = b"PUSNAP"
+
+TEMPLATE_VAR_PATTERN = re.compile(r'\{\{([A-Z_]+)\}\}')
+
+
+@dataclass
+class SnapshotEntry:
+    """Compiled metadata for a single policy file"""
+    path: str  # Path relative to the policies directory (POSIX separators)
+    mtime_ns: int
+    size: int
+    policy_id: str
+    frontmatter: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    # Byte offsets of the (stripped) body within the source file
+    body_start: int = 0
+    body_end: int = 0
+
+    # Derived indexes
+    variables: List[str] = field(default_factory=list)
+    references: List[str] = field(default_factory=list)
+    frameworks: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def is_valid(self) -> bool:
+        """True if the file has parseable frontmatter"""
+        return self.error is None and isinstance(self.frontmatter, dict)
+
+    @property
+    def body_length(self) -> int:
+        return self.body_end - self.body_start
+
+
+@dataclass
+class SnapshotDelta:
+    """Files that changed between two sweeps of the policies directory"""
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+    @property
+    def changed_paths(self) -> List[str]:
+        """Paths whose previously loaded content is no longer valid"""
+        return self.modified + self.removed
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _owned_privately(st: os.stat_result) -> bool:
+    """True if the file belongs to this user and no one else can write it"""
+    if not hasattr(os, 'getuid'):
+        return True
+    return st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+
+def intern_frontmatter(frontmatter: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Intern the identifiers that repeat across policies, in place.
+
+    Category, type, status, framework IDs, control IDs and variable names
+    are shared by many records; interning stores each once per process.
+    """
+    for key in ('id', 'category', 'type', 'status'):
+        if key in frontmatter:
+            frontmatter[key] = _intern(frontmatter[key])
+
+    frameworks = frontmatter.get('frameworks')
+    if isinstance(frameworks, dict):
+        frontmatter['frameworks'] = {
+            _intern(fw_id): [_intern(c) for c in (controls or [])]
+            for fw_id, controls in frameworks.items()
+        }
+
+    for key in ('variables', 'references', 'organization_tiers', 'industries'):
+        values = frontmatter.get(key)
+        if isinstance(values, list):
+            frontmatter[key] = [_intern(v) for v in values]
+
+    return frontmatter
+
+
+def split_frontmatter(content: str) -> Tuple[Optional[Dict[str, Any]], int, int, Optional[str]]:
+    """
+    Split a policy file into frontmatter and body.
+
+    Returns:
+        (frontmatter, body_start, body_end, error) where the offsets are
+        character offsets of the stripped body within ``content``
+    """
+    if not content.startswith('---'):
+        return None, 0, 0, "Missing YAML frontmatter delimiter"
+
+    end_idx = content.find('---', 3)
+    if end_idx == -1:
+        return None, 0, 0, "Missing closing YAML frontmatter delimiter"
+
+    try:
+        frontmatter = yaml.safe_load(content[3:end_idx])
+    except yaml.YAMLError as e:
+        return None, 0, 0, f"YAML parse error: {e}"
+
+    if not isinstance(frontmatter, dict):
+        return None, 0, 0, "Frontmatter is not a mapping"
+
+    body_start = end_idx + 3
+    body_end = len(content)
+    while body_start < body_end and content[body_start].isspace():
+        body_start += 1
+    while body_end > body_start and content[body_end - 1].isspace():
+        body_end -= 1
+
+    return frontmatter, body_start, body_end, None
+
+
+def compile_entry(path: Path, rel_path: str, stat: os.stat_result) -> SnapshotEntry:
+    """Parse a policy file into a snapshot entry"""
+    entry = SnapshotEntry(
+        path=rel_path,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        policy_id=path.stem
+    )
+
+    try:
+        content = path.read_bytes().decode('utf-8')
+    except (OSError, UnicodeDecodeError) as e:
+        entry.error = f"Could not read file: {e}"
+        return entry
+
+    frontmatter, start, end, error = split_frontmatter(content)
+    if error:
+        entry.error = error
+        return entry
+
+    body = content[start:end]
+    entry.frontmatter = intern_frontmatter(frontmatter)
+    entry.policy_id = frontmatter.get('id') or path.stem
+    entry.body_start = len(content[:start].encode('utf-8'))
+    entry.body_end = entry.body_start + len(body.encode('utf-8'))
+
+    found = set(TEMPLATE_VAR_PATTERN.findall(body))
+    found.update(TEMPLATE_VAR_PATTERN.findall(str(frontmatter.get('title', ''))))
+    entry.variables = [sys.intern(v) for v in sorted(found)]
+    entry.references = list(frontmatter.get('references') or [])
+    if isinstance(frontmatter.get('frameworks'), dict):
+        entry.frameworks = frontmatter['frameworks']
+
+    return entry
+
+
+def content_digest(policy: Mapping) -> str:
+    """Hash of a policy's body and the frontmatter fields copied into renders"""
+    digest = hashlib.sha1()
+    for key in ('id', 'title', 'category', 'frameworks', 'variables'):
+        digest.update(repr(policy.get(key)).encode('utf-8'))
+        digest.update(b'\0')
+    digest.update(policy['body'].encode('utf-8'))
+    return digest.hexdigest()
+
+
+class PolicyRecord(Mapping):
+    """
+    Policy record with an eager frontmatter index and a lazily loaded body.
+
+    Listing views only need the index fields (id, title, category,
+    frameworks); the body is read from disk on first access and can be
+    dropped again with release_body().  Supports the dict-style access
+    used throughout the generation and web code.
+    """
+
+    __slots__ = ('path', 'frontmatter', 'id', 'title', 'category', 'frameworks',
+                 'variables', 'requires_customization', '_body', '_body_loader',
+                 '_body_plan', '_title_plan', '_digest')
+
+    KEYS = ('path', 'frontmatter', 'body', 'id', 'title', 'category',
+            'frameworks', 'variables', 'requires_customization')
+
+    def __init__(self, path: str, frontmatter: Dict[str, Any],
+                 body_loader: Optional[Callable[[], str]] = None, body: Optional[str] = None):
+        self.path = path
+        self.frontmatter = frontmatter
+        self.id = frontmatter.get('id', Path(path).stem)
+        self.title = frontmatter.get('title', '')
+        self.category = frontmatter.get('category', '')
+        self.frameworks = frontmatter.get('frameworks', {})
+        self.variables = frontmatter.get('variables', [])
+        self.requires_customization = frontmatter.get('requires_customization', [])
+        self._body = body
+        self._body_loader = body_loader
+        self._body_plan = None
+        self._title_plan = None
+        self._digest = None
+
+    @property
+    def body(self) -> str:
+        if self._body is None:
+            self._body = self._body_loader() if self._body_loader else ''
+        return self._body
+
+    @property
+    def body_loaded(self) -> bool:
+        return self._body is not None or self._body_plan is not None
+
+    @property
+    def body_plan(self) -> SubstitutionPlan:
+        """Compiled substitution plan for the body, built on first render"""
+        if self._body_plan is None:
+            self._body_plan = SubstitutionPlan(self.body)
+        return self._body_plan
+
+    @property
+    def title_plan(self) -> SubstitutionPlan:
+        if self._title_plan is None:
+            self._title_plan = SubstitutionPlan(str(self.title))
+        return self._title_plan
+
+    @property
+    def digest(self) -> str:
+        """
+        Hash of everything a rendered document is built from.
+
+        Records are rebuilt when their file changes, so the digest is
+        computed once and survives release_body().
+        """
+        if self._digest is None:
+            self._digest = content_digest(self)
+        return self._digest
+
+    def release_body(self) -> None:
+        """Drop the body text and its plan; both are rebuilt on next access"""
+        if self._body_loader is not None:
+            self._body = None
+            self._body_plan = None
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self) -> str:
+        return f"PolicyRecord(id={self.id!r}, path={self.path!r})"
+
+
+class LibrarySnapshot:
+    """
+    Compiled view of a policies directory.
+
+    Usage:
+        snapshot = get_library_snapshot("policies")
+        for entry in snapshot.valid_entries():
+            print(entry.policy_id, entry.frameworks.keys())
+    """
+
+    def __init__(self, policies_dir: str, cache_dir: Optional[str] = None):
+        self.policies_dir = Path(policies_dir).resolve()
+        if cache_dir is None:
+            cache_dir = self.policies_dir.parent / "data" / "cache"
+        self.cache_dir = Path(cache_dir)
+        self.entries: Dict[str, SnapshotEntry] = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+
+        # Incremented whenever a sweep observes a change; downstream caches
+        # (gap reports, rendered output) can key on it
+        self.version = 0
+        self.last_sweep = 0.0
+
+    @property
+    def snapshot_path(self) -> Path:
+        """Snapshot file location, keyed by a hash of the policies directory"""
+        digest = hashlib.sha1(str(self.policies_dir).encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f"policies-{digest}.snapshot"
+
+    # =========================================================================
+    # PERSISTENCE
+    # =========================================================================
+
+    def _read_snapshot_file(self) -> Dict[str, SnapshotEntry]:
+        """Read the on-disk snapshot, returning {} if missing or incompatible"""
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                # Unpickling runs code, so only load a file nobody else could have written
+                if not _owned_privately(os.fstat(f.fileno())):
+                    return {}
+                if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                    return {}
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return {}
+
+        if data.get('format') != SNAPSHOT_FORMAT or data.get('root') != str(self.policies_dir):
+            return {}
+
+        try:
+            entries = {e['path']: SnapshotEntry(**e) for e in data.get('entries', [])}
+        except TypeError:
+            return {}
+
+        for entry in entries.values():
+            if entry.is_valid:
+                entry.frontmatter = intern_frontmatter(entry.frontmatter)
+                if isinstance(entry.frontmatter.get('frameworks'), dict):
+                    entry.frameworks = entry.frontmatter['frameworks']
+            entry.variables = [sys.intern(v) for v in entry.variables]
+        return entries
+
+    def _write_snapshot_file(self) -> None:
+        """Atomically write the snapshot file (best effort)"""
+        data = {
+            'format': SNAPSHOT_FORMAT,
+            'root': str(self.policies_dir),
+            'entries': [asdict(e) for e in self.entries.values()],
+        }
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.snapshot_path.with_suffix(f".tmp{os.getpid()}")
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0),
+                         0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(SNAPSHOT_MAGIC)
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError:
+            # A read-only cache location only costs us the warm start
+            pass
+
+    # =========================================================================
+    # REFRESH
+    # =========================================================================
+
+    def _scan(self) -> Dict[str, Tuple[Path, os.stat_result]]:
+        """Stat every policy file in the directory"""
+        found = {}
+        if not self.policies_dir.exists():
+            return found
+        for md_file in self.policies_dir.rglob("*.md"):
+            try:
+                stat = md_file.stat()
+            except OSError:
+                continue
+            found[md_file.relative_to(self.policies_dir).as_posix()] = (md_file, stat)
+        return found
+
+    def sweep(self) -> SnapshotDelta:
+        """
+        Bring the snapshot up to date with the policies directory.
+
+        Only files whose mtime or size changed are re-parsed.
+
+        Returns:
+            SnapshotDelta describing added, modified and removed files
+        """
+        with self._lock:
+            if not self._loaded:
+                self.entries = self._read_snapshot_file()
+                self._loaded = True
+                self.version = 1
+
+            scanned = self._scan()
+            delta = SnapshotDelta()
+
+            for rel_path in list(self.entries):
+                if rel_path not in scanned:
+                    del self.entries[rel_path]
+                    delta.removed.append(rel_path)
+
+            for rel_path, (path, stat) in scanned.items():
+                entry = self.entries.get(rel_path)
+                if entry and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                    continue
+                (delta.modified if entry else delta.added).append(rel_path)
+                self.entries[rel_path] = compile_entry(path, rel_path, stat)
+
+            self.last_sweep = time.monotonic()
+            if delta:
+                self.version += 1
+            if delta or not self.snapshot_path.exists():
+                self._write_snapshot_file()
+
+            return delta
+
+    def refresh(self) -> bool:
+        """
+        Bring the snapshot up to date with the policies directory.
+
+        Returns:
+            True if any entry was added, changed or removed
+        """
+        return bool(self.sweep())
+
+    @property
+    def fingerprint(self) -> str:
+        """Content fingerprint of the library, stable across processes"""
+        digest = hashlib.sha1()
+        with self._lock:
+            for rel_path in sorted(self.entries):
+                entry = self.entries[rel_path]
+                digest.update(f"{rel_path}:{entry.mtime_ns}:{entry.size}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    # =========================================================================
+    # ACCESS
+    # =========================================================================
+
+    def all_entries(self) -> List[SnapshotEntry]:
+        """All entries (including files with frontmatter errors), sorted by path"""
+        with self._lock:
+            return [self.entries[k] for k in sorted(self.entries)]
+
+    def valid_entries(self) -> List[SnapshotEntry]:
+        """Entries with parseable frontmatter, sorted by path"""
+        return [e for e in self.all_entries() if e.is_valid]
+
+    def get_entry(self, path: Path) -> Optional[SnapshotEntry]:
+        """Look up an entry by absolute or relative file path"""
+        path = Path(path)
+        try:
+            rel_path = path.resolve().relative_to(self.policies_dir).as_posix()
+        except ValueError:
+            rel_path = path.as_posix()
+        with self._lock:
+            return self.entries.get(rel_path)
+
+    def absolute_path(self, entry: SnapshotEntry) -> Path:
+        return self.policies_dir / entry.path
+
+    def read_body(self, entry: SnapshotEntry) -> str:
+        """Read a policy body using the stored byte offsets"""
+        with open(self.absolute_path(entry), 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_mtime_ns != entry.mtime_ns or stat.st_size != entry.size:
+                # Edited since the last sweep; the offsets no longer apply
+                content = f.read().decode('utf-8')
+                _, start, end, _ = split_frontmatter(content)
+                return content[start:end]
+            f.seek(entry.body_start)
+            return f.read(entry.body_length).decode('utf-8')
+
+    def get_policy_ids(self) -> List[str]:
+        """IDs of all policies (falls back to filename for invalid files)"""
+        return [e.policy_id for e in self.all_entries()]
+
+    def make_record(self, entry: SnapshotEntry) -> PolicyRecord:
+        """Build a lazy-body policy record for a valid entry"""
+        return PolicyRecord(
+            str(self.absolute_path(entry)),
+            entry.frontmatter,
+            body_loader=lambda: self.read_body(entry)
+        )
+
+    def get_framework_map(self) -> Dict[str, List[str]]:
+        """Map of framework ID -> policy IDs that declare a mapping to it"""
+        fw_map: Dict[str, List[str]] = {}
+        for entry in self.valid_entries():
+            for fw_id in entry.frameworks:
+                fw_map.setdefault(fw_id, []).append(entry.policy_id)
+        return fw_map
+
+
+# Process-wide snapshots, shared by every loader in this process
+_snapshots: Dict[Tuple[str, str], LibrarySnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_library_snapshot(policies_dir: str, cache_dir: Optional[str] = None) -> LibrarySnapshot:
+    """
+    Get the shared snapshot for a policies directory.
+
+    The snapshot is loaded from disk (or built) on first use in a process.
+    """
+    snapshot = LibrarySnapshot(policies_dir, cache_dir)
+    key = (str(snapshot.policies_dir), str(snapshot.cache_dir))
+
+    with _snapshots_lock:
+        shared = _snapshots.get(key)
+        if shared is None:
+            snapshot.refresh()
+            _snapshots[key] = shared = snapshot
+    return shared
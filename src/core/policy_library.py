@@ -0,0 +1,335 @@
+"""
+Policy Library Module
+Process-wide, thread-safe owner of the policy library and framework catalog
+
+The web app, CLI, GUI, gap analyzer and change detector all need the same
+policies, the same framework catalog and the same reverse indexes.  One
+PolicyLibrary per policies directory holds them for the whole process;
+get_policy_library() hands out the shared instance.
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Optional, Tuple
+
+from core.library_snapshot import (
+    LibrarySnapshot, PolicyRecord, SnapshotDelta, get_library_snapshot, split_frontmatter
+)
+
+
+# Minimum seconds between stat sweeps of the policies directory
+DEFAULT_RELOAD_INTERVAL = 2.0
+
+
+class PolicyLibrary:
+    """
+    Shared policy records, framework catalog and reverse indexes.
+
+    Every index is rebuilt when the snapshot version changes, so callers
+    can key their own caches on ``version``.
+
+    Usage:
+        library = get_policy_library("policies", "config/frameworks")
+        for policy_id in library.policies_for_framework("soc2"):
+            print(library.get_policy(policy_id)['title'])
+    """
+
+    def __init__(self, policies_dir: str, frameworks_dir: Optional[str] = None,
+                 reload_interval: Optional[float] = DEFAULT_RELOAD_INTERVAL):
+        self.policies_dir = Path(policies_dir)
+        self.frameworks_dir = Path(frameworks_dir) if frameworks_dir else None
+
+        # None disables automatic sweeps; call check_for_updates() explicitly
+        self.reload_interval = reload_interval
+
+        self._lock = threading.RLock()
+        self._snapshot: Optional[LibrarySnapshot] = None
+        self._mapper = None
+        self._mapper_loaded = False
+
+        # Records keyed by absolute path, with the (mtime_ns, size) they were built from
+        self._records: Dict[str, PolicyRecord] = {}
+        self._stamps: Dict[str, Tuple] = {}
+
+        # Indexes derived from the records; rebuilt when the version changes
+        self._indexed_version = -1
+        self._by_id: Dict[str, PolicyRecord] = {}
+        self._framework_index: Dict[str, List[str]] = {}
+        self._variable_index: Dict[str, List[str]] = {}
+        self._gap_analyzer = None
+        self._gap_analyzer_version = -1
+
+    @property
+    def snapshot(self) -> LibrarySnapshot:
+        """Shared compiled snapshot of the policies directory"""
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = get_library_snapshot(str(self.policies_dir))
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        """Version counter of the policy library, bumped on every change"""
+        return self.snapshot.version
+
+    @property
+    def fingerprint(self) -> str:
+        """Content fingerprint of the policy library, stable across processes"""
+        self.refresh_if_stale()
+        return self.snapshot.fingerprint
+
+    # =========================================================================
+    # CHANGE TRACKING
+    # =========================================================================
+
+    def check_for_updates(self) -> SnapshotDelta:
+        """
+        Stat-sweep the policies directory and evict changed policies.
+
+        Only records for modified or removed files are dropped; added files
+        are loaded on next access.
+        """
+        with self._lock:
+            delta = self.snapshot.sweep()
+            self._sync()
+            return delta
+
+    def refresh_if_stale(self) -> None:
+        """Sweep if the last sweep is older than reload_interval"""
+        with self._lock:
+            snapshot = self.snapshot
+            if self.reload_interval is not None and \
+                    time.monotonic() - snapshot.last_sweep >= self.reload_interval:
+                snapshot.sweep()
+            self._sync()
+
+    def _sync(self) -> None:
+        """Drop stale records and rebuild indexes if the snapshot changed"""
+        snapshot = self.snapshot
+        if self._indexed_version == snapshot.version:
+            return
+
+        for path_key in list(self._records):
+            entry = snapshot.get_entry(Path(path_key))
+            if entry is None or self._stamps.get(path_key) != (entry.mtime_ns, entry.size):
+                self._records.pop(path_key, None)
+                self._stamps.pop(path_key, None)
+
+        by_id = {}
+        framework_index: Dict[str, List[str]] = {}
+        variable_index: Dict[str, List[str]] = {}
+        for entry in snapshot.valid_entries():
+            record = self.load_policy(snapshot.absolute_path(entry))
+            if record is None:
+                continue
+            by_id[record['id']] = record
+            for fw_id in record['frameworks'] or {}:
+                framework_index.setdefault(fw_id, []).append(record['id'])
+
+            # Declared variables plus the tokens actually found in the body and title
+            names = set(entry.variables)
+            names.update(v for v in record['variables'] or [] if isinstance(v, str))
+            for name in names:
+                variable_index.setdefault(name, []).append(record['id'])
+
+        self._by_id = by_id
+        self._framework_index = framework_index
+        self._variable_index = variable_index
+        self._indexed_version = snapshot.version
+
+    # =========================================================================
+    # POLICIES
+    # =========================================================================
+
+    def load_policy(self, policy_path: Path) -> Optional[PolicyRecord]:
+        """
+        Load a policy's frontmatter index.
+
+        The body is read from disk on first access of ``policy['body']``.
+        Files outside the policies directory are parsed directly.
+        """
+        path_key = str(policy_path)
+        with self._lock:
+            if path_key in self._records:
+                return self._records[path_key]
+
+            try:
+                entry = self.snapshot.get_entry(policy_path)
+                if entry is not None:
+                    if not entry.is_valid:
+                        return None
+                    record = self.snapshot.make_record(entry)
+                    stamp = (entry.mtime_ns, entry.size)
+                else:
+                    content = Path(policy_path).read_text(encoding='utf-8')
+                    frontmatter, start, end, error = split_frontmatter(content)
+                    if error:
+                        return None
+                    record = PolicyRecord(path_key, frontmatter, body=content[start:end])
+                    stamp = (None, None)
+            except Exception as e:
+                print(f"Warning: Could not load policy {policy_path}: {e}")
+                return None
+
+            self._records[path_key] = record
+            self._stamps[path_key] = stamp
+            return record
+
+    @property
+    def loaded_records(self) -> Dict[str, PolicyRecord]:
+        """Policy records loaded so far, keyed by path"""
+        return self._records
+
+    def get_policies(self) -> Dict[str, PolicyRecord]:
+        """All valid policies keyed by policy ID"""
+        with self._lock:
+            self.refresh_if_stale()
+            return dict(self._by_id)
+
+    def get_policy(self, policy_id: str) -> Optional[PolicyRecord]:
+        with self._lock:
+            self.refresh_if_stale()
+            return self._by_id.get(policy_id)
+
+    def policy_ids(self) -> Set[str]:
+        with self._lock:
+            self.refresh_if_stale()
+            return set(self._by_id)
+
+    def policies_for_framework(self, framework_id: str) -> List[str]:
+        """IDs of policies whose frontmatter maps to a framework"""
+        with self._lock:
+            self.refresh_if_stale()
+            return list(self._framework_index.get(framework_id, []))
+
+    def get_framework_map(self) -> Dict[str, List[str]]:
+        """Map of framework ID -> policy IDs that declare a mapping to it"""
+        with self._lock:
+            self.refresh_if_stale()
+            return {fw_id: list(ids) for fw_id, ids in self._framework_index.items()}
+
+    def policies_using_variables(self, variable_names: Iterable[str]) -> Set[str]:
+        """IDs of policies that declare or reference any of the given variables"""
+        with self._lock:
+            self.refresh_if_stale()
+            affected = set()
+            for name in variable_names:
+                affected.update(self._variable_index.get(name, ()))
+            return affected
+
+    def get_variable_map(self) -> Dict[str, List[str]]:
+        """Map of variable name -> policy IDs that use it"""
+        with self._lock:
+            self.refresh_if_stale()
+            return {name: list(ids) for name, ids in self._variable_index.items()}
+
+    def release_bodies(self) -> int:
+        """
+        Drop loaded policy bodies to reclaim memory.
+
+        Returns:
+            Number of bodies released
+        """
+        released = 0
+        with self._lock:
+            for record in self._records.values():
+                if record.body_loaded:
+                    record.release_body()
+                    released += 1
+        return released
+
+    # =========================================================================
+    # FRAMEWORKS
+    # =========================================================================
+
+    @property
+    def compliance_mapper(self):
+        """Framework catalog (None if no frameworks directory was given)"""
+        if not self._mapper_loaded:
+            with self._lock:
+                if not self._mapper_loaded:
+                    self._mapper = self._load_compliance_mapper()
+                    self._mapper_loaded = True
+        return self._mapper
+
+    def set_frameworks_dir(self, frameworks_dir: str) -> None:
+        """Attach a framework catalog to a library created without one"""
+        with self._lock:
+            self.frameworks_dir = Path(frameworks_dir)
+            self._mapper = None
+            self._mapper_loaded = False
+            self._gap_analyzer = None
+
+    def _load_compliance_mapper(self):
+        if not self.frameworks_dir:
+            return None
+        try:
+            from core.compliance_mapper import ComplianceMapper
+
+            mapper = ComplianceMapper()
+            mapper.load_all_frameworks(str(self.frameworks_dir))
+            return mapper
+        except Exception as e:
+            print(f"Warning: Could not initialize compliance mapper: {e}")
+            return None
+
+    def get_gap_analyzer(self):
+        """Gap analyzer over the current library, rebuilt when the version changes"""
+        with self._lock:
+            self.refresh_if_stale()
+            if self._gap_analyzer is None or self._gap_analyzer_version != self.version:
+                from core.gap_analyzer import GapAnalyzer
+
+                self._gap_analyzer = GapAnalyzer(
+                    compliance_mapper=self.compliance_mapper,
+                    policy_library=set(self.snapshot.get_policy_ids())
+                )
+                self._gap_analyzer_version = self.version
+            return self._gap_analyzer
+
+
+# Process-wide libraries keyed by (policies dir, frameworks dir or None)
+_libraries: Dict[Tuple[str, Optional[str]], PolicyLibrary] = {}
+_libraries_lock = threading.Lock()
+
+
+def get_policy_library(policies_dir: Optional[str] = None,
+                       frameworks_dir: Optional[str] = None) -> PolicyLibrary:
+    """
+    Get the shared library for a policies and frameworks directory.
+
+    With no arguments, uses the configured policies and frameworks
+    directories.  A library created without a frameworks directory picks
+    one up from the first caller that supplies it; a caller that supplies
+    no frameworks directory gets any library for its policies directory.
+    A different frameworks directory gets a library of its own.
+    """
+    if policies_dir is None:
+        from core.config import get_config
+
+        config = get_config()
+        policies_dir = str(config.get_policies_path())
+        frameworks_dir = frameworks_dir or str(config.get_frameworks_path())
+
+    policies_key = str(Path(policies_dir).resolve())
+    frameworks_key = str(Path(frameworks_dir).resolve()) if frameworks_dir else None
+    with _libraries_lock:
+        library = _libraries.get((policies_key, frameworks_key))
+        if library is not None:
+            return library
+
+        if frameworks_key is None:
+            library = next((lib for (key, _), lib in _libraries.items() if key == policies_key),
+                           None)
+            if library is None:
+                library = _libraries[(policies_key, None)] = PolicyLibrary(policies_dir)
+        elif (policies_key, None) in _libraries:
+            library = _libraries.pop((policies_key, None))
+            library.set_frameworks_dir(frameworks_dir)
+            _libraries[(policies_key, frameworks_key)] = library
+        else:
+            library = _libraries[(policies_key, frameworks_key)] = \
+                PolicyLibrary(policies_dir, frameworks_dir)
+    return library
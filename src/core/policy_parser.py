@@ -5,11 +5,14 @@ Parses and validates policy structure
 """
 
 import os
+import pickle
 import re
+import sys
 import yaml
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any, Set
+from typing import Optional, List, Dict, Any, Set, Iterator, Tuple, Type
 from datetime import datetime
 from enum import Enum
 
@@ -27,6 +30,11 @@ except ImportError:
     FRONTMATTER_AVAILABLE = False
 
 
+def _intern(value: Any) -> Any:
+    """Intern a string; any other value is returned unchanged"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
 class PolicyType(Enum):
     """Types of policy documents"""
     POLICY = "policy"
@@ -46,7 +54,7 @@ class PolicyStatus(Enum):
     ARCHIVED = "archived"
 
 
-@dataclass
+@dataclass(slots=True)
 class PolicySection:
     """Represents a section within a policy"""
     number: str  # e.g., "I", "II.A", "III.B.2"
@@ -56,7 +64,7 @@ class PolicySection:
     subsections: List['PolicySection'] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class IncompletenessMarker:
     """Marks a section requiring customization"""
     section: str
@@ -65,7 +73,7 @@ class IncompletenessMarker:
     priority: str = "medium"  # low, medium, high, critical
 
 
-@dataclass
+@dataclass(slots=True)
 class Policy:
     """Complete policy document structure"""
     # Identification
@@ -111,6 +119,20 @@ class Policy:
     author: Optional[str] = None
     approver: Optional[str] = None
 
+    def __post_init__(self):
+        # Category, framework and variable names repeat across every policy;
+        # parsed documents may carry None or other types, which are kept as-is
+        if isinstance(self.category, str):
+            self.category = sys.intern(self.category)
+        if isinstance(self.frameworks, dict):
+            self.frameworks = {
+                _intern(fw_id): [_intern(c) for c in controls] if isinstance(controls, list)
+                else controls
+                for fw_id, controls in self.frameworks.items()
+            }
+        if isinstance(self.variables, list):
+            self.variables = [_intern(v) for v in self.variables]
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for YAML serialization"""
         return {
@@ -617,31 +639,40 @@ class PolicyParser:
 
         return sections
 
-    def load_all_policies(self, directory: str) -> Dict[str, Policy]:
+    def load_all_policies(self, directory: str, workers: int = 1,
+                          checkpoint_path: Optional[str] = None) -> Dict[str, Policy]:
         """
         Load all policies from a directory
 
         Args:
             directory: Path to policies directory
+            workers: Number of worker processes (1 parses in this process)
+            checkpoint_path: Optional checkpoint file; files already recorded
+                there (and unchanged since) are not parsed again
 
         Returns:
             Dictionary of policy_id -> Policy
         """
-        policies = {}
-
+        filepaths = []
         for root, dirs, files in os.walk(directory):
             for file in files:
-                filepath = os.path.join(root, file)
-
-                try:
-                    if file.endswith('.docx') and not file.startswith('~'):
-                        policy = self.parse_docx(filepath)
-                        policies[policy.id] = policy
-                    elif file.endswith('.md'):
-                        policy = self.parse_markdown(filepath)
-                        policies[policy.id] = policy
-                except Exception as e:
-                    print(f"Error parsing {filepath}: {e}")
+                if (file.endswith('.docx') and not file.startswith('~')) or file.endswith('.md'):
+                    filepaths.append(os.path.join(root, file))
+
+        parsed = {}
+        for filepath, policy, _, error in ingest_files(self, filepaths, workers=workers,
+                                                        checkpoint_path=checkpoint_path):
+            if error:
+                print(f"Error parsing {filepath}: {error}")
+            else:
+                parsed[filepath] = policy
+
+        # Insert in discovery order so duplicate IDs resolve the same way
+        # regardless of which worker finished first
+        policies = {}
+        for filepath in filepaths:
+            if filepath in parsed:
+                policies[parsed[filepath].id] = parsed[filepath]
 
         self._policies_cache = policies
         return policies
@@ -677,31 +708,213 @@ class PolicyParser:
         return filepath
 
 
-def convert_docx_library(source_dir: str, output_dir: str) -> Dict[str, str]:
+class IngestCheckpoint:
+    """
+    Append-only record of files that have already been ingested.
+
+    The file starts with a format header; each completed file is then
+    appended as one pickle frame keyed by its path, mtime and size, so an
+    interrupted run resumes where it stopped.  A checkpoint in an older or
+    unreadable layout is moved aside to ``<path>.old`` rather than
+    truncated, and whatever could be read from it is carried over.
+    """
+
+    HEADER = ('policyupdate-ingest-checkpoint', 2)
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Dict[str, Tuple[Tuple[int, int], Any]]:
+        """Read recorded results, discarding a truncated trailing frame"""
+        try:
+            f = open(self.path, 'r+b')
+        except FileNotFoundError:
+            return {}
+
+        with f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return {}
+            try:
+                current = pickle.load(f) == self.HEADER
+            except Exception:
+                current = False
+            if not current:
+                f.seek(0)
+            done, good_offset, compatible = self._read_frames(f)
+            if current and compatible:
+                # Drop a partial frame left by a crash so later appends stay readable
+                f.truncate(good_offset)
+                return done
+
+        # Older layout or an incompatible record: keep the file, start a new one
+        os.replace(self.path, self.path + '.old')
+        for key, (stamp, result) in done.items():
+            self.record(key, stamp, result)
+        return done
+
+    @staticmethod
+    def _read_frames(f) -> Tuple[Dict[str, Tuple[Tuple[int, int], Any]], int, bool]:
+        """Read frames up to the first unreadable one; False if it was complete but incompatible"""
+        done = {}
+        good_offset = f.tell()
+        while True:
+            try:
+                key, stamp, result = pickle.load(f)
+            except (EOFError, pickle.UnpicklingError):
+                return done, good_offset, True
+            except Exception:
+                return done, good_offset, False
+            done[key] = (stamp, result)
+            good_offset = f.tell()
+
+    def record(self, key: str, stamp: Tuple[int, int], result: Any):
+        """Append one completed file"""
+        with open(self.path, 'ab') as f:
+            if f.tell() == 0:
+                pickle.dump(self.HEADER, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump((key, stamp, result), f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _file_stamp(filepath: str) -> Tuple[int, int]:
+    stat = os.stat(filepath)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+# Parser instance owned by each worker process
+_worker_parser: Optional[PolicyParser] = None
+
+
+def _init_worker(parser_class: Type[PolicyParser]):
+    global _worker_parser
+    _worker_parser = parser_class()
+
+
+def _ingest_file(parser: PolicyParser, filepath: str,
+                 output_dir: Optional[str] = None) -> Tuple[Policy, Optional[str]]:
+    """Parse one file and optionally write it out as Markdown"""
+    if filepath.endswith('.docx'):
+        policy = parser.parse_docx(filepath)
+    else:
+        policy = parser.parse_markdown(filepath)
+
+    output_path = parser.save_policy(policy, output_dir) if output_dir else None
+    return policy, output_path
+
+
+def _ingest_in_worker(filepath: str, output_dir: Optional[str]) -> Tuple[Policy, Optional[str]]:
+    return _ingest_file(_worker_parser, filepath, output_dir)
+
+
+def ingest_files(parser: PolicyParser, filepaths: List[str], output_dir: Optional[str] = None,
+                 workers: int = 1, checkpoint_path: Optional[str] = None
+                 ) -> Iterator[Tuple[str, Optional[Policy], Optional[str], Optional[str]]]:
+    """
+    Parse (and optionally convert) policy files, in parallel if requested.
+
+    Results are yielded as soon as each file finishes, and recorded in the
+    checkpoint so that a rerun skips files that are already done.
+
+    Args:
+        parser: Parser to use; with workers > 1 each worker process builds
+            its own instance of the same class
+        filepaths: Files to ingest
+        output_dir: If set, each policy is saved there as Markdown
+        workers: Number of worker processes
+        checkpoint_path: Optional checkpoint file for resumable runs
+
+    Yields:
+        (filepath, policy, output_path, error)
+    """
+    checkpoint = IngestCheckpoint(checkpoint_path) if checkpoint_path else None
+    done = checkpoint.load() if checkpoint else {}
+
+    pending = []
+    for filepath in filepaths:
+        key = os.path.abspath(filepath)
+        recorded = done.get(key)
+        if recorded:
+            stamp, (policy, output_path) = recorded
+            if stamp == _file_stamp(filepath) and (output_path is None or os.path.exists(output_path)):
+                yield filepath, policy, output_path, None
+                continue
+        pending.append(filepath)
+
+    def finish(filepath, policy, output_path):
+        if checkpoint:
+            checkpoint.record(os.path.abspath(filepath), _file_stamp(filepath), (policy, output_path))
+        return filepath, policy, output_path, None
+
+    if workers <= 1 or len(pending) <= 1:
+        for filepath in pending:
+            try:
+                policy, output_path = _ingest_file(parser, filepath, output_dir)
+            except Exception as e:
+                yield filepath, None, None, str(e)
+                continue
+            yield finish(filepath, policy, output_path)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(type(parser),)) as executor:
+        futures = {
+            executor.submit(_ingest_in_worker, filepath, output_dir): filepath
+            for filepath in pending
+        }
+        for future in as_completed(futures):
+            filepath = futures[future]
+            try:
+                policy, output_path = future.result()
+            except Exception as e:
+                yield filepath, None, None, str(e)
+                continue
+            yield finish(filepath, policy, output_path)
+
+
+def convert_docx_library(source_dir: str, output_dir: str, workers: int = 1,
+                         checkpoint_path: Optional[str] = None,
+                         parser: Optional[PolicyParser] = None) -> Dict[str, str]:
     """
     Convert an entire DOCX policy library to Markdown format
 
+    Each policy is written as soon as it is converted, and progress is
+    recorded in a checkpoint file so an interrupted conversion can be
+    rerun without starting over.
+
     Args:
         source_dir: Directory containing DOCX files
         output_dir: Directory for Markdown output
+        workers: Number of worker processes (1 converts in this process)
+        checkpoint_path: Checkpoint file (default: .docx-convert.checkpoint
+            in output_dir)
+        parser: Parser to use (default: PolicyParser)
 
     Returns:
         Dictionary of original_filename -> output_path
     """
-    parser = PolicyParser()
+    parser = parser or PolicyParser()
     results = {}
 
-    for file in os.listdir(source_dir):
-        if file.endswith('.docx') and not file.startswith('~'):
-            source_path = os.path.join(source_dir, file)
+    os.makedirs(output_dir, exist_ok=True)
+    if checkpoint_path is None:
+        checkpoint_path = os.path.join(output_dir, '.docx-convert.checkpoint')
 
-            try:
-                policy = parser.parse_docx(source_path)
-                output_path = parser.save_policy(policy, output_dir)
-                results[file] = output_path
-                print(f"✓ Converted: {file} -> {output_path}")
-            except Exception as e:
-                results[file] = f"ERROR: {e}"
-                print(f"✗ Failed: {file} - {e}")
+    filepaths = [
+        os.path.join(source_dir, file)
+        for file in sorted(os.listdir(source_dir))
+        if file.endswith('.docx') and not file.startswith('~')
+    ]
+
+    for source_path, _, output_path, error in ingest_files(
+            parser, filepaths, output_dir=output_dir,
+            workers=workers, checkpoint_path=checkpoint_path):
+        file = os.path.basename(source_path)
+        if error:
+            results[file] = f"ERROR: {error}"
+            print(f"✗ Failed: {file} - {error}")
+        else:
+            results[file] = output_path
+            print(f"✓ Converted: {file} -> {output_path}")
 
     return results
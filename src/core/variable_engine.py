@@ -5,7 +5,8 @@ Handles variable substitution, conditional sections, and complex logic
 
 import re
 from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional, Callable
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Callable, Mapping, FrozenSet, Sequence, Union
 from enum import Enum
 
 
@@ -79,6 +80,404 @@ class ClientProfile:
         return default
 
 
+class SubstitutionPlan:
+    """
+    Template pre-split into literal and {{VARIABLE}} segments.
+
+    Token offsets are found once; each render is a single join, so the
+    cost no longer grows with the number of variables supplied.
+    Unknown variables are left as their original {{VARIABLE}} token.
+    """
+
+    __slots__ = ('literals', 'names', 'tokens', 'variables', 'footprint', 'plain')
+
+    TOKEN_PATTERN = re.compile(r'\{\{([A-Z_]+)\}\}')
+
+    def __init__(self, template: str):
+        literals = []
+        names = []
+        pos = 0
+        for match in self.TOKEN_PATTERN.finditer(template):
+            literals.append(template[pos:match.start()])
+            names.append(match.group(1))
+            pos = match.end()
+        literals.append(template[pos:])
+
+        self.literals: List[str] = literals
+        self.names: List[str] = names
+        self.tokens: List[str] = [f"{{{{{name}}}}}" for name in names]
+        self.variables: FrozenSet[str] = frozenset(names)
+        # Variables in a fixed order; two value maps that agree on these render identically
+        self.footprint: tuple = tuple(sorted(self.variables))
+        # No brackets or braces outside the tokens, so markers can only come from values
+        self.plain: bool = not any('[' in text or '{' in text for text in literals)
+
+    def render(self, values: Mapping[str, str]) -> str:
+        """Substitute values in a single pass"""
+        if not self.names:
+            return self.literals[0]
+
+        parts = [''] * (2 * len(self.names) + 1)
+        parts[0::2] = self.literals
+        parts[1::2] = [values.get(name, token) for name, token in zip(self.names, self.tokens)]
+        return ''.join(parts)
+
+    def unreplaced(self, values: Mapping[str, str]) -> Optional[List[str]]:
+        """
+        Variables that render(values) leaves as {{VARIABLE}} tokens, sorted by name.
+
+        Known without scanning the output when neither the template nor the
+        values contain brackets or braces; otherwise returns None and the
+        rendered text has to be scanned.
+        """
+        if not self.plain:
+            return None
+        missing = []
+        for name in self.footprint:
+            value = values.get(name)
+            if value is None:
+                missing.append(name)
+            elif '[' in value or '{' in value:
+                return None
+        return missing
+
+    def render_many(self, value_maps: Sequence[Mapping[str, str]]) -> List[str]:
+        """
+        Render for many value maps in one call.
+
+        Maps that agree on every variable this template uses share a
+        single render (and the same output string).
+        """
+        rendered: Dict[tuple, str] = {}
+        results = []
+        for values in value_maps:
+            key = tuple(values.get(name) for name in self.footprint)
+            text = rendered.get(key)
+            if text is None:
+                text = rendered[key] = self.render(values)
+            results.append(text)
+        return results
+
+
+@lru_cache(maxsize=1024)
+def compile_substitution(template: str) -> SubstitutionPlan:
+    """Compile (or fetch the cached) substitution plan for a template"""
+    return SubstitutionPlan(template)
+
+
+# =============================================================================
+# TEMPLATE COMPILATION
+# =============================================================================
+
+class _Text:
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def render(self, engine: 'VariableEngine', client: 'ClientProfile', item: Any, out: List[str]):
+        out.append(self.text)
+
+
+class _Value(str):
+    """Rendered variable value; block whitespace stripping never touches it"""
+    __slots__ = ()
+
+
+class _Var:
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def render(self, engine, client, item, out):
+        out.append(_Value(engine._resolve_variable(self.name, client)))
+
+
+class _This:
+    __slots__ = ()
+
+    def render(self, engine, client, item, out):
+        value = str(item)
+        if '{{' not in value:
+            out.append(value)
+            return
+        # Tokens inside list items are substituted like template tokens
+        pos = 0
+        for match in engine.SIMPLE_VAR_PATTERN.finditer(value):
+            out.append(value[pos:match.start()])
+            out.append(_Value(engine._resolve_variable(match.group(1), client)))
+            pos = match.end()
+        out.append(value[pos:])
+
+
+class _If:
+    __slots__ = ('condition', 'then_nodes', 'else_nodes')
+
+    def __init__(self, condition: Callable[['ClientProfile'], bool]):
+        self.condition = condition
+        self.then_nodes: List[Any] = []
+        self.else_nodes: List[Any] = []
+
+    def render(self, engine, client, item, out):
+        nodes = self.then_nodes if self.condition(client) else self.else_nodes
+        for node in nodes:
+            node.render(engine, client, item, out)
+
+
+class _Each:
+    __slots__ = ('list_name', 'nodes')
+
+    def __init__(self, list_name: str):
+        self.list_name = list_name
+        self.nodes: List[Any] = []
+
+    def render(self, engine, client, item, out):
+        items = client.get(self.list_name, [])
+        if not isinstance(items, list):
+            return
+        results = []
+        for each_item in items:
+            parts: List[str] = []
+            for node in self.nodes:
+                node.render(engine, client, each_item, parts)
+            results.append(_strip_parts(parts))
+        out.append('\n'.join(results))
+
+
+def _strip_parts(parts: List[str]) -> str:
+    """Join rendered parts, stripping edge whitespace outside variable values"""
+    for i in range(len(parts)):
+        if isinstance(parts[i], _Value):
+            break
+        parts[i] = parts[i].lstrip()
+        if parts[i]:
+            break
+    for i in range(len(parts) - 1, -1, -1):
+        if isinstance(parts[i], _Value):
+            break
+        parts[i] = parts[i].rstrip()
+        if parts[i]:
+            break
+    return ''.join(parts)
+
+
+def _strip_edges(nodes: List[Any]) -> None:
+    """Strip whitespace at the edges of a block, as the old regex renderer did"""
+    if nodes and isinstance(nodes[0], _Text):
+        nodes[0] = _Text(nodes[0].text.lstrip())
+    if nodes and isinstance(nodes[-1], _Text):
+        nodes[-1] = _Text(nodes[-1].text.rstrip())
+
+
+def _parse_operand(expr: str) -> Callable[['ClientProfile'], Any]:
+    """Compile an operand (literal or variable reference) to a getter"""
+    expr = expr.strip()
+
+    # String literal
+    if (expr.startswith('"') and expr.endswith('"')) or \
+       (expr.startswith("'") and expr.endswith("'")):
+        literal: Any = expr[1:-1]
+        return lambda client: literal
+
+    # Number literal
+    try:
+        number = float(expr) if '.' in expr else int(expr)
+        return lambda client: number
+    except ValueError:
+        pass
+
+    # Boolean literal
+    if expr.lower() in ('true', 'false'):
+        flag = expr.lower() == 'true'
+        return lambda client: flag
+
+    # Variable reference
+    return lambda client: client.get(expr)
+
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    '>=': lambda a, b: a >= b,
+    '<=': lambda a, b: a <= b,
+    '!=': lambda a, b: a != b,
+    '==': lambda a, b: a == b,
+    '>': lambda a, b: a > b,
+    '<': lambda a, b: a < b,
+}
+
+_INCLUDES_PATTERN = re.compile(r'(\w+(?:\.\w+)?)\s*\.\s*includes\s*\(\s*["\'](.+?)["\']\s*\)')
+
+
+@lru_cache(maxsize=1024)
+def compile_condition(condition: str) -> Callable[['ClientProfile'], bool]:
+    """
+    Compile a conditional expression to a predicate over a ClientProfile.
+
+    Supports:
+    - organization.size >= 500
+    - organization.industry == "healthcare"
+    - compliance.includes("pci_dss")
+    - organization.size >= 50 and organization.industry == "healthcare"
+    """
+    condition = condition.strip()
+
+    # Handle AND/OR
+    if ' and ' in condition.lower():
+        parts = [compile_condition(p) for p in re.split(r'\s+and\s+', condition, flags=re.IGNORECASE)]
+        return lambda client: all(p(client) for p in parts)
+
+    if ' or ' in condition.lower():
+        parts = [compile_condition(p) for p in re.split(r'\s+or\s+', condition, flags=re.IGNORECASE)]
+        return lambda client: any(p(client) for p in parts)
+
+    # Handle NOT
+    if condition.lower().startswith('not '):
+        inner = compile_condition(condition[4:])
+        return lambda client: not inner(client)
+
+    # Handle includes/contains
+    includes_match = _INCLUDES_PATTERN.match(condition)
+    if includes_match:
+        list_name, value = includes_match.group(1), includes_match.group(2)
+
+        def includes(client):
+            items = client.get(list_name, [])
+            return value in items if isinstance(items, list) else False
+        return includes
+
+    # Handle comparison operators
+    for op, compare in _COMPARISONS.items():
+        if op in condition:
+            left_expr, right_expr = condition.split(op, 1)
+            left, right = _parse_operand(left_expr), _parse_operand(right_expr)
+
+            def comparison(client, left=left, right=right, compare=compare):
+                try:
+                    return compare(left(client), right(client))
+                except TypeError:
+                    return False
+            return comparison
+
+    # Handle simple boolean
+    def truthy(client):
+        value = client.get(condition)
+        return bool(value) if value is not None else False
+    return truthy
+
+
+class CompiledTemplate:
+    """
+    Template parsed once into a node tree.
+
+    Rendering for a client is a walk over the tree; conditions are
+    pre-compiled predicates, so no regex work happens per render.
+    Unbalanced block tags are kept as literal text.
+    """
+
+    __slots__ = ('nodes', 'variables', 'conditions', 'lists')
+
+    TAG_PATTERN = re.compile(
+        r'\{\{(?:#if\s+(.+?)|(#else)|(/if)|#each\s+(\w+)|(/each)|(this)|([A-Z_]+))\}\}',
+        re.DOTALL
+    )
+
+    def __init__(self, template: str):
+        root: List[Any] = []
+        # Open blocks: (node, raw opening tag, children list being filled)
+        stack: List[list] = []
+        variables = set()
+        conditions: List[Callable] = []
+        lists = set()
+
+        def children() -> List[Any]:
+            return stack[-1][2] if stack else root
+
+        pos = 0
+        for match in self.TAG_PATTERN.finditer(template):
+            if match.start() > pos:
+                children().append(_Text(template[pos:match.start()]))
+            pos = match.end()
+            raw = match.group(0)
+            condition, is_else, end_if, each_name, end_each, this, var = match.groups()
+            top = stack[-1][0] if stack else None
+
+            if var:
+                children().append(_Var(var))
+                variables.add(var)
+            elif condition is not None:
+                node = _If(compile_condition(condition.strip()))
+                conditions.append(node.condition)
+                stack.append([node, raw, node.then_nodes])
+            elif each_name:
+                node = _Each(each_name)
+                lists.add(each_name)
+                stack.append([node, raw, node.nodes])
+            elif is_else and isinstance(top, _If) and stack[-1][2] is top.then_nodes:
+                stack[-1][2] = top.else_nodes
+            elif end_if and isinstance(top, _If):
+                stack.pop()
+                _strip_edges(top.then_nodes)
+                _strip_edges(top.else_nodes)
+                children().append(top)
+            elif end_each and isinstance(top, _Each):
+                stack.pop()
+                children().append(top)
+            elif this and any(isinstance(frame[0], _Each) for frame in stack):
+                children().append(_This())
+            else:
+                children().append(_Text(raw))
+
+        if pos < len(template):
+            children().append(_Text(template[pos:]))
+
+        # Unclosed blocks fall back to literal text
+        while stack:
+            node, raw, current = stack.pop()
+            unwound = [_Text(raw)]
+            if isinstance(node, _If):
+                unwound += node.then_nodes
+                if current is node.else_nodes:
+                    unwound += [_Text('{{#else}}')] + node.else_nodes
+            else:
+                unwound += node.nodes
+            children().extend(unwound)
+
+        self.nodes = root
+        self.variables = frozenset(variables)
+        self.conditions = conditions
+        self.lists = sorted(lists)
+
+    def render(self, engine: 'VariableEngine', client: 'ClientProfile') -> str:
+        out: List[str] = []
+        for node in self.nodes:
+            node.render(engine, client, None, out)
+        return ''.join(out)
+
+    def footprint(self, engine: 'VariableEngine', client: 'ClientProfile') -> tuple:
+        """Everything about a client that can change this template's output"""
+        values = tuple(engine._resolve_variable(name, client) for name in sorted(self.variables))
+        outcomes = tuple(condition(client) for condition in self.conditions)
+        lists = []
+        for name in self.lists:
+            value = client.get(name, [])
+            if not isinstance(value, list):
+                lists.append(None)
+                continue
+            # Tokens inside list items are substituted too, so their values count
+            lists.append(tuple(
+                (text, tuple(engine._resolve_variable(token, client)
+                             for token in engine.SIMPLE_VAR_PATTERN.findall(text)))
+                for text in map(str, value)
+            ))
+        return values, outcomes, tuple(lists)
+
+
+@lru_cache(maxsize=512)
+def compile_template(template: str) -> CompiledTemplate:
+    """Compile (or fetch the cached) node tree for a template"""
+    return CompiledTemplate(template)
+
+
 class VariableEngine:
     """
     Handles all variable substitution and conditional logic
@@ -226,185 +625,63 @@ class VariableEngine:
         Returns:
             Rendered string with all substitutions applied
         """
-        result = template
+        return compile_template(template).render(self, client)
 
-        # Process conditionals first (may contain variables)
-        result = self._process_conditionals(result, client)
-
-        # Process each loops
-        result = self._process_each(result, client)
-
-        # Process simple variable substitution
-        result = self._substitute_variables(result, client)
-
-        # Clean up any remaining unsubstituted variables
-        result = self._cleanup_unsubstituted(result)
-
-        return result
-
-    def _substitute_variables(self, text: str, client: ClientProfile) -> str:
-        """Replace {{VARIABLE}} patterns with values"""
-
-        def replace(match):
-            var_name = match.group(1)
-
-            # Check client variables first
-            value = client.get(var_name)
-            if value is not None:
-                return str(value)
-
-            # Check computed variables
-            if var_name in self.computed:
-                return str(self.computed[var_name](client))
+    def render_batch(self, template: Union[str, CompiledTemplate],
+                     clients: Sequence[ClientProfile]) -> List[str]:
+        """
+        Render one template for many clients in one call.
 
-            # Check defaults
-            if var_name in self.variables:
-                var_def = self.variables[var_name]
-                if var_def.default is not None:
-                    return str(var_def.default)
+        The template is compiled once; clients whose variable values,
+        condition outcomes and list contents agree share a single render.
 
-            # Return placeholder
+        Returns:
+            Rendered strings, in the same order as ``clients``
+        """
+        compiled = template if isinstance(template, CompiledTemplate) else compile_template(template)
+
+        rendered: Dict[tuple, str] = {}
+        results = []
+        for client in clients:
+            key = compiled.footprint(self, client)
+            text = rendered.get(key)
+            if text is None:
+                text = rendered[key] = compiled.render(self, client)
+            results.append(text)
+        return results
+
+    def _resolve_variable(self, var_name: str, client: ClientProfile) -> str:
+        """Value for a {{VARIABLE}} token, or a [VARIABLE] placeholder"""
+        # Check client variables first, then computed variables, then defaults
+        value = client.get(var_name)
+        if value is not None:
+            text = str(value)
+        elif var_name in self.computed:
+            text = str(self.computed[var_name](client))
+        elif var_name in self.variables and self.variables[var_name].default is not None:
+            text = str(self.variables[var_name].default)
+        else:
             return f"[{var_name}]"
 
-        return self.SIMPLE_VAR_PATTERN.sub(replace, text)
-
-    def _process_conditionals(self, text: str, client: ClientProfile) -> str:
-        """Process {{#if}}...{{/if}} blocks"""
-
-        def replace(match):
-            condition = match.group(1).strip()
-            if_content = match.group(2)
-            else_content = match.group(3) or ""
-
-            if self._evaluate_condition(condition, client):
-                return if_content.strip()
-            else:
-                return else_content.strip()
-
-        # Process nested conditionals from innermost out
-        prev = None
-        while prev != text:
-            prev = text
-            text = self.CONDITIONAL_PATTERN.sub(replace, text)
-
+        # Tokens inside values are marked, never substituted
+        if '{{' in text:
+            text = self._cleanup_unsubstituted(text)
         return text
 
-    def _process_each(self, text: str, client: ClientProfile) -> str:
-        """Process {{#each}}...{{/each}} loops"""
-
-        def replace(match):
-            list_name = match.group(1)
-            content = match.group(2)
-
-            items = client.get(list_name, [])
-            if not isinstance(items, list):
-                return ""
-
-            results = []
-            for item in items:
-                # Replace {{this}} with item value
-                rendered = content.replace('{{this}}', str(item))
-                results.append(rendered.strip())
-
-            return '\n'.join(results)
-
-        return self.EACH_PATTERN.sub(replace, text)
-
     def _evaluate_condition(self, condition: str, client: ClientProfile) -> bool:
-        """
-        Evaluate a conditional expression
-
-        Supports:
-        - organization.size >= 500
-        - organization.industry == "healthcare"
-        - compliance.includes("pci_dss")
-        - organization.size >= 50 and organization.industry == "healthcare"
-        """
-        condition = condition.strip()
-
-        # Handle AND/OR
-        if ' and ' in condition.lower():
-            parts = re.split(r'\s+and\s+', condition, flags=re.IGNORECASE)
-            return all(self._evaluate_condition(p, client) for p in parts)
-
-        if ' or ' in condition.lower():
-            parts = re.split(r'\s+or\s+', condition, flags=re.IGNORECASE)
-            return any(self._evaluate_condition(p, client) for p in parts)
-
-        # Handle NOT
-        if condition.lower().startswith('not '):
-            return not self._evaluate_condition(condition[4:], client)
-
-        # Handle includes/contains
-        includes_match = re.match(r'(\w+(?:\.\w+)?)\s*\.\s*includes\s*\(\s*["\'](.+?)["\']\s*\)', condition)
-        if includes_match:
-            list_name = includes_match.group(1)
-            value = includes_match.group(2)
-            items = client.get(list_name, [])
-            if isinstance(items, list):
-                return value in items
-            return False
-
-        # Handle comparison operators
-        for op in ['>=', '<=', '!=', '==', '>', '<']:
-            if op in condition:
-                parts = condition.split(op, 1)
-                if len(parts) == 2:
-                    left = self._get_value(parts[0].strip(), client)
-                    right = self._get_value(parts[1].strip(), client)
-                    return self._compare(left, right, op)
-
-        # Handle simple boolean
-        value = client.get(condition)
-        if value is not None:
-            return bool(value)
-
-        return False
+        """Evaluate a conditional expression (compiled once, then cached)"""
+        return compile_condition(condition.strip())(client)
 
     def _get_value(self, expr: str, client: ClientProfile) -> Any:
         """Get value from expression (variable name or literal)"""
-        expr = expr.strip()
-
-        # String literal
-        if (expr.startswith('"') and expr.endswith('"')) or \
-           (expr.startswith("'") and expr.endswith("'")):
-            return expr[1:-1]
-
-        # Number literal
-        try:
-            if '.' in expr:
-                return float(expr)
-            return int(expr)
-        except ValueError:
-            pass
-
-        # Boolean literal
-        if expr.lower() == 'true':
-            return True
-        if expr.lower() == 'false':
-            return False
-
-        # Variable reference
-        return client.get(expr)
+        return _parse_operand(expr)(client)
 
     def _compare(self, left: Any, right: Any, op: str) -> bool:
         """Compare two values with operator"""
         try:
-            if op == '==':
-                return left == right
-            elif op == '!=':
-                return left != right
-            elif op == '>':
-                return left > right
-            elif op == '<':
-                return left < right
-            elif op == '>=':
-                return left >= right
-            elif op == '<=':
-                return left <= right
-        except TypeError:
+            return _COMPARISONS[op](left, right)
+        except (KeyError, TypeError):
             return False
-        return False
 
     def _cleanup_unsubstituted(self, text: str) -> str:
         """Mark remaining unsubstituted variables"""
@@ -117,6 +117,28 @@ class ClientManager:
             )
         ''')
 
+        # Rendered content hash of each policy in a generation
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS generation_policies (
+                generation_id TEXT NOT NULL,
+                policy_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                PRIMARY KEY (generation_id, policy_id),
+                FOREIGN KEY (generation_id) REFERENCES policy_generations(id)
+            )
+        ''')
+
+        # Generated variable values (e.g. dates) a later delta generation reuses
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS generation_variables (
+                generation_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (generation_id, name),
+                FOREIGN KEY (generation_id) REFERENCES policy_generations(id)
+            )
+        ''')
+
         # Compliance status table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS compliance_status (
@@ -265,12 +287,30 @@ class ClientManager:
         conn.close()
         return self.get_client(client_id)
 
+    def set_variable(self, client_id: str, name: str, value: str) -> Optional[Client]:
+        """Set a single template variable for a client"""
+        client = self.get_client(client_id)
+        if not client:
+            return None
+
+        variables = client.variables.copy()
+        variables[name] = value
+        return self.update_client(client_id, variables=variables)
+
     def delete_client(self, client_id: str) -> bool:
         """Delete a client and all related records"""
         conn = self._get_conn()
         cursor = conn.cursor()
 
         cursor.execute('DELETE FROM compliance_status WHERE client_id = ?', (client_id,))
+        cursor.execute('''
+            DELETE FROM generation_policies WHERE generation_id IN
+                (SELECT id FROM policy_generations WHERE client_id = ?)
+        ''', (client_id,))
+        cursor.execute('''
+            DELETE FROM generation_variables WHERE generation_id IN
+                (SELECT id FROM policy_generations WHERE client_id = ?)
+        ''', (client_id,))
         cursor.execute('DELETE FROM policy_generations WHERE client_id = ?', (client_id,))
         cursor.execute('DELETE FROM clients WHERE id = ?', (client_id,))
 
@@ -285,8 +325,18 @@ class ClientManager:
 
     def record_generation(self, client_id: str, policies_count: int,
                           frameworks: List[str], output_format: str,
-                          output_path: str, incomplete_count: int = 0) -> PolicyGeneration:
-        """Record a policy generation"""
+                          output_path: str, incomplete_count: int = 0,
+                          policy_hashes: Optional[Dict[str, str]] = None,
+                          variables: Optional[Dict[str, str]] = None) -> PolicyGeneration:
+        """
+        Record a policy generation.
+
+        Args:
+            policy_hashes: Rendered content hash per policy ID, the baseline
+                for the client's next delta generation
+            variables: Generated variable values (such as the effective
+                date) for the next delta generation to reuse
+        """
         gen = PolicyGeneration(
             id=str(uuid.uuid4())[:8],
             client_id=client_id,
@@ -310,11 +360,34 @@ class ClientManager:
             json.dumps(gen.frameworks), gen.output_format, gen.output_path,
             gen.incomplete_count, gen.status
         ))
+        if policy_hashes:
+            cursor.executemany('''
+                INSERT INTO generation_policies (generation_id, policy_id, content_hash)
+                VALUES (?, ?, ?)
+            ''', [(gen.id, policy_id, digest) for policy_id, digest in policy_hashes.items()])
+        if variables:
+            cursor.executemany('''
+                INSERT INTO generation_variables (generation_id, name, value)
+                VALUES (?, ?, ?)
+            ''', [(gen.id, name, value) for name, value in variables.items()])
         conn.commit()
         conn.close()
 
         return gen
 
+    def _row_to_generation(self, row: sqlite3.Row) -> PolicyGeneration:
+        return PolicyGeneration(
+            id=row['id'],
+            client_id=row['client_id'],
+            generated_at=row['generated_at'],
+            policies_count=row['policies_count'],
+            frameworks=json.loads(row['frameworks']),
+            output_format=row['output_format'],
+            output_path=row['output_path'],
+            incomplete_count=row['incomplete_count'],
+            status=row['status']
+        )
+
     def get_client_generations(self, client_id: str) -> List[PolicyGeneration]:
         """Get all generations for a client"""
         conn = self._get_conn()
@@ -327,17 +400,52 @@ class ClientManager:
         rows = cursor.fetchall()
         conn.close()
 
-        return [PolicyGeneration(
-            id=row['id'],
-            client_id=row['client_id'],
-            generated_at=row['generated_at'],
-            policies_count=row['policies_count'],
-            frameworks=json.loads(row['frameworks']),
-            output_format=row['output_format'],
-            output_path=row['output_path'],
-            incomplete_count=row['incomplete_count'],
-            status=row['status']
-        ) for row in rows]
+        return [self._row_to_generation(row) for row in rows]
+
+    def get_latest_generation(self, client_id: str,
+                              hashed_only: bool = False) -> Optional[PolicyGeneration]:
+        """
+        Get a client's most recent generation.
+
+        Args:
+            hashed_only: Skip generations recorded without policy hashes
+        """
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        query = 'SELECT * FROM policy_generations g WHERE client_id = ?'
+        if hashed_only:
+            query += ' AND EXISTS (SELECT 1 FROM generation_policies p WHERE p.generation_id = g.id)'
+        cursor.execute(query + ' ORDER BY generated_at DESC LIMIT 1', (client_id,))
+        row = cursor.fetchone()
+        conn.close()
+
+        return self._row_to_generation(row) if row else None
+
+    def get_generation_hashes(self, generation_id: str) -> Dict[str, str]:
+        """Rendered content hash per policy ID recorded with a generation"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT policy_id, content_hash FROM generation_policies
+            WHERE generation_id = ?
+        ''', (generation_id,))
+        rows = cursor.fetchall()
+        conn.close()
+
+        return {row['policy_id']: row['content_hash'] for row in rows}
+
+    def get_generation_variables(self, generation_id: str) -> Dict[str, str]:
+        """Generated variable values recorded with a generation"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT name, value FROM generation_variables
+            WHERE generation_id = ?
+        ''', (generation_id,))
+        rows = cursor.fetchall()
+        conn.close()
+
+        return {row['name']: row['value'] for row in rows}
 
     # =========================================================================
     # COMPLIANCE STATUS
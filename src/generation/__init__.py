@@ -3,10 +3,19 @@ Policy Generation Module
 Handles building and exporting policy packages
 """
 
-from .package_builder import PackageBuilder, ClientConfig, PackageResult, PolicyDocument
+from .package_builder import (
+    PackageBuilder, ClientConfig, PackageResult, PolicyDocument, RenderCache, PackageStream,
+    PackageDelta
+)
 from .html_exporter import HtmlExporter
+from .bulk_runner import BulkRunner, BulkJob, BulkResult
+from .run_manifest import RunManifest, BulkRun
+from .output_cache import OutputCache
+from .progress import ProgressEvent
 
-__all__ = ['PackageBuilder', 'ClientConfig', 'PackageResult', 'PolicyDocument', 'HtmlExporter']
+__all__ = ['PackageBuilder', 'ClientConfig', 'PackageResult', 'PolicyDocument', 'RenderCache',
+           'PackageStream', 'PackageDelta', 'HtmlExporter', 'BulkRunner', 'BulkJob', 'BulkResult',
+           'RunManifest', 'BulkRun', 'OutputCache', 'ProgressEvent']
 
 try:
     from .docx_exporter import DocxExporter
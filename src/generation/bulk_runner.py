@@ -0,0 +1,479 @@
+"""
+Bulk Runner Module
+Generates and exports policy packages for many clients
+
+Serial runs render clients in batches with one builder.  Parallel runs
+fan clients out to worker processes, each of which keeps a warm
+PackageBuilder and exporters for the whole run.  With an OutputCache,
+clients whose packages are unchanged since an earlier run are linked from
+the cache instead of being rebuilt.
+"""
+
+import json
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from queue import Empty
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .output_cache import OutputCache, file_sha256
+from .package_builder import ClientConfig, PackageBuilder, PackageResult
+
+
+# Clients rendered together by a serial run
+BULK_BATCH_SIZE = 25
+
+# Package formats a bulk run can export, with their file extensions
+EXPORT_FORMATS = {'docx': 'docx', 'pdf': 'pdf', 'html': 'html'}
+
+# Seconds past a client's timeout before the parent stops waiting for its worker
+TIMEOUT_GRACE = 5.0
+
+# Seconds between checks for newly started jobs while some have not started
+STARTED_POLL = 1.0
+
+
+class ClientTimeout(BaseException):
+    """
+    A client's package took longer than the per-client timeout.
+
+    Raised from a signal handler anywhere in the builder or an exporter,
+    so it derives from BaseException to get past their ``except Exception``
+    handlers.
+    """
+
+
+@dataclass
+class BulkJob:
+    """One client's package to build and export"""
+    client_id: str
+    config: ClientConfig
+    output_dir: str
+    formats: List[str]
+    base_name: str
+
+
+@dataclass
+class BulkResult:
+    """Outcome of one client in a bulk run"""
+    client_id: str
+    client: str
+    status: str  # success, error, timeout
+    formats: List[str] = field(default_factory=list)
+    files: List[str] = field(default_factory=list)
+    hashes: Dict[str, str] = field(default_factory=dict)  # file -> sha256
+    total_policies: int = 0
+    incomplete_count: int = 0
+    error: str = ""
+    duration: float = 0.0
+    cached: bool = False  # every file came from the output cache
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class BulkProgress:
+    """Running totals reported after each client finishes"""
+    total: int
+    completed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self) -> float:
+        """Clients finished per second"""
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Estimated seconds until the run finishes"""
+        if not self.completed:
+            return None
+        return (self.total - self.completed) / self.rate
+
+    def record(self, result: BulkResult) -> None:
+        self.completed += 1
+        if result.status == 'success':
+            self.succeeded += 1
+        elif result.status == 'timeout':
+            self.timed_out += 1
+        else:
+            self.failed += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'completed': self.completed,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'timed_out': self.timed_out,
+            'elapsed_seconds': round(self.elapsed, 2),
+        }
+
+
+def default_workers() -> int:
+    """CPUs this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def client_config(client, frameworks: Optional[List[str]] = None) -> ClientConfig:
+    """Package configuration for a CRM client record"""
+    variables = client.variables.copy()
+    variables.setdefault('ORGANIZATION_NAME', client.name)
+    variables.setdefault('CSO_TITLE', 'Chief Security Officer')
+    return ClientConfig(
+        name=client.name,
+        variables=variables,
+        frameworks=frameworks or client.target_frameworks
+    )
+
+
+def load_exporter(format: str):
+    """Exporter instance for a format, or None if its dependency is missing"""
+    try:
+        if format == 'docx':
+            from .docx_exporter import DocxExporter
+            return DocxExporter()
+        if format == 'pdf':
+            from .pdf_exporter import PdfExporter
+            return PdfExporter()
+        if format == 'html':
+            from .html_exporter import HtmlExporter
+            return HtmlExporter()
+    except ImportError:
+        return None
+    raise ValueError(f"Unknown export format: {format}")
+
+
+@contextmanager
+def _deadline(seconds: Optional[float]):
+    """Raise ClientTimeout in this thread after `seconds` (Unix main thread only)"""
+    if not seconds or not hasattr(signal, 'SIGALRM') or \
+            threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def expire(signum, frame):
+        raise ClientTimeout(f"Timed out after {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def get_exporter(exporters: Dict[str, Any], format: str):
+    """Exporter for a format, loaded once per run (None if unavailable)"""
+    if format not in exporters:
+        exporters[format] = load_exporter(format)
+    return exporters[format]
+
+
+def job_path(job: BulkJob, format: str) -> Path:
+    return Path(job.output_dir) / f"{job.base_name}.{EXPORT_FORMATS[format]}"
+
+
+def export_result(result: PackageResult, job: BulkJob, exporters: Dict[str, Any],
+                  cache: Optional[OutputCache] = None, package_key: Optional[str] = None
+                  ) -> BulkResult:
+    """
+    Export a built package in each of the job's formats.
+
+    With a cache, each file is exported once into the cache and linked to
+    the job's output path, so it is evicted along with the cached file.
+    """
+    outcome = BulkResult(
+        client_id=job.client_id,
+        client=job.config.name,
+        status='success',
+        total_policies=result.total_policies,
+        incomplete_count=result.incomplete_count
+    )
+    info = {'total_policies': result.total_policies, 'incomplete_count': result.incomplete_count}
+    for format in job.formats:
+        exporter = get_exporter(exporters, format)
+        if exporter is None:
+            continue
+        path = job_path(job, format)
+        if cache is not None and package_key:
+            entry = cache.export(cache.key(package_key, format, exporter), job.config.name, format,
+                                 lambda partial: exporter.export_package(result, partial), info)
+            cache.link(entry, str(path))
+            outcome.hashes[str(path)] = entry.sha256
+        else:
+            exporter.export_package(result, str(path))
+            outcome.hashes[str(path)] = file_sha256(path)
+        outcome.formats.append(format)
+        outcome.files.append(str(path))
+    return outcome
+
+
+def cached_entries(job: BulkJob, exporters: Dict[str, Any], cache: OutputCache,
+                   package_key: str) -> Optional[Dict[str, Any]]:
+    """Cached file per format, or None unless every available format is cached"""
+    entries = {}
+    for format in job.formats:
+        exporter = get_exporter(exporters, format)
+        if exporter is None:
+            continue
+        entry = cache.get(cache.key(package_key, format, exporter))
+        if entry is None:
+            return None
+        entries[format] = entry
+    return entries or None
+
+
+def restore_cached(job: BulkJob, entries: Dict[str, Any], cache: OutputCache) -> BulkResult:
+    """Link a job's cached files to its output paths"""
+    info = next(iter(entries.values())).info
+    outcome = BulkResult(
+        client_id=job.client_id,
+        client=job.config.name,
+        status='success',
+        total_policies=info.get('total_policies', 0),
+        incomplete_count=info.get('incomplete_count', 0),
+        cached=True
+    )
+    for format, entry in entries.items():
+        path = job_path(job, format)
+        cache.link(entry, str(path))
+        outcome.formats.append(format)
+        outcome.files.append(str(path))
+        outcome.hashes[str(path)] = entry.sha256
+    return outcome
+
+
+def run_job(job: BulkJob, builder: PackageBuilder, exporters: Dict[str, Any],
+            timeout: Optional[float] = None, result: Optional[PackageResult] = None,
+            cache: Optional[OutputCache] = None) -> BulkResult:
+    """Build (unless already built or cached) and export one client's package
+
+    Without a prebuilt result the package is streamed, so a worker renders
+    and writes one policy at a time.
+    """
+    started = time.monotonic()
+    try:
+        with _deadline(timeout):
+            package_key = builder.package_key(job.config) if cache is not None else None
+            entries = cached_entries(job, exporters, cache, package_key) if package_key else None
+            if entries:
+                outcome = restore_cached(job, entries, cache)
+            else:
+                if result is None:
+                    result = builder.stream_package(job.config)
+                outcome = export_result(result, job, exporters, cache, package_key)
+    except ClientTimeout as e:
+        outcome = BulkResult(job.client_id, job.config.name, 'timeout', error=str(e))
+    except Exception as e:
+        outcome = BulkResult(job.client_id, job.config.name, 'error', error=str(e))
+    outcome.duration = round(time.monotonic() - started, 3)
+    return outcome
+
+
+_worker_builder: Optional[PackageBuilder] = None
+_worker_exporters: Dict[str, Any] = {}
+_worker_cache: Optional[OutputCache] = None
+_worker_started = None  # queue of (job index, wall-clock start) for the parent's backstop
+
+
+def _init_bulk_worker(policies_dir: str, frameworks_dir: Optional[str],
+                      cache: Optional[OutputCache] = None, started=None):
+    global _worker_builder, _worker_cache, _worker_started
+    _worker_builder = PackageBuilder(policies_dir, frameworks_dir)
+    _worker_exporters.clear()
+    _worker_cache = cache
+    _worker_started = started
+
+
+def _run_in_worker(index: int, job: BulkJob, timeout: Optional[float]) -> BulkResult:
+    if _worker_started is not None:
+        _worker_started.put((index, time.time()))
+    return run_job(job, _worker_builder, _worker_exporters, timeout, cache=_worker_cache)
+
+
+class BulkRunner:
+    """
+    Builds and exports packages for a list of clients.
+
+    Usage:
+        runner = BulkRunner(builder, workers=8, timeout=300, cache=output_cache)
+        results = runner.run(jobs, on_result=lambda result, progress: ...)
+    """
+
+    def __init__(self, builder: PackageBuilder, workers: int = 1,
+                 timeout: Optional[float] = None, cache: Optional[OutputCache] = None):
+        self.builder = builder
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.cache = cache
+        self.progress: Optional[BulkProgress] = None
+
+    def run(self, jobs: List[BulkJob],
+            on_result: Optional[Callable[[BulkResult, BulkProgress], None]] = None
+            ) -> List[BulkResult]:
+        """
+        Run every job, reporting each result as it finishes.
+
+        Returns:
+            Results in the same order as ``jobs``
+        """
+        self.progress = BulkProgress(total=len(jobs))
+        results: List[Optional[BulkResult]] = [None] * len(jobs)
+
+        runs = self._run_parallel(jobs) if self.workers > 1 and len(jobs) > 1 \
+            else self._run_serial(jobs)
+        for index, result in runs:
+            results[index] = result
+            self.progress.record(result)
+            if on_result:
+                on_result(result, self.progress)
+
+        return results
+
+    def _run_serial(self, jobs: List[BulkJob]) -> Iterator:
+        """Render a batch of clients at a time so each policy is rendered once per batch"""
+        exporters: Dict[str, Any] = {}
+        for start in range(0, len(jobs), BULK_BATCH_SIZE):
+            batch = jobs[start:start + BULK_BATCH_SIZE]
+            to_build = [job for job in batch if not self._is_cached(job, exporters)]
+            try:
+                # Shared renders make a batch cost about one client; past one
+                # client's timeout, build each client alone under its own deadline
+                with _deadline(self.timeout):
+                    built = dict(zip(map(id, to_build),
+                                     self.builder.build_packages([job.config for job in to_build])))
+            except (Exception, ClientTimeout):
+                # Build each client alone so one bad client does not fail the batch
+                built = {}
+
+            for offset, job in enumerate(batch):
+                yield start + offset, run_job(job, self.builder, exporters, self.timeout,
+                                              built.get(id(job)), self.cache)
+
+    def _is_cached(self, job: BulkJob, exporters: Dict[str, Any]) -> bool:
+        if self.cache is None:
+            return False
+        try:
+            package_key = self.builder.package_key(job.config)
+            return cached_entries(job, exporters, self.cache, package_key) is not None
+        except Exception:
+            return False
+
+    def _run_parallel(self, jobs: List[BulkJob]) -> Iterator:
+        """Fan jobs out to worker processes, keeping at most `workers` in flight"""
+        builder = self.builder
+        frameworks_dir = str(builder.frameworks_dir) if builder.frameworks_dir else None
+        pending = iter(enumerate(jobs))
+        in_flight: Dict[Future, tuple] = {}
+        abandoned: List[Future] = []
+        # Workers report when they start a job, so queued jobs are not timed
+        started_queue = multiprocessing.Queue() if self.timeout else None
+        started: Dict[int, float] = {}
+
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_bulk_worker,
+                                   initargs=(str(builder.policies_dir), frameworks_dir, self.cache,
+                                             started_queue))
+        try:
+            def submit_next() -> bool:
+                for index, job in pending:
+                    future = pool.submit(_run_in_worker, index, job, self.timeout)
+                    in_flight[future] = (index, job)
+                    return True
+                return False
+
+            for _ in range(self.workers):
+                if not submit_next():
+                    break
+
+            while in_flight:
+                done, _ = wait(list(in_flight), timeout=self._wait_timeout(in_flight, started),
+                               return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index, job = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = BulkResult(job.client_id, job.config.name, 'error', error=str(e))
+                    yield index, result
+                    submit_next()
+
+                # Backstop for platforms where the worker cannot time itself out
+                if self.timeout:
+                    _drain_started(started_queue, started)
+                    limit = self.timeout + TIMEOUT_GRACE
+                    now = time.time()
+                    for future, (index, job) in list(in_flight.items()):
+                        if index in started and now - started[index] > limit:
+                            in_flight.pop(future)
+                            abandoned.append(future)
+                            yield index, BulkResult(job.client_id, job.config.name, 'timeout',
+                                                    error=f"Timed out after {self.timeout:g}s",
+                                                    duration=round(now - started[index], 3))
+                            submit_next()
+
+                    # An abandoned worker keeps its slot until it returns; once
+                    # every slot is stuck, the remaining jobs can never start
+                    if sum(not future.done() for future in abandoned) >= self.workers:
+                        for index, job in [*in_flight.values(), *pending]:
+                            yield index, BulkResult(job.client_id, job.config.name, 'error',
+                                                    error="Not started: every worker is stuck "
+                                                          "in a timed-out client")
+                        in_flight.clear()
+        finally:
+            # Don't block on workers still stuck in an abandoned client
+            pool.shutdown(wait=not in_flight and not abandoned, cancel_futures=True)
+
+    def _wait_timeout(self, in_flight: Dict[Future, tuple],
+                      started: Dict[int, float]) -> Optional[float]:
+        if not self.timeout:
+            return None
+        now = time.time()
+        deadlines = [started[index] + self.timeout + TIMEOUT_GRACE
+                     for index, _ in in_flight.values() if index in started]
+        if len(deadlines) < len(in_flight):
+            # Check again soon for jobs that have started since
+            deadlines.append(now + STARTED_POLL)
+        return max(0.0, min(deadlines) - now)
+
+
+def _drain_started(queue, started: Dict[int, float]) -> None:
+    """Record the start times workers have reported so far"""
+    while True:
+        try:
+            index, at = queue.get_nowait()
+        except Empty:
+            return
+        started[index] = at
+
+
+def write_results(path: str, results: List[BulkResult], progress: BulkProgress,
+                  **metadata) -> None:
+    """Write a machine-readable summary of a bulk run as JSON"""
+    report = {
+        'finished_at': datetime.now().isoformat(),
+        **metadata,
+        'summary': progress.to_dict(),
+        'clients': [result.to_dict() for result in results if result is not None],
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(report, indent=2), encoding='utf-8')
@@ -3,9 +3,12 @@ DOCX Exporter Module
 Exports policy packages to Microsoft Word format
 """
 
-import re
+import os
+import shutil
+import tempfile
+import zipfile
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional
 from datetime import datetime
 
 try:
@@ -18,7 +21,12 @@ try:
 except ImportError:
     DOCX_AVAILABLE = False
 
+from .markdown_ir import HEADING, LIST, Block, Span
 from .package_builder import PackageResult, PolicyDocument
+from .progress import EXPORT, SAVE, SAVED, ProgressCallback, notify
+
+# Placeholder paragraph that spooled policy XML replaces when the package is saved
+SPOOL_MARKER = "__POLICY_BODY_SPOOL__"
 
 
 class DocxExporter:
@@ -30,6 +38,9 @@ class DocxExporter:
         exporter.export_package(result, "output/acme_policies.docx")
     """
 
+    # Bump whenever the exported output changes; part of the output cache key
+    EXPORTER_VERSION = "2"
+
     def __init__(self):
         if not DOCX_AVAILABLE:
             raise ImportError(
@@ -75,130 +86,26 @@ class DocxExporter:
                 else:
                     heading_font.size = Pt(11)
 
-    def _parse_markdown_to_docx(self, doc: Document, content: str):
-        """Convert markdown content to Word document elements"""
-        lines = content.split('\n')
-        in_list = False
-        list_items = []
-
-        for line in lines:
-            stripped = line.strip()
-
-            # Skip empty lines
-            if not stripped:
-                if in_list and list_items:
-                    self._add_list(doc, list_items)
-                    list_items = []
-                    in_list = False
-                continue
-
-            # Headings
-            if stripped.startswith('######'):
-                doc.add_heading(stripped[6:].strip(), level=6)
-            elif stripped.startswith('#####'):
-                doc.add_heading(stripped[5:].strip(), level=5)
-            elif stripped.startswith('####'):
-                doc.add_heading(stripped[4:].strip(), level=4)
-            elif stripped.startswith('###'):
-                doc.add_heading(stripped[3:].strip(), level=3)
-            elif stripped.startswith('##'):
-                doc.add_heading(stripped[2:].strip(), level=2)
-            elif stripped.startswith('#'):
-                doc.add_heading(stripped[1:].strip(), level=1)
-
-            # Lists
-            elif stripped.startswith('- ') or stripped.startswith('* '):
-                in_list = True
-                list_items.append(stripped[2:])
-
-            elif re.match(r'^\d+\.\s', stripped):
-                in_list = True
-                list_items.append(re.sub(r'^\d+\.\s', '', stripped))
-
-            # Regular paragraphs
+    def _add_blocks(self, doc: Document, blocks: List[Block]):
+        """Add parsed Markdown blocks to the document"""
+        for block in blocks:
+            if block.kind == HEADING:
+                doc.add_heading(block.text, level=block.level)
+            elif block.kind == LIST:
+                # Numbered items are bulleted too: Word's list numbering
+                # would otherwise continue from one policy to the next
+                for item in block.items:
+                    self._add_formatted_runs(doc.add_paragraph(style='List Bullet'), item)
             else:
-                if in_list and list_items:
-                    self._add_list(doc, list_items)
-                    list_items = []
-                    in_list = False
-
-                # Process inline formatting
-                formatted_text = self._process_inline_formatting(stripped)
-                p = doc.add_paragraph()
-                self._add_formatted_runs(p, formatted_text)
-
-        # Handle remaining list items
-        if list_items:
-            self._add_list(doc, list_items)
-
-    def _add_list(self, doc: Document, items: List[str]):
-        """Add a bulleted list to the document"""
-        for item in items:
-            p = doc.add_paragraph(style='List Bullet')
-            formatted_text = self._process_inline_formatting(item)
-            self._add_formatted_runs(p, formatted_text)
-
-    def _process_inline_formatting(self, text: str) -> List[Dict[str, Any]]:
-        """Process inline markdown formatting and return list of text runs"""
-        runs = []
-        current_pos = 0
-
-        # Find bold (**text**) and italic (*text*) markers
-        pattern = r'(\*\*.*?\*\*|\*.*?\*|`.*?`)'
-
-        for match in re.finditer(pattern, text):
-            # Add text before the match
-            if match.start() > current_pos:
-                runs.append({
-                    'text': text[current_pos:match.start()],
-                    'bold': False,
-                    'italic': False,
-                    'code': False
-                })
-
-            matched_text = match.group()
-            if matched_text.startswith('**') and matched_text.endswith('**'):
-                runs.append({
-                    'text': matched_text[2:-2],
-                    'bold': True,
-                    'italic': False,
-                    'code': False
-                })
-            elif matched_text.startswith('`') and matched_text.endswith('`'):
-                runs.append({
-                    'text': matched_text[1:-1],
-                    'bold': False,
-                    'italic': False,
-                    'code': True
-                })
-            elif matched_text.startswith('*') and matched_text.endswith('*'):
-                runs.append({
-                    'text': matched_text[1:-1],
-                    'bold': False,
-                    'italic': True,
-                    'code': False
-                })
-
-            current_pos = match.end()
-
-        # Add remaining text
-        if current_pos < len(text):
-            runs.append({
-                'text': text[current_pos:],
-                'bold': False,
-                'italic': False,
-                'code': False
-            })
-
-        return runs if runs else [{'text': text, 'bold': False, 'italic': False, 'code': False}]
-
-    def _add_formatted_runs(self, paragraph, runs: List[Dict[str, Any]]):
+                self._add_formatted_runs(doc.add_paragraph(), block.spans)
+
+    def _add_formatted_runs(self, paragraph, spans: List[Span]):
         """Add formatted text runs to a paragraph"""
-        for run_data in runs:
-            run = paragraph.add_run(run_data['text'])
-            run.bold = run_data.get('bold', False)
-            run.italic = run_data.get('italic', False)
-            if run_data.get('code', False):
+        for span in spans:
+            run = paragraph.add_run(span.text)
+            run.bold = span.bold
+            run.italic = span.italic
+            if span.code:
                 run.font.name = 'Consolas'
                 run.font.size = Pt(10)
 
@@ -226,22 +133,29 @@ class DocxExporter:
         doc.add_paragraph("─" * 50)
 
         # Policy content
-        self._parse_markdown_to_docx(doc, policy.content)
+        self._add_blocks(doc, policy.blocks)
 
         # Add page break before next policy
         doc.add_page_break()
 
     def export_package(self, result: PackageResult, output_path: str,
                        include_toc: bool = True,
-                       include_metadata: bool = True):
+                       include_metadata: bool = True,
+                       progress: Optional[ProgressCallback] = None):
         """
         Export a complete policy package to DOCX.
 
+        Each policy's body XML is moved out to a spool file once written,
+        so the document tree only ever holds one policy; the spool is
+        spliced into word/document.xml when the package is saved.
+
         Args:
-            result: PackageResult from PackageBuilder
+            result: PackageResult (or PackageStream) from PackageBuilder
             output_path: Path for the output DOCX file
             include_toc: Include table of contents
             include_metadata: Include policy metadata headers
+            progress: Called with an 'export' ProgressEvent per policy
+                spooled (bytes of body XML), then 'save' while zipping
         """
         doc = self.create_document(result.client_name)
 
@@ -252,17 +166,63 @@ class DocxExporter:
         if include_toc:
             self._add_table_of_contents(doc, result)
 
-        # Export each policy
-        for policy in sorted(result.policies, key=lambda p: (p.category, p.title)):
-            self.export_policy(doc, policy, include_metadata)
-
-        # Save document
         output = Path(output_path)
         output.parent.mkdir(parents=True, exist_ok=True)
-        doc.save(str(output))
 
+        marker = doc.add_paragraph(SPOOL_MARKER)._p
+        body = doc.element.body
+        with tempfile.TemporaryFile(dir=output.parent) as spool:
+            # Export each policy
+            for count, policy in enumerate(result.iter_documents(), 1):
+                self.export_policy(doc, policy, include_metadata)
+                self._spool_elements(body, marker, spool)
+                notify(progress, EXPORT, current=count, total=result.total_policies,
+                       format='docx', item=policy.id, bytes_written=spool.tell())
+
+            # Save document
+            notify(progress, SAVE, current=result.total_policies, total=result.total_policies,
+                   format='docx', bytes_written=spool.tell())
+            spool.seek(0)
+            self._save_with_spool(doc, output, spool)
+
+        notify(progress, SAVED, current=result.total_policies, total=result.total_policies,
+               format='docx', bytes_written=output.stat().st_size)
         return output
 
+    def _spool_elements(self, body, marker, spool):
+        """Move the body elements added after the marker into the spool file"""
+        from lxml import etree
+
+        for element in list(marker.itersiblings()):
+            if element.tag.endswith('}sectPr'):
+                continue
+            spool.write(etree.tostring(element, encoding='utf-8'))
+            body.remove(element)
+
+    def _save_with_spool(self, doc: Document, output: Path, spool):
+        """Save the document, replacing the marker paragraph with the spooled XML"""
+        fd, staged = tempfile.mkstemp(suffix='.docx', dir=output.parent)
+        os.close(fd)
+        try:
+            doc.save(staged)
+            with zipfile.ZipFile(staged) as source, \
+                    zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as target:
+                for item in source.infolist():
+                    if item.filename != 'word/document.xml':
+                        target.writestr(item, source.read(item.filename))
+                        continue
+
+                    xml = source.read(item.filename)
+                    at = xml.index(SPOOL_MARKER.encode())
+                    start = max(xml.rfind(b'<w:p>', 0, at), xml.rfind(b'<w:p ', 0, at))
+                    end = xml.index(b'</w:p>', at) + len(b'</w:p>')
+                    with target.open(item.filename, 'w') as f:
+                        f.write(xml[:start])
+                        shutil.copyfileobj(spool, f)
+                        f.write(xml[end:])
+        finally:
+            os.unlink(staged)
+
     def _add_cover_page(self, doc: Document, result: PackageResult):
         """Add a cover page to the document"""
         # Add some spacing at top
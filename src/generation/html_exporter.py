@@ -3,11 +3,12 @@ HTML Exporter Module
 Exports policy packages to standalone HTML format
 """
 
-import re
 from pathlib import Path
 from typing import Optional
 
+from .markdown_ir import blocks_to_html
 from .package_builder import PackageResult, PolicyDocument
+from .progress import EXPORT, SAVED, ProgressCallback, notify
 
 
 class HtmlExporter:
@@ -19,49 +20,8 @@ class HtmlExporter:
         exporter.export_package(result, "output/policies.html")
     """
 
-    def _markdown_to_html(self, content: str) -> str:
-        """Convert markdown content to HTML"""
-        html = content
-
-        # Headers
-        html = re.sub(r'^###### (.+)$', r'<h6>\1</h6>', html, flags=re.MULTILINE)
-        html = re.sub(r'^##### (.+)$', r'<h5>\1</h5>', html, flags=re.MULTILINE)
-        html = re.sub(r'^#### (.+)$', r'<h4>\1</h4>', html, flags=re.MULTILINE)
-        html = re.sub(r'^### (.+)$', r'<h3>\1</h3>', html, flags=re.MULTILINE)
-        html = re.sub(r'^## (.+)$', r'<h2>\1</h2>', html, flags=re.MULTILINE)
-        html = re.sub(r'^# (.+)$', r'<h1>\1</h1>', html, flags=re.MULTILINE)
-
-        # Bold and italic
-        html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html)
-        html = re.sub(r'\*(.+?)\*', r'<em>\1</em>', html)
-
-        # Code
-        html = re.sub(r'`(.+?)`', r'<code>\1</code>', html)
-
-        # Lists
-        lines = html.split('\n')
-        in_list = False
-        result = []
-        for line in lines:
-            if line.strip().startswith('- ') or line.strip().startswith('* '):
-                if not in_list:
-                    result.append('<ul>')
-                    in_list = True
-                item = re.sub(r'^[\s]*[-*]\s+', '', line)
-                result.append(f'<li>{item}</li>')
-            else:
-                if in_list:
-                    result.append('</ul>')
-                    in_list = False
-                if line.strip():
-                    if not line.startswith('<h') and not line.startswith('<'):
-                        result.append(f'<p>{line}</p>')
-                    else:
-                        result.append(line)
-        if in_list:
-            result.append('</ul>')
-
-        return '\n'.join(result)
+    # Bump whenever the exported output changes; part of the output cache key
+    EXPORTER_VERSION = "2"
 
     def _get_css(self) -> str:
         """Get CSS styles for HTML"""
@@ -158,7 +118,7 @@ class HtmlExporter:
 
     def _generate_policy_html(self, policy: PolicyDocument) -> str:
         """Generate HTML for a single policy"""
-        content_html = self._markdown_to_html(policy.content)
+        content_html = blocks_to_html(policy.blocks)
         anchor = policy.id.replace('/', '-').replace(' ', '-')
         frameworks = ', '.join(policy.frameworks.keys()).upper() if policy.frameworks else 'N/A'
 
@@ -178,15 +138,20 @@ class HtmlExporter:
         </div>
         '''
 
-    def export_package(self, result: PackageResult, output_path: str):
+    def export_package(self, result: PackageResult, output_path: str,
+                       progress: Optional[ProgressCallback] = None):
         """
         Export a complete policy package to HTML.
 
+        Policies are written to the file as they are generated, so a
+        PackageStream is exported without holding the whole document.
+
         Args:
-            result: PackageResult from PackageBuilder
+            result: PackageResult (or PackageStream) from PackageBuilder
             output_path: Path for the output HTML file
+            progress: Called with an 'export' ProgressEvent per policy written
         """
-        html_parts = [
+        head = [
             '<!DOCTYPE html>',
             '<html lang="en">',
             '<head>',
@@ -202,20 +167,20 @@ class HtmlExporter:
             self._generate_toc_html(result),
         ]
 
-        for policy in sorted(result.policies, key=lambda p: (p.category, p.title)):
-            html_parts.append(self._generate_policy_html(policy))
-
-        html_parts.extend([
-            '</body>',
-            '</html>'
-        ])
-
-        html_content = '\n'.join(html_parts)
-
         output = Path(output_path)
         output.parent.mkdir(parents=True, exist_ok=True)
-        output.write_text(html_content, encoding='utf-8')
-
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(head))
+            for count, policy in enumerate(result.iter_documents(), 1):
+                f.write('\n')
+                f.write(self._generate_policy_html(policy))
+                if progress:
+                    notify(progress, EXPORT, current=count, total=result.total_policies,
+                           format='html', item=policy.id, bytes_written=f.tell())
+            f.write('\n</body>\n</html>')
+
+        notify(progress, SAVED, current=result.total_policies, total=result.total_policies,
+               format='html', bytes_written=output.stat().st_size)
         return output
 
     def export_single_policy(self, policy: PolicyDocument, output_path: str, client_name: str = ""):
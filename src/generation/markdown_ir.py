@@ -0,0 +1,160 @@
+"""
+Markdown IR Module
+Block/inline intermediate representation of rendered policy Markdown
+
+Policies are parsed once into headings, paragraphs and lists of styled
+spans; the DOCX, HTML and PDF exporters all render from that form instead
+of running their own regex converters.  PolicyDocument.blocks caches the
+parse, so exporting a package to several formats parses each policy once.
+"""
+
+import re
+from dataclasses import dataclass, field
+from html import escape
+from typing import List
+
+
+# Block kinds
+HEADING = 'heading'
+PARAGRAPH = 'paragraph'
+LIST = 'list'
+
+HEADING_LINE = re.compile(r'^(#{1,6})\s+(.+)$')
+BULLET_ITEM = re.compile(r'^[-*]\s+(.*)$')
+NUMBERED_ITEM = re.compile(r'^\d+\.\s+(.*)$')
+
+# **bold**, *italic* and `code`, leftmost first
+INLINE_MARKUP = re.compile(r'\*\*(.+?)\*\*|\*(.+?)\*|`(.+?)`')
+
+
+@dataclass
+class Span:
+    """A run of text with uniform inline style"""
+    text: str
+    bold: bool = False
+    italic: bool = False
+    code: bool = False
+
+
+@dataclass
+class Block:
+    """A heading, paragraph or list"""
+    kind: str
+    spans: List[Span] = field(default_factory=list)  # heading and paragraph text
+    level: int = 0  # heading level
+    ordered: bool = False  # numbered list
+    items: List[List[Span]] = field(default_factory=list)  # list items
+
+    @property
+    def text(self) -> str:
+        """Text without inline markup"""
+        return ''.join(span.text for span in self.spans)
+
+
+def parse_inline(text: str) -> List[Span]:
+    """
+    Split a line into styled spans in one left-to-right pass.
+
+    The markup pattern has no nested quantifiers, so a failed search for
+    a closing delimiter can only happen past the line's last delimiter
+    and the pass stays linear in the line length.
+    """
+    if '*' not in text and '`' not in text:
+        return [Span(text)]
+
+    spans = []
+    position = 0
+    for match in INLINE_MARKUP.finditer(text):
+        if match.start() > position:
+            spans.append(Span(text[position:match.start()]))
+        bold, italic, code = match.groups()
+        if bold is not None:
+            spans.append(Span(bold, bold=True))
+        elif italic is not None:
+            spans.append(Span(italic, italic=True))
+        else:
+            spans.append(Span(code, code=True))
+        position = match.end()
+
+    if position < len(text):
+        spans.append(Span(text[position:]))
+    return spans or [Span(text)]
+
+
+def parse_markdown(content: str) -> List[Block]:
+    """
+    Parse rendered policy Markdown into blocks.
+
+    Every non-blank line that is not a heading or list item is its own
+    paragraph.  Consecutive list items form one list; a blank line, a
+    heading, a paragraph or a switch between bullets and numbers ends it.
+
+    Each line is classified by its first character, so only lines that
+    can be headings or list items are matched against a pattern.
+    """
+    blocks: List[Block] = []
+    current_list = None
+
+    for line in content.split('\n'):
+        stripped = line.strip()
+        if not stripped:
+            current_list = None
+            continue
+
+        first = stripped[0]
+        if first == '#':
+            heading = HEADING_LINE.match(stripped)
+            if heading:
+                current_list = None
+                blocks.append(Block(HEADING, parse_inline(heading.group(2).strip()),
+                                    level=len(heading.group(1))))
+                continue
+
+        item = None
+        ordered = False
+        if first == '-' or first == '*':
+            item = BULLET_ITEM.match(stripped)
+        elif first.isdigit():
+            item = NUMBERED_ITEM.match(stripped)
+            ordered = item is not None
+        if item:
+            if current_list is None or current_list.ordered != ordered:
+                current_list = Block(LIST, ordered=ordered)
+                blocks.append(current_list)
+            current_list.items.append(parse_inline(item.group(1)))
+            continue
+
+        current_list = None
+        blocks.append(Block(PARAGRAPH, parse_inline(stripped)))
+
+    return blocks
+
+
+def spans_to_html(spans: List[Span]) -> str:
+    parts = []
+    for span in spans:
+        text = escape(span.text, quote=False)
+        if span.code:
+            text = f'<code>{text}</code>'
+        if span.italic:
+            text = f'<em>{text}</em>'
+        if span.bold:
+            text = f'<strong>{text}</strong>'
+        parts.append(text)
+    return ''.join(parts)
+
+
+def blocks_to_html(blocks: List[Block]) -> str:
+    """Render blocks as HTML, one element per line"""
+    lines = []
+    for block in blocks:
+        if block.kind == HEADING:
+            lines.append(f'<h{block.level}>{spans_to_html(block.spans)}</h{block.level}>')
+        elif block.kind == LIST:
+            tag = 'ol' if block.ordered else 'ul'
+            lines.append(f'<{tag}>')
+            lines.extend(f'<li>{spans_to_html(item)}</li>' for item in block.items)
+            lines.append(f'</{tag}>')
+        else:
+            lines.append(f'<p>{spans_to_html(block.spans)}</p>')
+    return '\n'.join(lines)
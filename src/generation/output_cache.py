@@ -0,0 +1,322 @@
+"""
+Output Cache Module
+Content-addressed store of exported policy packages
+
+An exported file is determined by the package key (library fingerprint,
+client name, rendered variables, frameworks), the format and the exporter
+version.  Files are stored under a hash of those inputs, so a repeat
+request reuses the existing file.  A SQLite index tracks each file's size
+and last use; once the cache grows past its size limit the least recently
+used files are deleted.  Files the cache did not write are never touched.
+
+A cached file can be handed out at another path with link(), as a hard
+link where the filesystem allows (so it takes no extra space) and as a
+copy otherwise; those paths are deleted when their file is evicted.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional, Any
+
+# Default size limit of the cache directory
+DEFAULT_OUTPUT_CACHE_BYTES = 1024 * 1024 * 1024
+
+# File extension per export format
+FORMAT_EXTENSIONS = {'docx': 'docx', 'pdf': 'pdf', 'html': 'html'}
+
+
+@dataclass
+class CachedOutput:
+    """An exported file held by the cache"""
+    key: str
+    path: Path
+    format: str
+    size: int
+    sha256: str
+    info: Dict[str, Any] = field(default_factory=dict)  # total_policies, incomplete_count, ...
+    created_at: str = ""
+    last_used: str = ""
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def entry_name(client_name: str) -> str:
+    """File name stem for a client, safe on every platform"""
+    return re.sub(r'[^a-z0-9_-]+', '_', client_name.lower()).strip('_') or 'package'
+
+
+class OutputCache:
+    """
+    Content-addressed, size-bounded cache of exported packages.
+
+    Usage:
+        cache = OutputCache("output", "data/output_cache.db")
+        key = cache.key(builder.package_key(config), "docx", exporter)
+        entry = cache.get(key)
+        if entry is None:
+            entry = cache.export(key, config.name, "docx",
+                                 lambda path: exporter.export_package(result, path))
+        cache.link(entry, "output/acme_20240101.docx")
+    """
+
+    def __init__(self, directory: str, db_path: str,
+                 max_bytes: int = DEFAULT_OUTPUT_CACHE_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._init_db()
+
+    def _init_db(self):
+        """Initialize database schema"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS output_cache (
+                key TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                format TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                info TEXT DEFAULT '{}',
+                created_at TEXT NOT NULL,
+                last_used TEXT NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_output_cache_used ON output_cache(last_used)')
+
+        # Paths outside the cache that link() pointed at a cached file
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS output_links (
+                path TEXT PRIMARY KEY,
+                key TEXT NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_output_links_key ON output_links(key)')
+
+        conn.commit()
+        conn.close()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Get database connection"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _row_to_entry(self, row: sqlite3.Row) -> CachedOutput:
+        return CachedOutput(
+            key=row['key'],
+            path=Path(row['path']),
+            format=row['format'],
+            size=row['size'],
+            sha256=row['sha256'],
+            info=json.loads(row['info'] or '{}'),
+            created_at=row['created_at'],
+            last_used=row['last_used']
+        )
+
+    def key(self, package_key: str, format: str, exporter: Any = None) -> str:
+        """Cache key of one exported file"""
+        version = getattr(exporter, 'EXPORTER_VERSION', '0')
+        exporter_id = f"{type(exporter).__name__}:{version}" if exporter is not None else ''
+        return hashlib.sha256(f"{package_key}|{format}|{exporter_id}".encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str, client_name: str, format: str) -> Path:
+        """Where the cache keeps a file"""
+        return self.directory / f"{entry_name(client_name)}.{key[:16]}.{FORMAT_EXTENSIONS[format]}"
+
+    def partial_path(self, format: str) -> Path:
+        """
+        New, uniquely named file in the cache directory to export into.
+
+        Concurrent exports of the same package each get their own file,
+        which store(move=True) then renames into place.
+        """
+        fd, path = tempfile.mkstemp(dir=self.directory, prefix='.',
+                                    suffix=f".{FORMAT_EXTENSIONS[format]}.part")
+        os.close(fd)
+        return Path(path)
+
+    def get(self, key: str) -> Optional[CachedOutput]:
+        """Cached file for a key, marking it recently used (None on a miss)"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM output_cache WHERE key = ?', (key,))
+        row = cursor.fetchone()
+        if not row:
+            conn.close()
+            return None
+
+        entry = self._row_to_entry(row)
+        if not entry.path.exists():
+            # Deleted behind our back
+            cursor.execute('DELETE FROM output_cache WHERE key = ?', (key,))
+            conn.commit()
+            conn.close()
+            return None
+
+        entry.last_used = datetime.now().isoformat()
+        cursor.execute('UPDATE output_cache SET last_used = ? WHERE key = ?', (entry.last_used, key))
+        conn.commit()
+        conn.close()
+        return entry
+
+    def store(self, key: str, client_name: str, format: str, source: str,
+              info: Optional[Dict[str, Any]] = None, move: bool = False) -> CachedOutput:
+        """
+        Add an exported file to the cache, then evict down to the size limit.
+
+        Args:
+            key: Cache key from key()
+            client_name: Client name, used for a readable file name
+            format: Export format
+            source: Exported file
+            info: Package summary kept with the file
+            move: Move ``source`` into the cache instead of copying it
+        """
+        path = self.path_for(key, client_name, format)
+        if Path(source) != path:
+            if move:
+                os.replace(source, path)
+            else:
+                # Copy next to the target first so readers never see a partial file
+                partial = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.part")
+                shutil.copyfile(source, partial)
+                os.replace(partial, path)
+
+        now = datetime.now().isoformat()
+        entry = CachedOutput(
+            key=key,
+            path=path,
+            format=format,
+            size=path.stat().st_size,
+            sha256=file_sha256(path),
+            info=info or {},
+            created_at=now,
+            last_used=now
+        )
+
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT OR REPLACE INTO output_cache
+            (key, path, format, size, sha256, info, created_at, last_used)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (entry.key, str(entry.path), entry.format, entry.size, entry.sha256,
+              json.dumps(entry.info), entry.created_at, entry.last_used))
+        conn.commit()
+        conn.close()
+
+        self.evict(keep=key)
+        return entry
+
+    def export(self, key: str, client_name: str, format: str, write: Callable[[str], Any],
+               info: Optional[Dict[str, Any]] = None) -> CachedOutput:
+        """
+        Export straight into the cache.
+
+        ``write(path)`` writes the file to a fresh partial_path(), which is
+        then moved into place; if it fails the partial file is removed.
+        """
+        partial = self.partial_path(format)
+        try:
+            write(str(partial))
+            return self.store(key, client_name, format, str(partial), info, move=True)
+        except BaseException:
+            # The cache never indexes .part files, so nothing else would evict it
+            try:
+                partial.unlink(missing_ok=True)
+            except OSError:
+                pass
+            raise
+
+    def link(self, entry: CachedOutput, target: str) -> Path:
+        """
+        Make a cached file available at another path, until it is evicted.
+
+        Hard-links where possible and copies otherwise (e.g. across
+        filesystems); an existing file at ``target`` is replaced.
+        """
+        target = Path(target)
+        if target.resolve() == entry.path.resolve():
+            return target
+
+        partial = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.part")
+        try:
+            os.link(entry.path, partial)
+        except OSError:
+            shutil.copyfile(entry.path, partial)
+        os.replace(partial, target)
+
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('INSERT OR REPLACE INTO output_links (path, key) VALUES (?, ?)',
+                       (str(target), entry.key))
+        conn.commit()
+        conn.close()
+        return target
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Delete least recently used files, and the paths linked to them,
+        until the cache fits its size limit.
+
+        Args:
+            keep: Key that must survive (the file just stored)
+
+        Returns:
+            Number of files deleted
+        """
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('SELECT COALESCE(SUM(size), 0) FROM output_cache')
+        total = cursor.fetchone()[0]
+        if total <= self.max_bytes:
+            conn.close()
+            return 0
+
+        cursor.execute('SELECT key, path, size FROM output_cache ORDER BY last_used')
+        evicted = []
+        for row in cursor.fetchall():
+            if total <= self.max_bytes:
+                break
+            if row['key'] == keep:
+                continue
+            Path(row['path']).unlink(missing_ok=True)
+            evicted.append(row['key'])
+            total -= row['size']
+
+        for key in evicted:
+            cursor.execute('SELECT path FROM output_links WHERE key = ?', (key,))
+            for link in cursor.fetchall():
+                Path(link['path']).unlink(missing_ok=True)
+        cursor.executemany('DELETE FROM output_links WHERE key = ?', [(k,) for k in evicted])
+        cursor.executemany('DELETE FROM output_cache WHERE key = ?', [(k,) for k in evicted])
+        conn.commit()
+        conn.close()
+        return len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM output_cache')
+        count, size = cursor.fetchone()
+        conn.close()
+        return {'files': count, 'bytes': size, 'max_bytes': self.max_bytes}
@@ -3,12 +3,26 @@ Package Builder Module
 Builds complete policy packages for clients
 """
 
-import yaml
+import hashlib
+import json
+import os
 import re
-from dataclasses import dataclass, field
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Dict, List, Set, Optional, Any
+from typing import Dict, Iterator, List, Set, Optional, Any, Tuple
 from datetime import datetime
+from warnings import warn
+
+from core.incompleteness import markers_report
+from core.library_snapshot import PolicyRecord, SnapshotDelta, content_digest
+from core.policy_library import PolicyLibrary, get_policy_library
+from core.variable_engine import SubstitutionPlan, compile_substitution
+
+from .markdown_ir import Block, parse_markdown
+from .progress import RENDER, ProgressCallback, notify
 
 
 @dataclass
@@ -31,6 +45,83 @@ class PolicyDocument:
     frameworks: Dict[str, List[str]]
     variables_used: List[str]
     incomplete_sections: List[Dict[str, Any]]
+    _blocks: Optional[List[Block]] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def blocks(self) -> List[Block]:
+        """Content parsed to the exporters' Markdown IR, built on first use"""
+        if self._blocks is None:
+            self._blocks = parse_markdown(self.content)
+        return self._blocks
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 of everything an exporter writes for this policy"""
+        exported = [self.id, self.title, self.category, sorted(self.frameworks or {}), self.content]
+        return hashlib.sha256(json.dumps(exported).encode('utf-8')).hexdigest()
+
+
+# Rendered documents kept per builder; 0 disables render caching
+DEFAULT_RENDER_CACHE_SIZE = 2048
+
+# Pools accepted by build_package(executor=...)
+EXECUTORS = ('thread', 'process')
+
+# Default variables that change from day to day; a package's values are
+# kept with it so later deltas and regenerations render the same dates
+DATED_VARIABLES = ('EFFECTIVE_DATE', 'APPROVAL_DATE')
+
+
+def dated_variables(variables: Dict[str, str]) -> Dict[str, str]:
+    """The DATED_VARIABLES values among ``variables``"""
+    return {name: variables[name] for name in DATED_VARIABLES if name in variables}
+
+
+class RenderCache:
+    """
+    Bounded LRU cache of rendered policy documents.
+
+    Keys are (policy ID, content digest, values of the variables the
+    policy references), so clients that differ only in variables a
+    policy never uses share one render.  Cached documents are shared
+    between packages and must not be mutated.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_RENDER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._documents: 'OrderedDict[Tuple, PolicyDocument]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[PolicyDocument]:
+        with self._lock:
+            document = self._documents.get(key)
+            if document is None:
+                self.misses += 1
+                return None
+            self._documents.move_to_end(key)
+            self.hits += 1
+            return document
+
+    def put(self, key: Tuple, document: PolicyDocument) -> None:
+        with self._lock:
+            self._documents[key] = document
+            self._documents.move_to_end(key)
+            while len(self._documents) > self.maxsize:
+                self._documents.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._documents.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self._documents), 'maxsize': self.maxsize,
+                'hits': self.hits, 'misses': self.misses}
 
 
 @dataclass
@@ -45,6 +136,73 @@ class PackageResult:
     incomplete_count: int
     warnings: List[str]
 
+    def iter_documents(self) -> Iterator[PolicyDocument]:
+        """Policies in export order (category, then title)"""
+        return iter(sorted(self.policies, key=lambda p: (p.category, p.title)))
+
+
+@dataclass
+class PackageDelta:
+    """Change manifest of a delta package against a client's previous generation"""
+    base_generation: Optional[str]
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    hashes: Dict[str, str] = field(default_factory=dict)  # every current policy
+    incomplete_count: int = 0  # policies of the full package needing customization
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'base_generation': self.base_generation,
+            'summary': {
+                'added': len(self.added),
+                'changed': len(self.changed),
+                'removed': len(self.removed),
+                'unchanged': self.unchanged,
+            },
+            'added': self.added,
+            'changed': self.changed,
+            'removed': self.removed,
+        }
+
+
+@dataclass
+class PolicyOutline:
+    """A policy's table-of-contents entry, without its rendered content"""
+    id: str
+    title: str
+    category: str
+    frameworks: Dict[str, List[str]]
+    incomplete_sections: List[Dict[str, Any]]
+
+
+@dataclass
+class PackageStream(PackageResult):
+    """
+    Package whose documents are rendered one at a time during export.
+
+    ``policies`` holds only outlines (enough for a cover page and table
+    of contents); iter_documents() renders each policy as it is reached,
+    bypassing the render cache, and keeps no reference to it, so exporting
+    holds one document at a time regardless of package size.
+    """
+    builder: Optional['PackageBuilder'] = None
+    sources: Dict[str, PolicyRecord] = field(default_factory=dict)
+
+    def iter_documents(self) -> Iterator[PolicyDocument]:
+        for outline in self.policies:
+            yield self.builder.render_policy(self.sources[outline.id], self.variables_applied,
+                                             cache=False)
+
+
+# Marks an argument the caller did not pass
+_UNSET = object()
+
 
 class PackageBuilder:
     """
@@ -60,72 +218,65 @@ class PackageBuilder:
         result = builder.build_package(config)
     """
 
-    def __init__(self, policies_dir: str, frameworks_dir: Optional[str] = None):
-        self.policies_dir = Path(policies_dir)
-        self.frameworks_dir = Path(frameworks_dir) if frameworks_dir else None
-        self.policies_cache: Dict[str, Dict] = {}
-        self.compliance_mapper = None
-
-        if self.frameworks_dir:
-            self._init_compliance_mapper()
-
-    def _init_compliance_mapper(self):
-        """Initialize compliance mapper if frameworks directory exists"""
-        try:
-            import sys
-            sys.path.insert(0, str(self.policies_dir.parent / "src"))
-            from core.compliance_mapper import ComplianceMapper
-
-            self.compliance_mapper = ComplianceMapper()
-            self.compliance_mapper.load_all_frameworks(str(self.frameworks_dir))
-        except Exception as e:
-            print(f"Warning: Could not initialize compliance mapper: {e}")
-
-    def load_policy(self, policy_path: Path) -> Optional[Dict]:
-        """Load a policy file and parse its frontmatter and content"""
-        if str(policy_path) in self.policies_cache:
-            return self.policies_cache[str(policy_path)]
-
-        try:
-            content = policy_path.read_text(encoding='utf-8')
+    def __init__(self, policies_dir: Optional[str] = None, frameworks_dir: Optional[str] = None,
+                 library: Optional[PolicyLibrary] = None,
+                 render_cache_size: int = DEFAULT_RENDER_CACHE_SIZE,
+                 reload_interval: Any = _UNSET):
+        if library is None:
+            library = get_policy_library(policies_dir, frameworks_dir)
+        if reload_interval is not _UNSET:
+            warn("PackageBuilder(reload_interval=...) is deprecated; it sets the interval "
+                 "of the shared policy library", DeprecationWarning, stacklevel=2)
+            library.reload_interval = reload_interval
+        self.library = library
+        self.policies_dir = library.policies_dir
+        self.frameworks_dir = library.frameworks_dir
+        self.render_cache = RenderCache(render_cache_size) if render_cache_size > 0 else None
+
+    @property
+    def compliance_mapper(self):
+        return self.library.compliance_mapper
+
+    @property
+    def policies_cache(self) -> Dict[str, PolicyRecord]:
+        """Deprecated: loaded policy records keyed by path, owned by the library"""
+        warn("PackageBuilder.policies_cache is deprecated; use get_all_policies()",
+             DeprecationWarning, stacklevel=2)
+        return self.library.loaded_records
+
+    @property
+    def library_version(self) -> int:
+        """Version counter of the policy library, bumped on every change"""
+        return self.library.version
+
+    @property
+    def library_fingerprint(self) -> str:
+        """Content fingerprint of the policy library, stable across processes"""
+        return self.library.fingerprint
+
+    def check_for_updates(self) -> SnapshotDelta:
+        """Stat-sweep the policies directory and evict changed policies"""
+        return self.library.check_for_updates()
+
+    def refresh_if_stale(self):
+        """Sweep the policies directory if the last sweep is too old"""
+        self.library.refresh_if_stale()
+
+    def load_policy(self, policy_path: Path) -> Optional[PolicyRecord]:
+        """
+        Load a policy's frontmatter index.
 
-            if not content.startswith('---'):
-                return None
+        The body is read from disk on first access of ``policy['body']``.
+        """
+        return self.library.load_policy(policy_path)
 
-            parts = content.split('---', 2)
-            if len(parts) < 3:
-                return None
+    def release_bodies(self) -> int:
+        """Drop loaded policy bodies to reclaim memory"""
+        return self.library.release_bodies()
 
-            frontmatter = yaml.safe_load(parts[1])
-            body = parts[2].strip()
-
-            policy_data = {
-                'path': str(policy_path),
-                'frontmatter': frontmatter,
-                'body': body,
-                'id': frontmatter.get('id', policy_path.stem),
-                'title': frontmatter.get('title', ''),
-                'category': frontmatter.get('category', ''),
-                'frameworks': frontmatter.get('frameworks', {}),
-                'variables': frontmatter.get('variables', []),
-                'requires_customization': frontmatter.get('requires_customization', [])
-            }
-
-            self.policies_cache[str(policy_path)] = policy_data
-            return policy_data
-
-        except Exception as e:
-            print(f"Warning: Could not load policy {policy_path}: {e}")
-            return None
-
-    def get_all_policies(self) -> Dict[str, Dict]:
+    def get_all_policies(self) -> Dict[str, PolicyRecord]:
         """Load all policies from the policies directory"""
-        policies = {}
-        for md_file in self.policies_dir.rglob("*.md"):
-            policy = self.load_policy(md_file)
-            if policy:
-                policies[policy['id']] = policy
-        return policies
+        return self.library.get_policies()
 
     def get_policies_for_frameworks(self, framework_ids: List[str]) -> Set[str]:
         """Get policy IDs required for specified frameworks"""
@@ -141,70 +292,182 @@ class PackageBuilder:
 
     def apply_variables(self, content: str, variables: Dict[str, str]) -> str:
         """Apply variable substitution to content"""
-        result = content
-        for var_name, var_value in variables.items():
-            # Replace {{VARIABLE_NAME}} syntax
-            pattern = r'\{\{' + var_name + r'\}\}'
-            result = re.sub(pattern, var_value, result)
-        return result
+        return compile_substitution(content).render(variables)
 
     def detect_incomplete_sections(self, content: str, policy_id: str) -> List[Dict[str, Any]]:
         """Detect sections that require customization"""
-        incomplete = []
-
-        # Find unreplaced variables
-        unreplaced = re.findall(r'\{\{([A-Z_]+)\}\}', content)
-        if unreplaced:
-            incomplete.append({
-                'type': 'unreplaced_variables',
-                'variables': list(set(unreplaced)),
-                'severity': 'high'
-            })
-
-        # Find ACTION REQUIRED markers
+        # Every marker starts with a bracket or a brace
+        if '[' not in content and '{{' not in content:
+            return []
+
+        # Find unreplaced variables (sorted, as SubstitutionPlan.unreplaced
+        # reports them), ACTION REQUIRED markers and TODO markers
+        unreplaced = sorted(set(re.findall(r'\{\{([A-Z_]+)\}\}', content)))
         action_markers = re.findall(r'\[ACTION REQUIRED[^\]]*\]', content, re.IGNORECASE)
-        if action_markers:
-            incomplete.append({
-                'type': 'action_required',
-                'markers': action_markers,
-                'severity': 'high'
-            })
-
-        # Find TODO markers
         todo_markers = re.findall(r'\[TODO[^\]]*\]', content, re.IGNORECASE)
-        if todo_markers:
-            incomplete.append({
-                'type': 'todo',
-                'markers': todo_markers,
-                'severity': 'medium'
-            })
 
-        return incomplete
+        return markers_report(unreplaced, action_markers, todo_markers)
 
-    def render_policy(self, policy: Dict, variables: Dict[str, str]) -> PolicyDocument:
+    def render_policy(self, policy: Dict, variables: Dict[str, str],
+                      cache: bool = True) -> PolicyDocument:
         """Render a single policy with variable substitution"""
-        # Apply variables to content
-        rendered_content = self.apply_variables(policy['body'], variables)
-
-        # Apply variables to title
-        rendered_title = self.apply_variables(policy['title'], variables)
+        return self.render_policy_batch(policy, [variables], cache=cache)[0]
 
-        # Detect incomplete sections
-        incomplete = self.detect_incomplete_sections(rendered_content, policy['id'])
+    def outline_policy(self, policy: Dict, variables: Dict[str, str]) -> PolicyOutline:
+        """
+        A policy's table-of-contents entry, without keeping its rendered content.
 
-        return PolicyDocument(
+        The title and markers come from the compiled plans; the body is
+        only rendered (and then dropped) when its markers need a text scan.
+        """
+        body_plan, title_plan, _ = self._plans(policy)
+        return PolicyOutline(
             id=policy['id'],
-            title=rendered_title,
-            content=rendered_content,
+            title=title_plan.render(variables),
             category=policy['category'],
             frameworks=policy.get('frameworks', {}),
-            variables_used=policy.get('variables', []),
-            incomplete_sections=incomplete
+            incomplete_sections=self._incomplete_sections(policy['id'], body_plan, variables)
         )
 
+    def _plans(self, policy: Dict) -> Tuple[SubstitutionPlan, SubstitutionPlan, str]:
+        """(body plan, title plan, content digest), compiled once per record"""
+        if isinstance(policy, PolicyRecord):
+            return policy.body_plan, policy.title_plan, policy.digest
+        return (compile_substitution(policy['body']), compile_substitution(policy['title']),
+                content_digest(policy))
+
+    def _incomplete_sections(self, policy_id: str, body_plan: SubstitutionPlan,
+                             variables: Dict[str, str],
+                             content: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Markers come straight from the plan unless the text needs a scan"""
+        unreplaced = body_plan.unreplaced(variables)
+        if unreplaced is not None:
+            return markers_report(unreplaced)
+        if content is None:
+            content = body_plan.render(variables)
+        return self.detect_incomplete_sections(content, policy_id)
+
+    def render_policy_batch(self, policy: Dict, variable_maps: List[Dict[str, str]],
+                            cache: bool = True) -> List[PolicyDocument]:
+        """
+        Render one policy for many clients in one call.
+
+        Clients whose values agree on every variable the policy uses share
+        a single PolicyDocument, which is also kept in the render cache
+        for later packages.  With ``cache=False`` new renders are not
+        added to the cache (documents already there are still reused).
+        """
+        # Apply variables to content and title using the record's compiled plans
+        body_plan, title_plan, digest = self._plans(policy)
+        names = sorted(body_plan.variables | title_plan.variables)
+
+        groups: Dict[tuple, List[int]] = {}
+        for index, values in enumerate(variable_maps):
+            groups.setdefault(tuple(values.get(name) for name in names), []).append(index)
+
+        documents: List[Optional[PolicyDocument]] = [None] * len(variable_maps)
+        for values_key, indexes in groups.items():
+            key = (policy['id'], digest, values_key)
+            document = self.render_cache.get(key) if self.render_cache is not None else None
+            if document is None:
+                variables = variable_maps[indexes[0]]
+                content = body_plan.render(variables)
+
+                document = PolicyDocument(
+                    id=policy['id'],
+                    title=title_plan.render(variables),
+                    content=content,
+                    category=policy['category'],
+                    frameworks=policy.get('frameworks', {}),
+                    variables_used=policy.get('variables', []),
+                    incomplete_sections=self._incomplete_sections(policy['id'], body_plan,
+                                                                  variables, content)
+                )
+                if cache and self.render_cache is not None:
+                    self.render_cache.put(key, document)
+            for index in indexes:
+                documents[index] = document
+        return documents
+
+    def rebuild_policies(self, config: ClientConfig, variable_names: List[str],
+                         include_all: bool = False,
+                         base_variables: Optional[Dict[str, str]] = None) -> List[PolicyDocument]:
+        """
+        Re-render only the policies in a client's package that use the given variables.
+
+        Used after a variable change to refresh an existing package without
+        rendering the policies the change cannot affect.
+
+        Args:
+            base_variables: Variables the package was generated with; its
+                dates (DATED_VARIABLES) are reused unless the client sets
+                them, so rewritten policies match the untouched ones
+
+        Returns:
+            Rendered documents for the affected policies, sorted by policy ID
+        """
+        config = self._with_base_dates(config, base_variables)
+        all_policies = self.get_all_policies()
+        policy_ids = self._select_policy_ids(config, all_policies, include_all)
+        affected = policy_ids & self.library.policies_using_variables(variable_names)
+
+        variables = self._package_variables(config)
+        return [self.render_policy(all_policies[policy_id], variables)
+                for policy_id in sorted(affected) if policy_id in all_policies]
+
+    def _with_base_dates(self, config: ClientConfig,
+                         base_variables: Optional[Dict[str, str]]) -> ClientConfig:
+        """Config whose default dates are those of an earlier package"""
+        dates = dated_variables(base_variables or {})
+        if not dates:
+            return config
+        return replace(config, variables={**dates, **config.variables})
+
+    def _select_policy_ids(self, config: ClientConfig, all_policies: Dict[str, PolicyRecord],
+                           include_all: bool) -> Set[str]:
+        """Determine which policies to include in a client's package"""
+        if include_all or not config.frameworks:
+            return set(all_policies.keys())
+
+        policy_ids = self.get_policies_for_frameworks(config.frameworks)
+        # Also get policies that have framework mappings
+        for fw_id in config.frameworks:
+            policy_ids.update(self.library.policies_for_framework(fw_id))
+        return policy_ids
+
+    def _package_variables(self, config: ClientConfig) -> Dict[str, str]:
+        """Default variables merged with client-provided variables"""
+        default_variables = {
+            'ORGANIZATION_NAME': config.name,
+            'EFFECTIVE_DATE': datetime.now().strftime('%B %d, %Y'),
+            'APPROVAL_DATE': datetime.now().strftime('%B %d, %Y'),
+            'VERSION': '1.0.0'
+        }
+        return {**default_variables, **config.variables}
+
+    def package_key(self, config: ClientConfig, include_all: bool = False) -> str:
+        """
+        Hash of everything a client's package is rendered from.
+
+        Covers the library fingerprint, the client name, the rendered
+        variables (including today's effective date) and the frameworks,
+        so two configs with the same key build identical packages.
+        """
+        inputs = {
+            'library': self.library_fingerprint,
+            'client': config.name,
+            'variables': sorted(self._package_variables(config).items()),
+            'frameworks': sorted(config.frameworks),
+            'include_all': include_all,
+        }
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
     def build_package(self, config: ClientConfig,
                       include_all: bool = False,
-                      validate_references: bool = True) -> PackageResult:
+                      validate_references: bool = True,
+                      executor: Optional[str] = None,
+                      workers: Optional[int] = None,
+                      progress: Optional[ProgressCallback] = None) -> PackageResult:
         """
         Build a complete policy package for a client.
 
@@ -212,72 +475,225 @@ class PackageBuilder:
             config: Client configuration
             include_all: Include all policies regardless of framework mapping
             validate_references: Check cross-references between policies
+            executor: Render policies in a 'thread' or 'process' pool
+                instead of serially (see build_packages)
+            workers: Pool size (default: CPU count)
+            progress: Called with a 'render' ProgressEvent per policy
 
         Returns:
             PackageResult with rendered policies and metadata
         """
-        warnings = []
-        all_policies = self.get_all_policies()
+        return self.build_packages([config], include_all, validate_references,
+                                   executor=executor, workers=workers, progress=progress)[0]
+
+    def build_delta(self, config: ClientConfig, previous_hashes: Dict[str, str],
+                    base_generation: Optional[str] = None,
+                    include_all: bool = False,
+                    base_variables: Optional[Dict[str, str]] = None
+                    ) -> Tuple[PackageResult, PackageDelta]:
+        """
+        Build only the policies whose rendered output changed since a previous generation.
 
-        # Determine which policies to include
-        if include_all:
-            policy_ids = set(all_policies.keys())
-        elif config.frameworks:
-            policy_ids = self.get_policies_for_frameworks(config.frameworks)
-            # Also get policies that have framework mappings
-            for policy_id, policy in all_policies.items():
-                for fw_id in config.frameworks:
-                    if fw_id in policy.get('frameworks', {}):
-                        policy_ids.add(policy_id)
-        else:
-            policy_ids = set(all_policies.keys())
-
-        # Build default variables
-        default_variables = {
-            'ORGANIZATION_NAME': config.name,
-            'EFFECTIVE_DATE': datetime.now().strftime('%B %d, %Y'),
-            'APPROVAL_DATE': datetime.now().strftime('%B %d, %Y'),
-            'VERSION': '1.0.0'
-        }
+        Args:
+            config: Client configuration
+            previous_hashes: Policy ID -> content hash recorded with the previous generation
+            base_generation: ID of that generation, recorded in the manifest
+            base_variables: Variables recorded with that generation.  Its
+                dates (DATED_VARIABLES) are reused unless the client sets
+                them, so a delta run on a later day does not report every
+                dated policy as changed.
+
+        Returns:
+            (package holding the added and changed policies, change manifest)
+        """
+        config = self._with_base_dates(config, base_variables)
+        full = self.build_package(config, include_all)
+        delta = PackageDelta(base_generation=base_generation, incomplete_count=full.incomplete_count)
+
+        policies = []
+        for policy in full.policies:
+            digest = delta.hashes[policy.id] = policy.content_hash
+            previous = previous_hashes.get(policy.id)
+            if previous == digest:
+                delta.unchanged += 1
+                continue
+            (delta.changed if previous else delta.added).append(policy.id)
+            policies.append(policy)
+        delta.removed = sorted(set(previous_hashes) - set(delta.hashes))
+
+        result = PackageResult(
+            client_name=full.client_name,
+            generated_at=full.generated_at,
+            policies=policies,
+            total_policies=len(policies),
+            frameworks_covered=full.frameworks_covered,
+            variables_applied=full.variables_applied,
+            incomplete_count=sum(1 for p in policies if p.incomplete_sections),
+            warnings=full.warnings
+        )
+        return result, delta
+
+    def build_packages(self, configs: List[ClientConfig],
+                       include_all: bool = False,
+                       validate_references: bool = True,
+                       executor: Optional[str] = None,
+                       workers: Optional[int] = None,
+                       progress: Optional[ProgressCallback] = None) -> List[PackageResult]:
+        """
+        Build packages for several clients, rendering each policy once per batch.
 
-        # Merge with client-provided variables
-        variables = {**default_variables, **config.variables}
+        Every policy is rendered for all clients that need it in a single
+        render_policy_batch() call instead of one pass per client.
+
+        With ``executor``, those calls are fanned out across a pool.  A
+        'thread' pool shares this builder's render cache; a 'process' pool
+        renders plain copies of the policies in worker processes and
+        bypasses it, so it only pays off for large libraries with heavy
+        templates.  Output is identical to the serial build either way.
+
+        ``progress`` receives a 'render' event as each policy's batch is
+        rendered, counting policies rather than documents.
+
+        Returns:
+            PackageResults in the same order as ``configs``
+        """
+        if executor is not None and executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}', expected one of {EXECUTORS}")
+
+        all_policies = self.get_all_policies()
+
+        selections = []
+        needed: Dict[str, List[int]] = {}
+        for index, config in enumerate(configs):
+            policy_ids = self._select_policy_ids(config, all_policies, include_all)
+            warnings = []
+            for policy_id in sorted(policy_ids):
+                if policy_id not in all_policies:
+                    warnings.append(f"Policy not found: {policy_id}")
+                    continue
+                needed.setdefault(policy_id, []).append(index)
+            selections.append((policy_ids, self._package_variables(config), warnings))
 
         # Render policies
-        rendered_policies = []
-        incomplete_count = 0
+        batches = [(policy_id, [selections[i][1] for i in indexes])
+                   for policy_id, indexes in needed.items()]
+        rendered: List[Dict[str, PolicyDocument]] = [{} for _ in configs]
+        for (policy_id, _), documents in zip(
+                batches, self._render_batches(all_policies, batches, executor, workers, progress)):
+            for index, document in zip(needed[policy_id], documents):
+                rendered[index][policy_id] = document
+
+        results = []
+        for config, (policy_ids, variables, warnings), documents in zip(configs, selections, rendered):
+            rendered_policies = [documents[policy_id] for policy_id in sorted(documents)]
+            incomplete_count = sum(1 for p in rendered_policies if p.incomplete_sections)
+
+            # Validate cross-references if enabled
+            if validate_references:
+                warnings.extend(self._reference_warnings(
+                    [p.id for p in rendered_policies], policy_ids, all_policies))
+
+            results.append(PackageResult(
+                client_name=config.name,
+                generated_at=datetime.now(),
+                policies=rendered_policies,
+                total_policies=len(rendered_policies),
+                frameworks_covered=config.frameworks,
+                variables_applied=variables,
+                incomplete_count=incomplete_count,
+                warnings=warnings
+            ))
+
+        return results
+
+    def stream_package(self, config: ClientConfig,
+                       include_all: bool = False,
+                       validate_references: bool = True,
+                       progress: Optional[ProgressCallback] = None) -> PackageStream:
+        """
+        Plan a package for streaming export.
 
-        for policy_id in sorted(policy_ids):
-            if policy_id not in all_policies:
-                warnings.append(f"Policy not found: {policy_id}")
-                continue
+        The outline (titles and incompleteness for the cover page and table
+        of contents) comes from each policy's compiled plans; bodies are
+        rendered one at a time as an exporter iterates them.  Neither pass
+        keeps rendered content, in the package or in the render cache, so
+        peak memory does not grow with package size.
 
-            policy = all_policies[policy_id]
-            rendered = self.render_policy(policy, variables)
-            rendered_policies.append(rendered)
+        Returns:
+            PackageStream, accepted by every exporter in place of a PackageResult
+        """
+        all_policies = self.get_all_policies()
+        policy_ids = self._select_policy_ids(config, all_policies, include_all)
+        variables = self._package_variables(config)
 
-            if rendered.incomplete_sections:
-                incomplete_count += 1
+        warnings = [f"Policy not found: {policy_id}"
+                    for policy_id in sorted(policy_ids) if policy_id not in all_policies]
+        found = sorted(policy_id for policy_id in policy_ids if policy_id in all_policies)
+        outlines = []
+        for count, policy_id in enumerate(found, 1):
+            outlines.append(self.outline_policy(all_policies[policy_id], variables))
+            notify(progress, RENDER, current=count, total=len(found), item=policy_id)
 
-        # Validate cross-references if enabled
         if validate_references:
-            for policy in rendered_policies:
-                refs = all_policies.get(policy.id, {}).get('frontmatter', {}).get('references', [])
-                for ref in refs:
-                    if ref not in policy_ids and ref not in all_policies:
-                        warnings.append(f"Policy '{policy.id}' references missing policy: {ref}")
+            warnings.extend(self._reference_warnings([o.id for o in outlines], policy_ids, all_policies))
 
-        return PackageResult(
+        outlines.sort(key=lambda o: (o.category, o.title))
+        return PackageStream(
             client_name=config.name,
             generated_at=datetime.now(),
-            policies=rendered_policies,
-            total_policies=len(rendered_policies),
+            policies=outlines,
+            total_policies=len(outlines),
             frameworks_covered=config.frameworks,
             variables_applied=variables,
-            incomplete_count=incomplete_count,
-            warnings=warnings
+            incomplete_count=sum(1 for o in outlines if o.incomplete_sections),
+            warnings=warnings,
+            builder=self,
+            sources={o.id: all_policies[o.id] for o in outlines}
         )
 
+    def _reference_warnings(self, included: List[str], policy_ids: Set[str],
+                            all_policies: Dict[str, PolicyRecord]) -> List[str]:
+        """Warnings for included policies that reference policies missing from the library"""
+        warnings = []
+        for policy_id in included:
+            refs = all_policies.get(policy_id, {}).get('frontmatter', {}).get('references', [])
+            for ref in refs:
+                if ref not in policy_ids and ref not in all_policies:
+                    warnings.append(f"Policy '{policy_id}' references missing policy: {ref}")
+        return warnings
+
+    def _render_batches(self, all_policies: Dict[str, PolicyRecord],
+                        batches: List[Tuple[str, List[Dict[str, str]]]],
+                        executor: Optional[str], workers: Optional[int],
+                        progress: Optional[ProgressCallback] = None
+                        ) -> List[List[PolicyDocument]]:
+        """Render (policy ID, variable maps) batches, returning documents in batch order"""
+        def collect(results):
+            documents = []
+            for count, ((policy_id, _), batch) in enumerate(zip(batches, results), 1):
+                documents.append(batch)
+                notify(progress, RENDER, current=count, total=len(batches), item=policy_id)
+            return documents
+
+        if executor is None or len(batches) < 2:
+            return collect(self.render_policy_batch(all_policies[policy_id], variable_maps)
+                           for policy_id, variable_maps in batches)
+
+        workers = min(workers or os.cpu_count() or 1, len(batches))
+
+        if executor == 'thread':
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(self.render_policy_batch, all_policies[policy_id], variable_maps)
+                           for policy_id, variable_maps in batches]
+                return collect(future.result() for future in futures)
+
+        # Records load their bodies lazily from this process; ship plain dicts
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                                 initargs=(type(self), str(self.policies_dir))) as pool:
+            futures = [pool.submit(_render_in_worker, dict(all_policies[policy_id]), variable_maps)
+                       for policy_id, variable_maps in batches]
+            return collect(future.result() for future in futures)
+
     def generate_table_of_contents(self, result: PackageResult) -> str:
         """Generate a table of contents for the package"""
         lines = [
@@ -366,6 +782,19 @@ class PackageBuilder:
         return "\n".join(lines)
 
 
+_worker_builder: Optional[PackageBuilder] = None
+
+
+def _init_render_worker(builder_class: type, policies_dir: str):
+    global _worker_builder
+    library = PolicyLibrary(policies_dir, reload_interval=None)
+    _worker_builder = builder_class(library=library, render_cache_size=0)
+
+
+def _render_in_worker(policy: Dict, variable_maps: List[Dict[str, str]]) -> List[PolicyDocument]:
+    return _worker_builder.render_policy_batch(policy, variable_maps)
+
+
 def main():
     """Test the package builder"""
     from pathlib import Path
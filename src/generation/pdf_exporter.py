@@ -3,7 +3,8 @@ PDF Exporter Module
 Exports policy packages to PDF format using WeasyPrint or ReportLab
 """
 
-import re
+import os
+import tempfile
 from pathlib import Path
 from typing import List, Optional
 from datetime import datetime
@@ -15,7 +16,9 @@ try:
 except ImportError:
     WEASYPRINT_AVAILABLE = False
 
+from .markdown_ir import blocks_to_html
 from .package_builder import PackageResult, PolicyDocument
+from .progress import EXPORT, SAVE, SAVED, ProgressCallback, notify
 
 
 class PdfExporter:
@@ -27,6 +30,9 @@ class PdfExporter:
         exporter.export_package(result, "output/policies.pdf")
     """
 
+    # Bump whenever the exported output changes; part of the output cache key
+    EXPORTER_VERSION = "2"
+
     def __init__(self):
         if not WEASYPRINT_AVAILABLE:
             raise ImportError(
@@ -34,50 +40,6 @@ class PdfExporter:
                 "Install it with: pip install weasyprint"
             )
 
-    def _markdown_to_html(self, content: str) -> str:
-        """Convert markdown content to HTML"""
-        html = content
-
-        # Headers
-        html = re.sub(r'^###### (.+)$', r'<h6>\1</h6>', html, flags=re.MULTILINE)
-        html = re.sub(r'^##### (.+)$', r'<h5>\1</h5>', html, flags=re.MULTILINE)
-        html = re.sub(r'^#### (.+)$', r'<h4>\1</h4>', html, flags=re.MULTILINE)
-        html = re.sub(r'^### (.+)$', r'<h3>\1</h3>', html, flags=re.MULTILINE)
-        html = re.sub(r'^## (.+)$', r'<h2>\1</h2>', html, flags=re.MULTILINE)
-        html = re.sub(r'^# (.+)$', r'<h1>\1</h1>', html, flags=re.MULTILINE)
-
-        # Bold and italic
-        html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html)
-        html = re.sub(r'\*(.+?)\*', r'<em>\1</em>', html)
-
-        # Code
-        html = re.sub(r'`(.+?)`', r'<code>\1</code>', html)
-
-        # Lists
-        lines = html.split('\n')
-        in_list = False
-        result = []
-        for line in lines:
-            if line.strip().startswith('- ') or line.strip().startswith('* '):
-                if not in_list:
-                    result.append('<ul>')
-                    in_list = True
-                item = re.sub(r'^[\s]*[-*]\s+', '', line)
-                result.append(f'<li>{item}</li>')
-            else:
-                if in_list:
-                    result.append('</ul>')
-                    in_list = False
-                if line.strip():
-                    if not line.startswith('<h') and not line.startswith('<'):
-                        result.append(f'<p>{line}</p>')
-                    else:
-                        result.append(line)
-        if in_list:
-            result.append('</ul>')
-
-        return '\n'.join(result)
-
     def _get_css(self) -> str:
         """Get CSS styles for PDF"""
         return """
@@ -245,7 +207,7 @@ class PdfExporter:
 
     def _generate_policy_html(self, policy: PolicyDocument) -> str:
         """Generate HTML for a single policy"""
-        content_html = self._markdown_to_html(policy.content)
+        content_html = blocks_to_html(policy.blocks)
 
         frameworks = ', '.join(policy.frameworks.keys()).upper() if policy.frameworks else 'N/A'
         meta = f'''
@@ -264,37 +226,56 @@ class PdfExporter:
         </div>
         '''
 
-    def export_package(self, result: PackageResult, output_path: str):
+    def export_package(self, result: PackageResult, output_path: str,
+                       progress: Optional[ProgressCallback] = None):
         """
         Export a complete policy package to PDF.
 
+        The HTML source is spooled to a temporary file policy by policy
+        rather than assembled as one string.  WeasyPrint still lays out
+        the whole document at once, since page counters span all pages.
+
         Args:
-            result: PackageResult from PackageBuilder
+            result: PackageResult (or PackageStream) from PackageBuilder
             output_path: Path for the output PDF file
+            progress: Called with an 'export' ProgressEvent per policy
+                spooled (bytes of HTML source), then 'save' during layout
         """
-        # Build HTML document
-        html_parts = [
-            '<!DOCTYPE html>',
-            '<html><head><meta charset="utf-8"></head><body>',
-            self._generate_cover_html(result),
-            self._generate_toc_html(result),
-        ]
-
-        # Add each policy
-        for policy in sorted(result.policies, key=lambda p: (p.category, p.title)):
-            html_parts.append(self._generate_policy_html(policy))
-
-        html_parts.append('</body></html>')
-        html_content = '\n'.join(html_parts)
-
-        # Generate PDF
         output = Path(output_path)
         output.parent.mkdir(parents=True, exist_ok=True)
 
-        html = HTML(string=html_content)
-        css = CSS(string=self._get_css())
-        html.write_pdf(str(output), stylesheets=[css])
+        # Build HTML document
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.html',
+                                         dir=output.parent, delete=False) as source:
+            source.write('\n'.join([
+                '<!DOCTYPE html>',
+                '<html><head><meta charset="utf-8"></head><body>',
+                self._generate_cover_html(result),
+                self._generate_toc_html(result),
+            ]))
+
+            # Add each policy
+            for count, policy in enumerate(result.iter_documents(), 1):
+                source.write('\n')
+                source.write(self._generate_policy_html(policy))
+                if progress:
+                    notify(progress, EXPORT, current=count, total=result.total_policies,
+                           format='pdf', item=policy.id, bytes_written=source.tell())
+
+            source.write('\n</body></html>')
 
+        # Generate PDF
+        notify(progress, SAVE, current=result.total_policies, total=result.total_policies,
+               format='pdf')
+        try:
+            html = HTML(filename=source.name, encoding='utf-8')
+            css = CSS(string=self._get_css())
+            html.write_pdf(str(output), stylesheets=[css])
+        finally:
+            os.unlink(source.name)
+
+        notify(progress, SAVED, current=result.total_policies, total=result.total_policies,
+               format='pdf', bytes_written=output.stat().st_size)
         return output
 
     def export_single_policy(self, policy: PolicyDocument, output_path: str, client_name: str = ""):
@@ -0,0 +1,51 @@
+"""
+Progress Module
+Structured progress events for package builds and exports
+
+PackageBuilder and the exporters accept an optional ``progress`` callback
+and call it with a ProgressEvent as work completes: once per policy
+rendered, once per policy written by an exporter, and when the output
+file is saved.  Callers turn the events into whatever they display (the
+web job store, a GUI progress bar); passing no callback costs nothing.
+"""
+
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Optional
+
+# Stages
+RENDER = 'render'  # a policy was rendered
+EXPORT = 'export'  # an exporter wrote a policy
+SAVE = 'save'  # an exporter is writing the output file (PDF layout, DOCX zip)
+SAVED = 'saved'  # the output file is complete
+
+
+@dataclass
+class ProgressEvent:
+    """One step of a package build or export"""
+    stage: str
+    current: int = 0  # items done in this stage
+    total: int = 0  # items in this stage
+    format: str = ""  # exporter format, for export stages
+    item: str = ""  # policy ID just handled
+    bytes_written: int = 0  # output written so far (final file size once saved)
+
+    @property
+    def fraction(self) -> float:
+        """Share of this stage done, from 0 to 1"""
+        if self.stage == SAVED:
+            return 1.0
+        return self.current / self.total if self.total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['fraction'] = round(self.fraction, 4)
+        return data
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+def notify(progress: Optional[ProgressCallback], stage: str, **fields) -> None:
+    """Send an event to ``progress`` if a callback was given"""
+    if progress is not None:
+        progress(ProgressEvent(stage, **fields))
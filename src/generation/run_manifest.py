@@ -0,0 +1,245 @@
+"""
+Run Manifest Module
+SQLite record of bulk generation runs, so an interrupted run can resume
+
+Each run stores its clients, frameworks, formats and output directory,
+plus a status and output file hashes per client.  Resuming a run skips
+clients that already succeeded and retries the rest.
+"""
+
+import json
+import sqlite3
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+# Per-client statuses that a resumed run does not retry
+DONE_STATUSES = ('success',)
+
+
+@dataclass
+class RunClient:
+    """One client's entry in a bulk run"""
+    client_id: str
+    client_name: str
+    position: int
+    base_name: str
+    status: str = "pending"  # pending, success, error, timeout
+    files: List[str] = field(default_factory=list)
+    hashes: Dict[str, str] = field(default_factory=dict)
+    error: str = ""
+    duration: float = 0.0
+    updated_at: str = ""
+
+
+@dataclass
+class BulkRun:
+    """A bulk generation run"""
+    id: str
+    created_at: str
+    updated_at: str
+    frameworks: List[str]
+    formats: List[str]
+    output_dir: str
+    status: str = "running"  # running, complete, incomplete
+    clients: List[RunClient] = field(default_factory=list)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of clients per status"""
+        counts: Dict[str, int] = {}
+        for client in self.clients:
+            counts[client.status] = counts.get(client.status, 0) + 1
+        return counts
+
+    def remaining(self) -> List[RunClient]:
+        """Clients a resumed run still has to generate"""
+        return [c for c in self.clients if c.status not in DONE_STATUSES]
+
+
+class RunManifest:
+    """
+    Persists bulk runs with SQLite.
+
+    Usage:
+        manifest = RunManifest("data/bulk_runs.db")
+        run = manifest.create_run(clients, ["soc2"], ["docx"], "output")
+        manifest.record_result(run.id, result)
+        run = manifest.get_run(run.id)
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _init_db(self):
+        """Initialize database schema"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS bulk_runs (
+                id TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                frameworks TEXT NOT NULL,
+                formats TEXT NOT NULL,
+                output_dir TEXT NOT NULL,
+                status TEXT DEFAULT 'running'
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS bulk_run_clients (
+                run_id TEXT NOT NULL,
+                client_id TEXT NOT NULL,
+                client_name TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                base_name TEXT NOT NULL,
+                status TEXT DEFAULT 'pending',
+                files TEXT DEFAULT '[]',
+                hashes TEXT DEFAULT '{}',
+                error TEXT DEFAULT '',
+                duration REAL DEFAULT 0,
+                updated_at TEXT DEFAULT '',
+                PRIMARY KEY (run_id, client_id),
+                FOREIGN KEY (run_id) REFERENCES bulk_runs(id)
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Get database connection"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create_run(self, clients: List[Any], frameworks: List[str], formats: List[str],
+                   output_dir: str, base_names: Optional[Dict[str, str]] = None) -> BulkRun:
+        """
+        Record a new run before any client is generated.
+
+        Args:
+            clients: Client records (anything with ``id`` and ``name``);
+                repeated IDs are recorded once, at their first position
+            frameworks: Framework override for the run (empty: each client's own)
+            formats: Export formats
+            output_dir: Directory the packages are written to
+            base_names: Output file name (without extension) per client ID
+        """
+        unique: Dict[str, Any] = {}
+        for client in clients:
+            unique.setdefault(client.id, client)
+
+        now = datetime.now().isoformat()
+        run = BulkRun(
+            id=str(uuid.uuid4())[:8],
+            created_at=now,
+            updated_at=now,
+            frameworks=list(frameworks),
+            formats=list(formats),
+            output_dir=str(output_dir),
+            clients=[
+                RunClient(client_id=client.id, client_name=client.name, position=position,
+                          base_name=(base_names or {}).get(client.id, client.id))
+                for position, client in enumerate(unique.values())
+            ]
+        )
+
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO bulk_runs (id, created_at, updated_at, frameworks, formats, output_dir, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (run.id, run.created_at, run.updated_at, json.dumps(run.frameworks),
+              json.dumps(run.formats), run.output_dir, run.status))
+        cursor.executemany('''
+            INSERT INTO bulk_run_clients (run_id, client_id, client_name, position, base_name)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(run.id, c.client_id, c.client_name, c.position, c.base_name) for c in run.clients])
+        conn.commit()
+        conn.close()
+
+        return run
+
+    def get_run(self, run_id: str) -> Optional[BulkRun]:
+        """Get a run with its clients, in their original order"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM bulk_runs WHERE id = ?', (run_id,))
+        row = cursor.fetchone()
+        if not row:
+            conn.close()
+            return None
+
+        cursor.execute('''
+            SELECT * FROM bulk_run_clients WHERE run_id = ? ORDER BY position
+        ''', (run_id,))
+        client_rows = cursor.fetchall()
+        conn.close()
+
+        return BulkRun(
+            id=row['id'],
+            created_at=row['created_at'],
+            updated_at=row['updated_at'],
+            frameworks=json.loads(row['frameworks']),
+            formats=json.loads(row['formats']),
+            output_dir=row['output_dir'],
+            status=row['status'],
+            clients=[RunClient(
+                client_id=c['client_id'],
+                client_name=c['client_name'],
+                position=c['position'],
+                base_name=c['base_name'],
+                status=c['status'],
+                files=json.loads(c['files']),
+                hashes=json.loads(c['hashes']),
+                error=c['error'],
+                duration=c['duration'],
+                updated_at=c['updated_at']
+            ) for c in client_rows]
+        )
+
+    def list_runs(self, limit: int = 20) -> List[BulkRun]:
+        """Most recent runs first"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('SELECT id FROM bulk_runs ORDER BY created_at DESC LIMIT ?', (limit,))
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [self.get_run(row['id']) for row in rows]
+
+    def record_result(self, run_id: str, result) -> None:
+        """Store one client's outcome as soon as it finishes"""
+        now = datetime.now().isoformat()
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE bulk_run_clients
+            SET status = ?, files = ?, hashes = ?, error = ?, duration = ?, updated_at = ?
+            WHERE run_id = ? AND client_id = ?
+        ''', (result.status, json.dumps(result.files), json.dumps(result.hashes),
+              result.error, result.duration, now, run_id, result.client_id))
+        cursor.execute('UPDATE bulk_runs SET updated_at = ? WHERE id = ?', (now, run_id))
+        conn.commit()
+        conn.close()
+
+    def finish_run(self, run_id: str) -> Optional[BulkRun]:
+        """Mark a run complete, or incomplete if any client still needs a retry"""
+        run = self.get_run(run_id)
+        if not run:
+            return None
+
+        run.status = "incomplete" if run.remaining() else "complete"
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('UPDATE bulk_runs SET status = ?, updated_at = ? WHERE id = ?',
+                       (run.status, datetime.now().isoformat(), run_id))
+        conn.commit()
+        conn.close()
+        return run
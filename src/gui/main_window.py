@@ -276,9 +276,7 @@ class PolicyUpdateGUI:
     def _get_mapper(self):
         """Lazy load compliance mapper"""
         if self._mapper is None:
-            from core.compliance_mapper import ComplianceMapper
-            self._mapper = ComplianceMapper()
-            self._mapper.load_all_frameworks(str(PROJECT_ROOT / "config" / "frameworks"))
+            self._mapper = self._get_builder().compliance_mapper
         return self._mapper
 
     def _get_client_manager(self):
@@ -525,6 +525,13 @@ class PolicyUpdatePro(ctk.CTk):
         )
         gen_btn.pack(fill="x", pady=10)
 
+        # Progress of the running generation
+        self.gen_progress = ctk.CTkProgressBar(form, height=10, progress_color=COLORS["primary"])
+        self.gen_progress.set(0)
+        self.gen_progress.pack(fill="x", pady=(5, 0))
+        self.gen_progress_label = ctk.CTkLabel(form, text="", anchor="w")
+        self.gen_progress_label.pack(fill="x")
+
         # Right - Preview/Output
         preview_card = ModernCard(page, title="Generation Output")
         preview_card.grid(row=0, column=1, sticky="nsew")
@@ -585,9 +592,7 @@ class PolicyUpdatePro(ctk.CTk):
         """Lazy load compliance mapper"""
         if self._mapper is None:
             try:
-                from core.compliance_mapper import ComplianceMapper
-                self._mapper = ComplianceMapper()
-                self._mapper.load_all_frameworks(str(PROJECT_ROOT / "config" / "frameworks"))
+                self._mapper = self._get_builder().compliance_mapper
             except Exception as e:
                 print(f"Could not load ComplianceMapper: {e}")
         return self._mapper
@@ -846,6 +851,12 @@ class PolicyUpdatePro(ctk.CTk):
         self.gen_output.delete("1.0", "end")
         self.gen_output.insert("1.0", f"🔄 Generating package for {org_name}...\n\n")
         self.gen_output.configure(state="disabled")
+        self.gen_progress.set(0)
+        self.gen_progress_label.configure(text="")
+
+        def progress(event):
+            # Called from the worker thread; Tk must be updated on the main loop
+            self.after(0, lambda: self._update_gen_progress(event))
 
         def generate():
             try:
@@ -865,7 +876,7 @@ class PolicyUpdatePro(ctk.CTk):
                     frameworks=selected if selected else ['soc2']
                 )
 
-                result = builder.build_package(config)
+                result = builder.build_package(config, progress=progress)
 
                 output_dir = PROJECT_ROOT / "output"
                 output_dir.mkdir(exist_ok=True)
@@ -885,7 +896,7 @@ class PolicyUpdatePro(ctk.CTk):
                     from generation.docx_exporter import DocxExporter
                     exporter = DocxExporter()
                     path = output_dir / f"{safe_name}_{timestamp}.docx"
-                    exporter.export_package(result, str(path))
+                    exporter.export_package(result, str(path), progress=progress)
                     messages.append(f"📄 Word document: {path.name}")
                 except ImportError:
                     messages.append("⚠️ DOCX export requires python-docx")
@@ -897,6 +908,24 @@ class PolicyUpdatePro(ctk.CTk):
 
         threading.Thread(target=generate, daemon=True).start()
 
+    def _update_gen_progress(self, event):
+        """Show a build or export progress event; rendering fills the first half of the bar"""
+        from generation.progress import RENDER, EXPORT, SAVE
+
+        if event.stage == RENDER:
+            self.gen_progress.set(event.fraction * 0.5)
+            text = f"Rendering policies: {event.current} of {event.total}"
+        else:
+            self.gen_progress.set(0.5 + event.fraction * 0.5)
+            size = f"{event.bytes_written / 1024:,.0f} KB"
+            if event.stage == EXPORT:
+                text = f"Writing {event.format.upper()}: {event.current} of {event.total} policies ({size})"
+            elif event.stage == SAVE:
+                text = f"Saving {event.format.upper()} file..."
+            else:
+                text = f"{event.format.upper()} saved ({size})"
+        self.gen_progress_label.configure(text=text)
+
     def _update_gen_output(self, text: str):
         """Update generation output"""
         self.gen_output.configure(state="normal")
@@ -0,0 +1,302 @@
+"""
+Admission Control Module
+Concurrency limit with a bounded wait queue for expensive routes
+
+Expensive requests (package generation, coverage analysis, audit export)
+carry a cost weight from RateLimitConfig.route_costs.  Their combined cost
+in flight is capped across every web worker on the node; a request that
+does not fit waits in a FIFO queue, and when the queue is full or the wait
+times out it is turned away with 503 and a Retry-After estimate.  Cheap
+requests never touch the controller, so they keep being served while the
+heavy routes are saturated.
+
+State lives in SQLite so that all gunicorn worker processes share one
+limit.  Each holder records its process_owner() token (PID and process
+start time); slots held by a process that has exited, including one from
+before a container restart whose PID a new worker reuses, are reclaimed
+on the next acquire and when the app starts.
+"""
+
+import math
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterator, Optional
+
+try:
+    from flask import request, jsonify, g
+    FLASK_AVAILABLE = True
+except ImportError:
+    FLASK_AVAILABLE = False
+
+from web.jobs import add_missing_column, owner_alive, process_owner
+
+# Holder states
+RUNNING = 'running'
+WAITING = 'waiting'
+
+# Seconds between checks while waiting in the queue
+POLL_INTERVAL = 0.05
+
+
+class AdmissionRejected(Exception):
+    """The wait queue is full or the wait timed out"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Weighted concurrency limiter with a bounded FIFO queue, shared through SQLite.
+
+    Usage:
+        admission = AdmissionController("data/admission.db", capacity=20)
+        with admission.admit("/api/generate", cost=10):
+            ...  # at most 20 cost units run at once across all processes
+    """
+
+    def __init__(self, db_path: str, capacity: int = 20, max_queue: int = 8,
+                 queue_timeout: float = 15.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.capacity = max(1, capacity)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._hold_times: Dict[str, float] = {}  # route -> moving average of seconds held
+        self._hold_lock = Lock()
+        self._init_db()
+
+    def _init_db(self):
+        """Initialize database schema"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS admission (
+                ticket INTEGER PRIMARY KEY AUTOINCREMENT,
+                route TEXT NOT NULL,
+                cost INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                pid INTEGER NOT NULL,
+                owner TEXT NOT NULL DEFAULT '',
+                created_at REAL NOT NULL
+            )
+        ''')
+        add_missing_column(cursor, 'admission', 'owner', "TEXT NOT NULL DEFAULT ''")
+
+        conn.commit()
+        conn.close()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Get database connection; transactions are opened explicitly"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _reclaim(self, cursor: sqlite3.Cursor) -> None:
+        """Drop holders whose process has exited"""
+        owner = process_owner()
+        cursor.execute('SELECT DISTINCT owner FROM admission')
+        dead = [row['owner'] for row in cursor.fetchall()
+                if row['owner'] != owner and not owner_alive(row['owner'])]
+        cursor.executemany('DELETE FROM admission WHERE owner = ?', [(o,) for o in dead])
+
+    def reclaim(self) -> None:
+        """Free the slots of processes that have exited, e.g. before a restart"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            self._reclaim(cursor)
+            cursor.execute('COMMIT')
+        finally:
+            conn.close()
+
+    def _in_use(self, cursor: sqlite3.Cursor) -> int:
+        cursor.execute('SELECT COALESCE(SUM(cost), 0) FROM admission WHERE state = ?', (RUNNING,))
+        return cursor.fetchone()[0]
+
+    def _queued(self, cursor: sqlite3.Cursor) -> int:
+        cursor.execute('SELECT COUNT(*) FROM admission WHERE state = ?', (WAITING,))
+        return cursor.fetchone()[0]
+
+    def acquire(self, route: str, cost: int, timeout: Optional[float] = None,
+                bounded: bool = True) -> int:
+        """
+        Take ``cost`` units of capacity, waiting in line if necessary.
+
+        Args:
+            route: Route the capacity is for (used for Retry-After estimates)
+            cost: Units needed; capped at the capacity so any request can run alone
+            timeout: Seconds to wait (default: queue_timeout; math.inf: no limit)
+            bounded: Turn the request away if the queue is already full.
+                Background jobs that were accepted earlier pass False.
+
+        Returns:
+            Ticket to pass to release()
+
+        Raises:
+            AdmissionRejected: Queue full or wait timed out
+        """
+        cost = min(max(1, cost), self.capacity)
+        if timeout is None:
+            timeout = self.queue_timeout
+
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            self._reclaim(cursor)
+            queued = self._queued(cursor)
+            if queued == 0 and self._in_use(cursor) + cost <= self.capacity:
+                state = RUNNING
+            elif bounded and queued >= self.max_queue:
+                cursor.execute('COMMIT')
+                raise AdmissionRejected('Server busy: request queue is full',
+                                        self.retry_after(route, cost, queued))
+            else:
+                state = WAITING
+            cursor.execute('''
+                INSERT INTO admission (route, cost, state, pid, owner, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (route, cost, state, os.getpid(), process_owner(), time.time()))
+            ticket = cursor.lastrowid
+            cursor.execute('COMMIT')
+            if state == RUNNING:
+                return ticket
+
+            deadline = time.monotonic() + timeout
+            try:
+                while True:
+                    time.sleep(POLL_INTERVAL)
+                    cursor.execute('BEGIN IMMEDIATE')
+                    self._reclaim(cursor)
+                    cursor.execute('SELECT MIN(ticket) FROM admission WHERE state = ?', (WAITING,))
+                    if cursor.fetchone()[0] == ticket and self._in_use(cursor) + cost <= self.capacity:
+                        cursor.execute('UPDATE admission SET state = ? WHERE ticket = ?', (RUNNING, ticket))
+                        cursor.execute('COMMIT')
+                        return ticket
+                    cursor.execute('COMMIT')
+
+                    if time.monotonic() >= deadline:
+                        queued = self._queued(cursor)
+                        raise AdmissionRejected('Server busy: timed out waiting in the request queue',
+                                                self.retry_after(route, cost, queued))
+            except BaseException:
+                # Leave the queue; a stale waiting ticket would block everyone behind it
+                if conn.in_transaction:
+                    cursor.execute('ROLLBACK')
+                cursor.execute('DELETE FROM admission WHERE ticket = ?', (ticket,))
+                raise
+        finally:
+            conn.close()
+
+    def release(self, ticket: int, route: Optional[str] = None,
+                held: Optional[float] = None) -> None:
+        """Return a ticket's capacity, recording how long it was held"""
+        conn = self._get_conn()
+        conn.execute('DELETE FROM admission WHERE ticket = ?', (ticket,))
+        conn.close()
+
+        if route is not None and held is not None:
+            with self._hold_lock:
+                previous = self._hold_times.get(route)
+                self._hold_times[route] = held if previous is None else 0.8 * previous + 0.2 * held
+
+    @contextmanager
+    def admit(self, route: str, cost: int, timeout: Optional[float] = None,
+              bounded: bool = True) -> Iterator[int]:
+        """acquire() and release() around a block"""
+        ticket = self.acquire(route, cost, timeout=timeout, bounded=bounded)
+        started = time.monotonic()
+        try:
+            yield ticket
+        finally:
+            self.release(ticket, route, time.monotonic() - started)
+
+    def queue_full(self) -> bool:
+        conn = self._get_conn()
+        try:
+            return self._queued(conn.cursor()) >= self.max_queue
+        finally:
+            conn.close()
+
+    def retry_after(self, route: str, cost: int, queued: int) -> int:
+        """Seconds until a request of this cost is likely to be admitted"""
+        with self._hold_lock:
+            hold = self._hold_times.get(route, max(self._hold_times.values(), default=5.0))
+        parallel = max(1, self.capacity // max(1, cost))
+        return max(1, math.ceil(hold * (queued + 1) / parallel))
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        in_use, queued = self._in_use(cursor), self._queued(cursor)
+        conn.close()
+        return {'capacity': self.capacity, 'in_use': in_use, 'queued': queued,
+                'max_queue': self.max_queue}
+
+
+def busy_response(error: AdmissionRejected):
+    """503 response telling the client when to retry"""
+    response = jsonify({
+        'error': 'Service busy',
+        'message': str(error),
+        'retry_after': error.retry_after
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def init_admission_control(app, config, db_path: str) -> AdmissionController:
+    """
+    Admit requests to the routes in ``config.route_costs`` through a shared controller.
+
+    Requests that start a background job (JSON body with "async": true)
+    are not held here; they are only turned away when the queue is full,
+    and their job is admitted when it starts running.
+    """
+    controller = AdmissionController(
+        db_path,
+        capacity=config.max_concurrent_cost,
+        max_queue=config.max_queued_requests,
+        queue_timeout=config.queue_timeout
+    )
+    # Slots left by the previous server incarnation would otherwise hold capacity
+    controller.reclaim()
+
+    @app.before_request
+    def admit_expensive_request():
+        cost = config.cost_for(request.path)
+        if cost <= 1:
+            return None
+
+        body = request.get_json(silent=True) if request.is_json else None
+        if isinstance(body, dict) and body.get('async'):
+            if controller.queue_full():
+                return busy_response(AdmissionRejected(
+                    'Server busy: request queue is full',
+                    controller.retry_after(request.path, cost, controller.max_queue)))
+            return None
+
+        try:
+            g.admission_ticket = controller.acquire(request.path, cost)
+        except AdmissionRejected as e:
+            return busy_response(e)
+        g.admission_started = time.monotonic()
+        return None
+
+    @app.teardown_request
+    def release_admission(exc=None):
+        ticket = g.pop('admission_ticket', None)
+        if ticket is not None:
+            controller.release(ticket, request.path, time.monotonic() - g.pop('admission_started'))
+
+    return controller
@@ -3,6 +3,8 @@ Flask Web Application
 Web interface for the GRC Policy Management Platform
 """
 
+import json
+import math
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -13,7 +15,7 @@ PROJECT_ROOT = WEB_DIR.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT / "src"))
 
 try:
-    from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for
+    from flask import Flask, Response, render_template, request, jsonify, send_file, redirect, url_for
     FLASK_AVAILABLE = True
 except ImportError:
     FLASK_AVAILABLE = False
@@ -73,15 +75,23 @@ def create_app(config=None):
         logger.warning("Flask-Login not available, running without authentication")
 
     # Initialize rate limiting
+    admission = None
     try:
         from web.rate_limiter import init_rate_limiter, RateLimitConfig
+        from web.admission import init_admission_control
         rate_config = RateLimitConfig(
             requests_per_minute=100,
             requests_per_hour=1000,
             auth_multiplier=2.0,
-            exempt_paths=['/auth/login', '/api/health', '/static', '/']
+            exempt_paths=['/auth/login', '/api/health', '/static', '/'],
+            # With 'sqlite', every worker process enforces one shared limit
+            backend=app.config.get('RATE_LIMIT_BACKEND', app_config.web.rate_limit_backend),
+            state_path=app.config.get('RATE_LIMIT_DB', str(PROJECT_ROOT / "data" / "rate_limits.db"))
         )
         init_rate_limiter(app, rate_config)
+        # Expensive routes share a concurrency limit across all workers
+        admission = init_admission_control(
+            app, rate_config, app.config.get('ADMISSION_DB', str(PROJECT_ROOT / "data" / "admission.db")))
         logger.info("Rate limiting initialized")
     except ImportError:
         logger.warning("Rate limiter not available")
@@ -98,30 +108,46 @@ def create_app(config=None):
     # Lazy-load modules
     _cache = {}
 
-    def get_package_builder():
-        if 'builder' not in _cache:
-            from generation.package_builder import PackageBuilder
-            _cache['builder'] = PackageBuilder(
+    def get_policy_library():
+        if 'library' not in _cache:
+            from core.policy_library import get_policy_library as shared_library
+            _cache['library'] = shared_library(
                 str(PROJECT_ROOT / "policies"),
                 str(PROJECT_ROOT / "config" / "frameworks")
             )
+        return _cache['library']
+
+    def get_package_builder():
+        if 'builder' not in _cache:
+            from generation.package_builder import PackageBuilder
+            _cache['builder'] = PackageBuilder(library=get_policy_library())
         return _cache['builder']
 
+    def get_output_cache():
+        if 'output_cache' not in _cache:
+            from generation.output_cache import OutputCache
+            _cache['output_cache'] = OutputCache(
+                str(app.config.get('OUTPUT_DIR', PROJECT_ROOT / "output")),
+                app.config.get('OUTPUT_CACHE_DB', str(app_config.get_output_cache_db_path())),
+                max_bytes=app_config.output_cache_mb * 1024 * 1024
+            )
+        return _cache['output_cache']
+
+    def get_job_runner():
+        if 'jobs' not in _cache:
+            from web.jobs import JobRunner, JobStore
+            _cache['jobs'] = JobRunner(
+                JobStore(app.config.get('JOBS_DB', str(PROJECT_ROOT / "data" / "jobs.db"))),
+                workers=app_config.web.job_workers
+            )
+        return _cache['jobs']
+
     def get_compliance_mapper():
-        if 'mapper' not in _cache:
-            from core.compliance_mapper import ComplianceMapper
-            mapper = ComplianceMapper()
-            mapper.load_all_frameworks(str(PROJECT_ROOT / "config" / "frameworks"))
-            _cache['mapper'] = mapper
-        return _cache['mapper']
+        return get_policy_library().compliance_mapper
 
     def get_gap_analyzer():
-        if 'analyzer' not in _cache:
-            from core.gap_analyzer import GapAnalyzer
-            analyzer = GapAnalyzer(compliance_mapper=get_compliance_mapper())
-            analyzer.load_policy_library_from_dir(str(PROJECT_ROOT / "policies"))
-            _cache['analyzer'] = analyzer
-        return _cache['analyzer']
+        # Rebuilt by the library whenever the policies change on disk
+        return get_policy_library().get_gap_analyzer()
 
     def get_client_manager():
         if 'clients' not in _cache:
@@ -656,22 +682,23 @@ def create_app(config=None):
             return jsonify({'error': 'Variable name required'}), 400
 
         manager = get_client_manager()
-        manager.set_variable(client_id, data['name'], data.get('value', ''))
+        client = manager.set_variable(client_id, data['name'], data.get('value', ''))
+        if not client:
+            return jsonify({'error': 'Client not found'}), 404
 
-        return jsonify({'message': 'Variable set'})
+        # Policies whose next render changes; the rest are served from the render cache
+        affected = get_policy_library().policies_using_variables([data['name']])
+
+        return jsonify({'message': 'Variable set', 'affected_policies': sorted(affected)})
 
     # =========================================================================
     # GENERATION API
     # =========================================================================
 
-    @app.route('/api/generate', methods=['POST'])
-    def api_generate():
-        """Generate a policy package"""
-        data = request.get_json()
-        if not data or 'client_name' not in data:
-            return jsonify({'error': 'client_name required'}), 400
-
+    def generate_package(data, username=None, ip_address=None, progress=None):
+        """Build and export a package for an /api/generate request body"""
         from generation.package_builder import ClientConfig
+        from generation.progress import SAVED, notify
 
         builder = get_package_builder()
 
@@ -692,78 +719,161 @@ def create_app(config=None):
             frameworks=data.get('frameworks', [])
         )
 
-        result = builder.build_package(config)
-
         # Determine output format
         output_format = data.get('format', 'docx')
-        output_dir = PROJECT_ROOT / "output"
-        output_dir.mkdir(exist_ok=True)
+        formats = ['docx', 'pdf', 'html'] if output_format == 'all' else [output_format]
+        missing = {
+            'docx': ('docx_error', 'python-docx not installed'),
+            'pdf': ('pdf_error', 'weasyprint not installed'),
+            'html': ('html_error', 'HTML exporter not available'),
+        }
 
+        from generation.bulk_runner import load_exporter
+
+        # Exports are cached by package content, so a repeat request reuses the files
+        cache = get_output_cache()
+        package_key = builder.package_key(config)
         safe_name = sanitize_filename(data['client_name'].lower().replace(' ', '_'))
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        result = None
+        summary = None
+        files = []
+        errors = {}
+        for fmt in formats:
+            if fmt not in missing:
+                continue
+            exporter = load_exporter(fmt)
+            if exporter is None:
+                errors[missing[fmt][0]] = missing[fmt][1]
+                continue
+
+            key = cache.key(package_key, fmt, exporter)
+            entry = cache.get(key)
+            cached = entry is not None
+            if entry is None:
+                if result is None:
+                    result = builder.build_package(config, progress=progress)
+                entry = cache.export(
+                    key, safe_name, fmt,
+                    lambda path: exporter.export_package(result, path, progress=progress),
+                    info={
+                        'total_policies': result.total_policies,
+                        'incomplete_count': result.incomplete_count,
+                        'frameworks': result.frameworks_covered
+                    })
+            else:
+                notify(progress, SAVED, format=fmt, bytes_written=entry.size)
+
+            summary = summary or entry.info
+            files.append({
+                'format': fmt,
+                'filename': entry.path.name,
+                'path': str(entry.path),
+                'cached': cached
+            })
+
+        if result is None and summary is None:
+            # Nothing exported; still report the package contents
+            result = builder.build_package(config)
+        if result is not None:
+            summary = {
+                'total_policies': result.total_policies,
+                'incomplete_count': result.incomplete_count,
+                'frameworks': result.frameworks_covered
+            }
 
         response_data = {
             'client_name': data['client_name'],
-            'total_policies': result.total_policies,
-            'incomplete_count': result.incomplete_count,
-            'frameworks': result.frameworks_covered,
-            'files': []
+            'total_policies': summary['total_policies'],
+            'incomplete_count': summary['incomplete_count'],
+            'frameworks': summary['frameworks'],
+            'files': files,
+            **errors
         }
 
-        if output_format in ['docx', 'all']:
-            try:
-                from generation.docx_exporter import DocxExporter
-                exporter = DocxExporter()
-                docx_path = output_dir / f"{safe_name}_{timestamp}.docx"
-                exporter.export_package(result, str(docx_path))
-                response_data['files'].append({
-                    'format': 'docx',
-                    'filename': docx_path.name,
-                    'path': str(docx_path)
-                })
-            except ImportError:
-                response_data['docx_error'] = 'python-docx not installed'
-
-        if output_format in ['pdf', 'all']:
-            try:
-                from generation.pdf_exporter import PdfExporter
-                exporter = PdfExporter()
-                pdf_path = output_dir / f"{safe_name}_{timestamp}.pdf"
-                exporter.export_package(result, str(pdf_path))
-                response_data['files'].append({
-                    'format': 'pdf',
-                    'filename': pdf_path.name,
-                    'path': str(pdf_path)
-                })
-            except ImportError:
-                response_data['pdf_error'] = 'weasyprint not installed'
-
-        if output_format in ['html', 'all']:
-            try:
-                from generation.html_exporter import HtmlExporter
-                exporter = HtmlExporter()
-                html_path = output_dir / f"{safe_name}_{timestamp}.html"
-                exporter.export_package(result, str(html_path))
-                response_data['files'].append({
-                    'format': 'html',
-                    'filename': html_path.name,
-                    'path': str(html_path)
-                })
-            except ImportError:
-                response_data['html_error'] = 'HTML exporter not available'
-
         # Audit log
         if HAS_AUDIT and audit_logger:
             audit_logger.log(
                 action=AuditAction.PACKAGE_GENERATE,
                 resource_type='package',
                 resource_id=safe_name,
-                details=f"Generated {result.total_policies} policies for {data['client_name']}",
-                username=current_user.username if HAS_AUTH and current_user else None,
-                ip_address=request.remote_addr
+                details=f"Generated {summary['total_policies']} policies for {data['client_name']}",
+                username=username,
+                ip_address=ip_address
             )
 
-        return jsonify(response_data)
+        return response_data
+
+    @app.route('/api/generate', methods=['POST'])
+    def api_generate():
+        """Generate a policy package, inline or as a background job"""
+        data = request.get_json()
+        if not data or 'client_name' not in data:
+            return jsonify({'error': 'client_name required'}), 400
+
+        username = current_user.username if HAS_AUTH and current_user and \
+            current_user.is_authenticated else None
+        ip_address = request.remote_addr
+
+        if data.get('async'):
+            def run(params, progress):
+                if admission is None:
+                    return generate_package(params, username, ip_address, progress)
+                # Already accepted, so wait for capacity however long the queue is
+                with admission.admit(request_path, rate_config.cost_for(request_path),
+                                     timeout=math.inf, bounded=False):
+                    return generate_package(params, username, ip_address, progress)
+
+            request_path = request.path
+            params = {k: v for k, v in data.items() if k != 'async'}
+            job = get_job_runner().submit('generate', params, run, username=username)
+            response = jsonify(job.to_dict())
+            response.headers['Location'] = url_for('api_job', job_id=job.id)
+            return response, 202
+
+        return jsonify(generate_package(data, username, ip_address))
+
+    @app.route('/api/jobs')
+    def api_jobs():
+        """List recent background jobs"""
+        status = request.args.get('status')
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        jobs = get_job_runner().store.list_jobs(status=status, limit=limit)
+        return jsonify([job.to_dict() for job in jobs])
+
+    @app.route('/api/jobs/<job_id>')
+    def api_job(job_id):
+        """Get a background job's status and, once finished, its result"""
+        job = get_job_runner().store.get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job.to_dict())
+
+    @app.route('/api/jobs/<job_id>/events')
+    def api_job_events(job_id):
+        """Stream a background job's progress as server-sent events"""
+        store = get_job_runner().store
+        if not store.get_job(job_id):
+            return jsonify({'error': 'Job not found'}), 404
+
+        # EventSource resends the last id it saw when it reconnects
+        after = request.headers.get('Last-Event-ID', request.args.get('after', 0))
+        try:
+            after = int(after)
+        except (TypeError, ValueError):
+            after = 0
+
+        def stream():
+            yield 'retry: 1000\n\n'
+            # End before a sync worker's timeout; the client reconnects and resumes
+            for event, seq, data in store.watch(job_id, after=after,
+                                                timeout=app.config.get('SSE_STREAM_SECONDS', 25)):
+                if event == 'timeout':
+                    return
+                yield f"id: {seq}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+        return Response(stream(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
     @app.route('/api/download/<filename>')
     def api_download(filename):
@@ -774,7 +884,7 @@ def create_app(config=None):
         except:
             return jsonify({'error': 'Invalid filename'}), 400
 
-        output_dir = PROJECT_ROOT / "output"
+        output_dir = Path(app.config.get('OUTPUT_DIR', PROJECT_ROOT / "output"))
         file_path = output_dir / safe_filename
 
         if not file_path.exists():
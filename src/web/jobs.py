@@ -0,0 +1,435 @@
+"""
+Background Jobs Module
+SQLite-backed job queue for long-running web requests
+
+A request that would build and export a package inline is stored as a
+job and handed to a local thread pool; the HTTP response returns the job
+ID at once and clients poll the job for its status and result.  Jobs live
+in SQLite, so every worker process on the node sees the same jobs, and a
+job whose process died is reported as failed instead of staying queued;
+owners are checked whenever jobs are read or submitted, so this does not
+wait for a worker to restart.
+Jobs record their owner as a process_owner() token, PID plus process
+start time, so a job left by a restarted container is not mistaken for
+one run by a new worker that happens to get the same PID.
+
+A running job stores its latest progress event (see generation.progress)
+with a sequence number; watch() turns that into a stream of updates for
+server-sent events.
+"""
+
+import json
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from core.config import get_logger
+
+logger = get_logger('web.jobs')
+
+# Job statuses
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETE = 'complete'
+FAILED = 'failed'
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+# Minimum seconds between stored progress updates of one job (stage changes always go through)
+PROGRESS_INTERVAL = 0.2
+
+
+@dataclass
+class Job:
+    """A background job and its outcome"""
+    id: str
+    kind: str
+    status: str = QUEUED
+    params: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: str = ""
+    username: Optional[str] = None
+    pid: int = 0
+    owner: str = ""
+    created_at: str = ""
+    started_at: str = ""
+    finished_at: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data['pid'], data['owner']
+        return data
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process with this ID still exists"""
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def process_start_time(pid: int) -> Optional[int]:
+    """When a process started, in clock ticks since boot (None where /proc is unavailable)"""
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # The command name may contain spaces and parentheses; the fields after it are fixed
+    return int(stat.rsplit(b')', 1)[1].split()[19])
+
+
+_own_owner: Tuple[int, str] = (0, "")
+
+
+def process_owner() -> str:
+    """
+    Token naming this incarnation of the current process.
+
+    A PID alone is reused, most visibly when a container restarts and its
+    new workers get the same low PIDs as the old ones; the start time
+    tells the two apart.  Where /proc is unavailable the token is the PID.
+    """
+    global _own_owner
+    pid = os.getpid()
+    if _own_owner[0] != pid:
+        started = process_start_time(pid)
+        _own_owner = (pid, f"{pid}:{started}" if started is not None else str(pid))
+    return _own_owner[1]
+
+
+def owner_alive(owner: str) -> bool:
+    """Whether the process incarnation named by a process_owner() token is still running"""
+    pid, _, started = (owner or "").partition(':')
+    if not pid.isdigit() or not pid_alive(int(pid)):
+        return False
+    return not started or str(process_start_time(int(pid))) == started
+
+
+def add_missing_column(cursor: sqlite3.Cursor, table: str, column: str, definition: str) -> None:
+    """Add a column to a table created by an earlier version"""
+    cursor.execute(f'PRAGMA table_info({table})')
+    if column not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+
+class JobStore:
+    """
+    Persists jobs with SQLite.
+
+    Usage:
+        store = JobStore("data/jobs.db")
+        job = store.create_job("generate", {"client_name": "Acme"})
+        store.start_job(job.id)
+        store.finish_job(job.id, result={...})
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _init_db(self):
+        """Initialize database schema"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT DEFAULT 'queued',
+                params TEXT DEFAULT '{}',
+                result TEXT,
+                error TEXT DEFAULT '',
+                username TEXT,
+                pid INTEGER DEFAULT 0,
+                owner TEXT DEFAULT '',
+                created_at TEXT NOT NULL,
+                started_at TEXT DEFAULT '',
+                finished_at TEXT DEFAULT ''
+            )
+        ''')
+        add_missing_column(cursor, 'jobs', 'owner', "TEXT DEFAULT ''")
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at)')
+
+        # Latest progress event per job
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS job_progress (
+                job_id TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL,
+                event TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                FOREIGN KEY (job_id) REFERENCES jobs(id)
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Get database connection"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _row_to_job(self, row: sqlite3.Row) -> Job:
+        return Job(
+            id=row['id'],
+            kind=row['kind'],
+            status=row['status'],
+            params=json.loads(row['params'] or '{}'),
+            result=json.loads(row['result']) if row['result'] else None,
+            error=row['error'] or "",
+            username=row['username'],
+            pid=row['pid'] or 0,
+            owner=row['owner'] or "",
+            created_at=row['created_at'],
+            started_at=row['started_at'] or "",
+            finished_at=row['finished_at'] or ""
+        )
+
+    def create_job(self, kind: str, params: Dict[str, Any],
+                   username: Optional[str] = None) -> Job:
+        """Record a queued job owned by this process"""
+        job = Job(
+            id=str(uuid.uuid4())[:8],
+            kind=kind,
+            params=dict(params),
+            username=username,
+            pid=os.getpid(),
+            owner=process_owner(),
+            created_at=datetime.now().isoformat()
+        )
+
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO jobs (id, kind, status, params, username, pid, owner, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (job.id, job.kind, job.status, json.dumps(job.params), job.username,
+              job.pid, job.owner, job.created_at))
+        conn.commit()
+        conn.close()
+
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """A job, failed first if its owning process has exited"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM jobs WHERE id = ?', (job_id,))
+        row = cursor.fetchone()
+        if row and row['status'] in ACTIVE_STATUSES and not owner_alive(row['owner']):
+            self._fail_interrupted(cursor, [job_id])
+            conn.commit()
+            cursor.execute('SELECT * FROM jobs WHERE id = ?', (job_id,))
+            row = cursor.fetchone()
+        conn.close()
+
+        return self._row_to_job(row) if row else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        """Most recent jobs first"""
+        self.fail_orphaned()
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        if status:
+            cursor.execute('SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?',
+                           (status, limit))
+        else:
+            cursor.execute('SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?', (limit,))
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [self._row_to_job(row) for row in rows]
+
+    def start_job(self, job_id: str) -> None:
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('UPDATE jobs SET status = ?, started_at = ? WHERE id = ?',
+                       (RUNNING, datetime.now().isoformat(), job_id))
+        conn.commit()
+        conn.close()
+
+    def finish_job(self, job_id: str, result: Optional[Dict[str, Any]] = None,
+                   error: str = "") -> None:
+        """Mark a job complete with its result, or failed with an error"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?
+            WHERE id = ?
+        ''', (FAILED if error else COMPLETE,
+              json.dumps(result) if result is not None else None,
+              error, datetime.now().isoformat(), job_id))
+        conn.commit()
+        conn.close()
+
+    def record_progress(self, job_id: str, event: Dict[str, Any]) -> None:
+        """Replace a job's progress with a newer event"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO job_progress (job_id, seq, event, updated_at) VALUES (?, 1, ?, ?)
+            ON CONFLICT(job_id) DO UPDATE
+            SET seq = seq + 1, event = excluded.event, updated_at = excluded.updated_at
+        ''', (job_id, json.dumps(event), datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+
+    def get_progress(self, job_id: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """(sequence number, latest progress event) of a job; (0, None) before the first"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('SELECT seq, event FROM job_progress WHERE job_id = ?', (job_id,))
+        row = cursor.fetchone()
+        conn.close()
+
+        return (row['seq'], json.loads(row['event'])) if row else (0, None)
+
+    def watch(self, job_id: str, after: int = 0, interval: float = 0.25,
+              timeout: Optional[float] = None) -> Iterator[Tuple[str, int, Optional[Dict[str, Any]]]]:
+        """
+        Follow a job until it finishes.
+
+        Yields ('progress', seq, event) for each progress update newer than
+        ``after``, then (status, seq, job) once the job is complete or failed.
+        Updates between two polls are coalesced into the latest one.  With
+        ``timeout``, stops after that many seconds, yielding ('timeout', seq,
+        None) so the caller can resume later from ``seq``.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        last = after
+        while True:
+            job = self.get_job(job_id)
+            if job is None:
+                return
+
+            seq, event = self.get_progress(job_id)
+            if seq > last:
+                last = seq
+                yield 'progress', seq, event
+
+            if job.status not in ACTIVE_STATUSES:
+                yield job.status, last, job.to_dict()
+                return
+            if deadline is not None and time.monotonic() >= deadline:
+                yield 'timeout', last, None
+                return
+            time.sleep(interval)
+
+    def fail_orphaned(self) -> int:
+        """
+        Fail queued or running jobs whose owning process has exited.
+
+        Jobs recorded before owners were stored cannot be matched to a
+        process and count as orphaned.
+
+        Returns:
+            Number of jobs marked failed
+        """
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, owner FROM jobs WHERE status IN (?, ?)', ACTIVE_STATUSES)
+        orphaned = [row['id'] for row in cursor.fetchall() if not owner_alive(row['owner'])]
+        self._fail_interrupted(cursor, orphaned)
+        conn.commit()
+        conn.close()
+        return len(orphaned)
+
+    @staticmethod
+    def _fail_interrupted(cursor: sqlite3.Cursor, job_ids: List[str]) -> None:
+        """Fail jobs whose process exited, unless they finished in the meantime"""
+        now = datetime.now().isoformat()
+        cursor.executemany('''
+            UPDATE jobs SET status = ?, error = ?, finished_at = ?
+            WHERE id = ? AND status IN (?, ?)
+        ''', [(FAILED, 'Interrupted: the server process running the job exited', now, job_id,
+               *ACTIVE_STATUSES) for job_id in job_ids])
+
+
+class JobRunner:
+    """
+    Runs jobs on a local thread pool and records them in a JobStore.
+
+    Threads share the caller's policy library and caches, so a job costs
+    no more than the same work done inline in a request.
+
+    Usage:
+        runner = JobRunner(JobStore("data/jobs.db"), workers=2)
+        job = runner.submit("generate", params, generate_package)
+    """
+
+    def __init__(self, store: JobStore, workers: int = 2):
+        self.store = store
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix='policyupdate-job')
+        orphaned = store.fail_orphaned()
+        if orphaned:
+            logger.warning(f"Marked {orphaned} interrupted job(s) as failed")
+
+    def submit(self, kind: str, params: Dict[str, Any],
+               func: Callable[[Dict[str, Any], Callable], Dict[str, Any]],
+               username: Optional[str] = None) -> Job:
+        """
+        Queue ``func(params, progress)`` and return its job immediately.
+
+        Args:
+            kind: Job type, e.g. "generate"
+            params: Request parameters, stored with the job
+            func: Does the work and returns a JSON-serializable result;
+                ``progress`` accepts ProgressEvents and stores them with the job
+            username: User who requested the job
+        """
+        # Jobs of a worker that died while this one kept running
+        orphaned = self.store.fail_orphaned()
+        if orphaned:
+            logger.warning(f"Marked {orphaned} interrupted job(s) as failed")
+
+        job = self.store.create_job(kind, params, username=username)
+        self._executor.submit(self._run, job.id, func, job.params)
+        return job
+
+    def _run(self, job_id: str, func: Callable, params: Dict[str, Any]) -> None:
+        self.store.start_job(job_id)
+        try:
+            result = func(params, self._progress_recorder(job_id))
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed")
+            self.store.finish_job(job_id, error=str(e) or type(e).__name__)
+        else:
+            self.store.finish_job(job_id, result=result)
+
+    def _progress_recorder(self, job_id: str) -> Callable:
+        """Callback storing a job's progress events, at most every PROGRESS_INTERVAL per stage"""
+        last = {'stage': None, 'format': None, 'at': 0.0}
+
+        def record(event):
+            now = time.monotonic()
+            moved_on = (event.stage, event.format) != (last['stage'], last['format'])
+            finished = event.total and event.current >= event.total
+            if not (moved_on or finished) and now - last['at'] < PROGRESS_INTERVAL:
+                return
+            last.update(stage=event.stage, format=event.format, at=now)
+            self.store.record_progress(job_id, event.to_dict())
+
+        return record
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
@@ -1,14 +1,19 @@
 """
 Rate Limiter Module
-Implements API rate limiting with sliding window algorithm
+Implements API rate limiting with the generic cell rate algorithm (GCRA)
 """
 
+import math
+import os
+import sqlite3
+import threading
 import time
-from collections import defaultdict
+from fnmatch import fnmatchcase
+from pathlib import Path
 from dataclasses import dataclass, field
 from functools import wraps
 from threading import Lock
-from typing import Dict, Optional, Tuple, Callable
+from typing import Any, Callable, Dict, Optional, Tuple
 
 try:
     from flask import request, jsonify, g
@@ -33,31 +38,216 @@ class RateLimitConfig:
     # Exempt paths
     exempt_paths: list = field(default_factory=lambda: ['/auth/login', '/api/health', '/static'])
 
-
-@dataclass
+    # Where client state is kept: 'memory' (this process only) or 'sqlite'
+    # (shared by every process using the same state_path)
+    backend: str = 'memory'
+    state_path: str = 'data/rate_limits.db'
+
+    # Cost weight of expensive routes (fnmatch patterns); every other request costs 1.
+    # A request uses up `cost` requests of the client's rate limit.
+    route_costs: dict = field(default_factory=lambda: {
+        '/api/generate': 10,
+        '/api/frameworks/*/coverage': 4,
+        '/frameworks': 4,
+        '/api/audit/export': 4,
+    })
+
+    # Admission control for routes costing more than 1: combined cost in
+    # flight across all workers, requests allowed to wait, and how long
+    max_concurrent_cost: int = 20
+    max_queued_requests: int = 8
+    queue_timeout: float = 15.0
+
+    def cost_for(self, path: str) -> int:
+        """Cost weight of a request path"""
+        for pattern, cost in self.route_costs.items():
+            if fnmatchcase(path, pattern):
+                return cost
+        return 1
+
+
+@dataclass(slots=True)
 class RateLimitEntry:
-    """Tracks request counts for a single client"""
-    minute_requests: list = field(default_factory=list)
-    hour_requests: list = field(default_factory=list)
+    """
+    Rate limit state of a single client.
+
+    Each window is tracked by its theoretical arrival time (GCRA): the
+    moment the client's allowance would be fully restored.  Two floats
+    replace the per-request timestamp lists, whatever the limits are.
+    """
+    minute_tat: float = 0
+    hour_tat: float = 0
     blocked_until: float = 0
 
+    def is_idle(self, now: float) -> bool:
+        """Whether the entry is back to a fresh client's state"""
+        return self.hour_tat <= now and self.minute_tat <= now and self.blocked_until <= now
+
+
+# Lock stripes; clients hash onto one, so unrelated clients rarely contend
+LOCK_STRIPES = 64
+
+
+class MemoryRateLimitBackend:
+    """
+    Client state in a dict of this process, guarded by striped locks.
+
+    Each process enforces its own limits, so N worker processes allow
+    up to N times the configured rate.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, RateLimitEntry] = {}
+        self._locks = [Lock() for _ in range(LOCK_STRIPES)]
+
+    def _lock_for(self, client_id: str) -> Lock:
+        return self._locks[hash(client_id) % LOCK_STRIPES]
+
+    def update(self, client_id: str, decide: Callable[[RateLimitEntry], Any]) -> Any:
+        """Run ``decide`` on a client's entry, atomically with respect to other checks"""
+        with self._lock_for(client_id):
+            entry = self._entries.get(client_id)
+            if entry is None:
+                entry = self._entries[client_id] = RateLimitEntry()
+            return decide(entry)
+
+    def get(self, client_id: str) -> Optional[RateLimitEntry]:
+        with self._lock_for(client_id):
+            entry = self._entries.get(client_id)
+            return RateLimitEntry(entry.minute_tat, entry.hour_tat, entry.blocked_until) if entry else None
+
+    def cleanup(self, now: float) -> int:
+        """Drop entries that are back to a fresh client's state"""
+        removed = 0
+        for key, entry in list(self._entries.items()):
+            if not entry.is_idle(now):
+                continue
+            with self._lock_for(key):
+                # Re-check under the client's lock; a check may have just used it
+                if entry.is_idle(now) and self._entries.get(key) is entry:
+                    del self._entries[key]
+                    removed += 1
+        return removed
+
+
+class SQLiteRateLimitBackend:
+    """
+    Client state in a SQLite table shared by every process on the host.
+
+    Each check is one BEGIN IMMEDIATE transaction that reads, decides and
+    writes the client's row, so concurrent checks from any number of
+    worker processes are serialized and the configured limit holds
+    node-wide.  WAL mode lets readers proceed during a write.  Each thread
+    keeps its own connection, since opening one per check would cost more
+    than the check itself.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._init_db()
+
+    def _init_db(self):
+        """Initialize database schema"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                client_id TEXT PRIMARY KEY,
+                minute_tat REAL NOT NULL,
+                hour_tat REAL NOT NULL,
+                blocked_until REAL NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """This thread's connection (reopened after a fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            # Losing the last few updates in a power cut is harmless here
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def update(self, client_id: str, decide: Callable[[RateLimitEntry], Any]) -> Any:
+        """Run ``decide`` on a client's entry inside one write transaction"""
+        conn = self._get_conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('''
+                SELECT minute_tat, hour_tat, blocked_until FROM rate_limits WHERE client_id = ?
+            ''', (client_id,)).fetchone()
+            entry = RateLimitEntry(*row) if row else RateLimitEntry()
+            before = (entry.minute_tat, entry.hour_tat, entry.blocked_until)
+
+            result = decide(entry)
+
+            if (entry.minute_tat, entry.hour_tat, entry.blocked_until) != before:
+                conn.execute('''
+                    INSERT INTO rate_limits (client_id, minute_tat, hour_tat, blocked_until)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(client_id) DO UPDATE SET minute_tat = excluded.minute_tat,
+                        hour_tat = excluded.hour_tat, blocked_until = excluded.blocked_until
+                ''', (client_id, entry.minute_tat, entry.hour_tat, entry.blocked_until))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return result
+
+    def get(self, client_id: str) -> Optional[RateLimitEntry]:
+        row = self._get_conn().execute('''
+            SELECT minute_tat, hour_tat, blocked_until FROM rate_limits WHERE client_id = ?
+        ''', (client_id,)).fetchone()
+        return RateLimitEntry(*row) if row else None
+
+    def cleanup(self, now: float) -> int:
+        """Drop rows that are back to a fresh client's state"""
+        cursor = self._get_conn().execute('''
+            DELETE FROM rate_limits
+            WHERE minute_tat <= ? AND hour_tat <= ? AND blocked_until <= ?
+        ''', (now, now, now))
+        return cursor.rowcount
+
+
+BACKENDS = {
+    'memory': lambda config: MemoryRateLimitBackend(),
+    'sqlite': lambda config: SQLiteRateLimitBackend(config.state_path),
+}
+
+
+def create_backend(config: RateLimitConfig):
+    """Backend named by ``config.backend``"""
+    if config.backend not in BACKENDS:
+        raise ValueError(f"Unknown rate limit backend '{config.backend}', "
+                         f"expected one of {sorted(BACKENDS)}")
+    return BACKENDS[config.backend](config)
+
 
 class RateLimiter:
     """
-    Sliding window rate limiter implementation.
+    GCRA (generic cell rate algorithm) rate limiter implementation.
 
     Features:
     - Per-IP rate limiting
     - Different limits for authenticated vs anonymous users
-    - Sliding window algorithm for smooth rate limiting
+    - Per-minute and per-hour windows in constant space per client
     - Burst allowance for short spikes
-    - Automatic cleanup of old entries
+    - Pluggable state backend: per-process memory with striped locks,
+      or SQLite shared by all worker processes
+    - Automatic cleanup of idle entries
     """
 
-    def __init__(self, config: RateLimitConfig = None):
+    def __init__(self, config: RateLimitConfig = None, backend=None):
         self.config = config or RateLimitConfig()
-        self._entries: Dict[str, RateLimitEntry] = defaultdict(RateLimitEntry)
-        self._lock = Lock()
+        self.backend = backend or create_backend(self.config)
+        self._cleanup_lock = Lock()
         self._last_cleanup = time.time()
 
     def _get_client_id(self) -> str:
@@ -81,9 +271,17 @@ class RateLimiter:
         return f"ip:{ip}"
 
     def _is_exempt(self, path: str) -> bool:
-        """Check if path is exempt from rate limiting"""
+        """
+        Check if path is exempt from rate limiting.
+
+        An entry matches its own path and everything below it; ``'/'``
+        matches only the site root.
+        """
         for exempt in self.config.exempt_paths:
-            if path.startswith(exempt):
+            if path == exempt:
+                return True
+            prefix = exempt.rstrip('/')
+            if prefix and path.startswith(prefix + '/'):
                 return True
         return False
 
@@ -101,35 +299,56 @@ class RateLimiter:
 
         return base_minute, base_hour
 
-    def _cleanup_old_entries(self, now: float, entry: RateLimitEntry) -> None:
-        """Remove expired request timestamps"""
-        minute_ago = now - 60
-        hour_ago = now - 3600
+    def _get_intervals(self, client_id: str) -> Tuple[int, int, float, float]:
+        """
+        Limits and GCRA emission intervals for a client.
 
-        entry.minute_requests = [t for t in entry.minute_requests if t > minute_ago]
-        entry.hour_requests = [t for t in entry.hour_requests if t > hour_ago]
+        Returns:
+            (minute limit, hour limit, seconds per request in the minute
+            window, seconds per request in the hour window)
+        """
+        minute_limit, hour_limit = self._get_limits(client_id)
+        # The burst allowance raises the per-minute ceiling for short spikes
+        minute_capacity = max(minute_limit, self.config.burst_size)
+        return (
+            minute_limit,
+            hour_limit,
+            60.0 / minute_capacity if minute_capacity > 0 else math.inf,
+            3600.0 / hour_limit if hour_limit > 0 else math.inf
+        )
 
     def _periodic_cleanup(self) -> None:
-        """Periodically clean up stale entries"""
+        """Periodically drop entries that are back to a fresh client's state"""
         now = time.time()
         if now - self._last_cleanup < 300:  # Every 5 minutes
             return
+        if not self._cleanup_lock.acquire(blocking=False):
+            return  # Another thread is already cleaning up
 
-        self._last_cleanup = now
-        stale_threshold = now - 3600
+        try:
+            self._last_cleanup = now
+            self.backend.cleanup(now)
+        finally:
+            self._cleanup_lock.release()
 
-        # Remove entries with no recent activity
-        stale_keys = [
-            key for key, entry in self._entries.items()
-            if not entry.hour_requests or max(entry.hour_requests) < stale_threshold
-        ]
-        for key in stale_keys:
-            del self._entries[key]
+    @staticmethod
+    def _window_used(tat: float, now: float, interval: float) -> float:
+        """Requests' worth of allowance in use in a window"""
+        return max(tat - now, 0.0) / interval
 
-    def check_rate_limit(self, client_id: str = None) -> Tuple[bool, dict]:
+    def check_rate_limit(self, client_id: str = None, cost: int = 1) -> Tuple[bool, dict]:
         """
         Check if request is within rate limits.
 
+        A window of ``limit`` requests per ``period`` is a virtual
+        schedule with one slot every period/limit seconds; a request fits
+        if, after booking ``cost`` slots, the schedule runs no more than
+        one period ahead of now.
+
+        Args:
+            client_id: Client key (default: from the current request)
+            cost: Number of requests this one counts as
+
         Returns:
             Tuple of (allowed, headers_dict)
         """
@@ -138,9 +357,9 @@ class RateLimiter:
         if client_id is None:
             client_id = self._get_client_id()
 
-        with self._lock:
-            entry = self._entries[client_id]
+        minute_limit, hour_limit, minute_interval, hour_interval = self._get_intervals(client_id)
 
+        def decide(entry: RateLimitEntry) -> Tuple[bool, dict]:
             # Check if client is blocked
             if entry.blocked_until > now:
                 retry_after = int(entry.blocked_until - now)
@@ -151,38 +370,27 @@ class RateLimiter:
                     'Retry-After': str(retry_after)
                 }
 
-            # Cleanup old timestamps
-            self._cleanup_old_entries(now, entry)
-
-            # Get limits
-            minute_limit, hour_limit = self._get_limits(client_id)
-
-            # Check limits
-            minute_count = len(entry.minute_requests)
-            hour_count = len(entry.hour_requests)
+            minute_tat = max(entry.minute_tat, now) + cost * minute_interval
+            hour_tat = max(entry.hour_tat, now) + cost * hour_interval
 
-            # Allow burst
-            if minute_count < self.config.burst_size:
-                allowed = True
-            elif minute_count >= minute_limit:
+            # Small tolerance for float rounding of the booked slots
+            if minute_tat - now > 60.0 + 1e-6:
                 # Block for remainder of minute
                 entry.blocked_until = now + 60
                 allowed = False
-            elif hour_count >= hour_limit:
+            elif hour_tat - now > 3600.0 + 1e-6:
                 # Block for remainder of hour
                 entry.blocked_until = now + 3600
                 allowed = False
             else:
                 allowed = True
-
-            if allowed:
-                # Record request
-                entry.minute_requests.append(now)
-                entry.hour_requests.append(now)
+                entry.minute_tat = minute_tat
+                entry.hour_tat = hour_tat
 
             # Build headers
-            remaining = max(0, minute_limit - len(entry.minute_requests))
-            reset_time = int(now + 60)
+            used = self._window_used(entry.minute_tat, now, minute_interval)
+            remaining = max(0, int(minute_limit - used + 1e-6))
+            reset_time = int(max(entry.minute_tat, now))
 
             headers = {
                 'X-RateLimit-Limit': str(minute_limit),
@@ -193,31 +401,33 @@ class RateLimiter:
             if not allowed:
                 headers['Retry-After'] = str(int(entry.blocked_until - now))
 
-            # Periodic cleanup
-            self._periodic_cleanup()
-
             return allowed, headers
 
+        allowed, headers = self.backend.update(client_id, decide)
+
+        # Periodic cleanup
+        self._periodic_cleanup()
+
+        return allowed, headers
+
     def get_usage(self, client_id: str = None) -> dict:
         """Get current usage stats for a client"""
         if client_id is None:
             client_id = self._get_client_id()
 
-        with self._lock:
-            entry = self._entries.get(client_id, RateLimitEntry())
-            minute_limit, hour_limit = self._get_limits(client_id)
+        minute_limit, hour_limit, minute_interval, hour_interval = self._get_intervals(client_id)
+        now = time.time()
 
-            now = time.time()
-            self._cleanup_old_entries(now, entry)
+        entry = self.backend.get(client_id) or RateLimitEntry()
 
-            return {
-                'client_id': client_id,
-                'minute_requests': len(entry.minute_requests),
-                'minute_limit': minute_limit,
-                'hour_requests': len(entry.hour_requests),
-                'hour_limit': hour_limit,
-                'blocked_until': entry.blocked_until if entry.blocked_until > now else None
-            }
+        return {
+            'client_id': client_id,
+            'minute_requests': math.ceil(self._window_used(entry.minute_tat, now, minute_interval) - 1e-6),
+            'minute_limit': minute_limit,
+            'hour_requests': math.ceil(self._window_used(entry.hour_tat, now, hour_interval) - 1e-6),
+            'hour_limit': hour_limit,
+            'blocked_until': entry.blocked_until if entry.blocked_until > now else None
+        }
 
 
 # Global rate limiter instance
@@ -294,7 +504,8 @@ def rate_limit(f: Callable = None, *, exempt: bool = False):
 def init_rate_limiter(app, config: RateLimitConfig = None):
     """Initialize rate limiting for a Flask app"""
     global _rate_limiter
-    _rate_limiter = RateLimiter(config)
+    # Each app checks its own limiter; apps share limits only through the backend
+    limiter = _rate_limiter = RateLimiter(config)
 
     @app.before_request
     def check_global_rate_limit():
@@ -302,12 +513,10 @@ def init_rate_limiter(app, config: RateLimitConfig = None):
         if not request.path.startswith('/api/'):
             return None
 
-        limiter = get_rate_limiter()
-
         if limiter._is_exempt(request.path):
             return None
 
-        allowed, headers = limiter.check_rate_limit()
+        allowed, headers = limiter.check_rate_limit(cost=limiter.config.cost_for(request.path))
 
         if not allowed:
             response = jsonify({
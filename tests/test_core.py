@@ -3,6 +3,7 @@ Core Module Tests
 Tests for compliance_mapper, gap_analyzer, and policy parsing
 """
 
+import os
 import sys
 from pathlib import Path
 
@@ -126,6 +127,244 @@ class TestPolicyParsing:
                     frontmatter = yaml.safe_load(parts[1])
                     assert 'id' in frontmatter or 'title' in frontmatter
 
+    def test_policy_tolerates_untyped_metadata(self):
+        """Test that missing or non-string metadata is kept rather than interned"""
+        from core.policy_parser import Policy, PolicyStatus, PolicyType
+
+        policy = Policy(id="p", title="P", filename="p.md", category=None,
+                        type=PolicyType.POLICY, status=PolicyStatus.DRAFT,
+                        frameworks={"soc2": None, 2022: ["CC1.1", 3]}, variables=[None, "ORG"])
+        assert policy.category is None
+        assert policy.frameworks == {"soc2": None, 2022: ["CC1.1", 3]}
+        assert policy.variables == [None, "ORG"]
+
+
+class TestLibrarySnapshot:
+    """Tests for the compiled policy library snapshot"""
+
+    POLICY = (
+        "---\nid: {id}\ntitle: {title}\ncategory: testing\n"
+        "frameworks:\n  soc2:\n  - CC1.1\nreferences:\n- other-policy\n---\n\n"
+        "# {title}\n\n{{{{ORGANIZATION_NAME}}}} requires review by the {{{{CSO_TITLE}}}}.\n"
+    )
+
+    @pytest.fixture
+    def library(self, tmp_path):
+        policies_dir = tmp_path / "policies" / "testing"
+        policies_dir.mkdir(parents=True)
+        for pid in ("alpha-policy", "beta-policy"):
+            (policies_dir / f"{pid}.md").write_text(
+                self.POLICY.format(id=pid, title=pid.title()), encoding="utf-8"
+            )
+        (policies_dir / "broken.md").write_text("no frontmatter here", encoding="utf-8")
+        return tmp_path
+
+    def test_compiled_entries(self, library):
+        from core.library_snapshot import LibrarySnapshot
+
+        snapshot = LibrarySnapshot(str(library / "policies"), str(library / "cache"))
+        snapshot.refresh()
+
+        assert snapshot.snapshot_path.exists()
+        assert len(snapshot.valid_entries()) == 2
+        assert sorted(snapshot.get_policy_ids()) == ["alpha-policy", "beta-policy", "broken"]
+
+        entry = snapshot.valid_entries()[0]
+        assert entry.variables == ["CSO_TITLE", "ORGANIZATION_NAME"]
+        assert entry.references == ["other-policy"]
+        assert snapshot.read_body(entry).startswith("# Alpha-Policy")
+        assert snapshot.get_framework_map() == {"soc2": ["alpha-policy", "beta-policy"]}
+
+    def test_records_share_interned_identifiers(self, library):
+        from core.library_snapshot import LibrarySnapshot
+
+        snapshot = LibrarySnapshot(str(library / "policies"), str(library / "cache"))
+        snapshot.refresh()
+        alpha, beta = (snapshot.make_record(e) for e in snapshot.valid_entries())
+
+        assert not hasattr(alpha, "__dict__")
+        assert alpha["category"] is beta["category"]
+        assert next(iter(alpha["frameworks"])) is next(iter(beta["frameworks"]))
+        assert alpha["frameworks"]["soc2"][0] is beta["frameworks"]["soc2"][0]
+
+    def test_warm_load_skips_unchanged_files(self, library, monkeypatch):
+        import os
+        from core import library_snapshot
+        from core.library_snapshot import LibrarySnapshot
+
+        LibrarySnapshot(str(library / "policies"), str(library / "cache")).refresh()
+
+        compiled = []
+        original = library_snapshot.compile_entry
+        monkeypatch.setattr(library_snapshot, "compile_entry",
+                            lambda *args: compiled.append(args[1]) or original(*args))
+
+        warm = LibrarySnapshot(str(library / "policies"), str(library / "cache"))
+        assert warm.refresh() is False
+        assert compiled == []
+
+        changed = library / "policies" / "testing" / "beta-policy.md"
+        changed.write_text(self.POLICY.format(id="beta-policy", title="Beta Revised"), encoding="utf-8")
+        stat = changed.stat()
+        os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert warm.refresh() is True
+        assert compiled == ["testing/beta-policy.md"]
+
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX file ownership")
+    def test_writable_snapshot_file_is_not_loaded(self, library):
+        from core.library_snapshot import LibrarySnapshot
+
+        snapshot = LibrarySnapshot(str(library / "policies"), str(library / "cache"))
+        snapshot.refresh()
+        assert snapshot.snapshot_path.stat().st_mode & 0o077 == 0
+        assert snapshot._read_snapshot_file()
+
+        snapshot.snapshot_path.chmod(0o666)
+        assert snapshot._read_snapshot_file() == {}
+
+
+class TestPolicyLibrary:
+    """Tests for the shared process-wide policy library"""
+
+    def test_entry_points_share_one_library(self):
+        from core.policy_library import get_policy_library
+        from generation.package_builder import PackageBuilder
+
+        policies_dir = str(PROJECT_ROOT / "policies")
+        frameworks_dir = str(PROJECT_ROOT / "config" / "frameworks")
+        library = get_policy_library(policies_dir, frameworks_dir)
+
+        builder = PackageBuilder(policies_dir, frameworks_dir)
+        assert builder.library is library
+        assert builder.compliance_mapper is library.compliance_mapper
+        assert get_policy_library(policies_dir) is library
+
+    def test_frameworks_dir_is_part_of_library_key(self, tmp_path):
+        from core.policy_library import get_policy_library
+
+        policies_dir = str(PROJECT_ROOT / "policies")
+        library = get_policy_library(policies_dir, str(PROJECT_ROOT / "config" / "frameworks"))
+        other = get_policy_library(policies_dir, str(tmp_path))
+        assert other is not library
+        assert other.frameworks_dir == tmp_path
+        assert get_policy_library(policies_dir, str(tmp_path)) is other
+
+    def test_deprecated_builder_aliases(self):
+        from generation.package_builder import PackageBuilder
+
+        policies_dir = str(PROJECT_ROOT / "policies")
+        frameworks_dir = str(PROJECT_ROOT / "config" / "frameworks")
+        builder = PackageBuilder(policies_dir, frameworks_dir)
+        interval = builder.library.reload_interval
+        try:
+            with pytest.warns(DeprecationWarning):
+                PackageBuilder(policies_dir, frameworks_dir, reload_interval=30.0)
+            assert builder.library.reload_interval == 30.0
+        finally:
+            builder.library.reload_interval = interval
+
+        builder.get_all_policies()
+        with pytest.warns(DeprecationWarning):
+            cache = builder.policies_cache
+        assert cache and all(isinstance(key, str) for key in cache)
+
+    def test_reverse_indexes(self):
+        from core.policy_library import get_policy_library
+
+        library = get_policy_library(str(PROJECT_ROOT / "policies"))
+        soc2 = library.policies_for_framework("soc2")
+        assert soc2
+        assert all("soc2" in library.get_policy(pid)["frameworks"] for pid in soc2)
+
+        cso = library.policies_using_variables(["CSO_TITLE"])
+        assert cso and cso < library.policy_ids()
+        assert all("{{CSO_TITLE}}" in library.get_policy(pid)["body"]
+                   or "CSO_TITLE" in library.get_policy(pid)["variables"] for pid in cso)
+
+        analyzer = library.get_gap_analyzer()
+        assert analyzer is library.get_gap_analyzer()
+        assert len(analyzer.library) > 100
+
+
+class TestPolicyIngestion:
+    """Tests for parallel, resumable DOCX ingestion"""
+
+    @pytest.fixture
+    def docx_library(self, tmp_path):
+        docx = pytest.importorskip("docx")
+        source = tmp_path / "current"
+        source.mkdir()
+        for name in ("Password Policy", "Backup Procedure", "Vendor Management Policy"):
+            doc = docx.Document()
+            doc.add_paragraph("I. Purpose")
+            doc.add_paragraph(f"ABC Company maintains this {name}.")
+            doc.save(str(source / f"{name}.docx"))
+        return source
+
+    def test_parallel_load_matches_serial(self, docx_library):
+        from core.policy_parser import PolicyParser
+
+        serial = PolicyParser().load_all_policies(str(docx_library))
+        parallel = PolicyParser().load_all_policies(str(docx_library), workers=2)
+
+        assert list(parallel) == list(serial)
+        assert parallel["password-policy"].raw_content == serial["password-policy"].raw_content
+        assert "ORGANIZATION_NAME" in parallel["password-policy"].variables
+
+    def test_convert_resumes_from_checkpoint(self, docx_library, tmp_path):
+        import os
+        from core.policy_parser import PolicyParser, convert_docx_library
+
+        output = tmp_path / "policies"
+        checkpoint = tmp_path / "convert.checkpoint"
+        first = convert_docx_library(str(docx_library), str(output), checkpoint_path=str(checkpoint))
+        assert all(not path.startswith("ERROR") for path in first.values())
+
+        # Simulate a crash while the last record was being written
+        with open(checkpoint, "ab") as f:
+            f.write(b"\x80\x05partial")
+
+        parsed = []
+
+        class CountingParser(PolicyParser):
+            def parse_docx(self, filepath):
+                parsed.append(filepath)
+                return super().parse_docx(filepath)
+
+        changed = docx_library / "Password Policy.docx"
+        stat = changed.stat()
+        os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        second = convert_docx_library(str(docx_library), str(output),
+                                      checkpoint_path=str(checkpoint), parser=CountingParser())
+        assert second == first
+        assert [Path(p).name for p in parsed] == ["Password Policy.docx"]
+
+    def test_old_checkpoint_layout_is_moved_aside(self, tmp_path):
+        import pickle
+        from core.policy_parser import IngestCheckpoint
+
+        # Headerless frames, as written before the checkpoint had a format header
+        legacy = tmp_path / "legacy.checkpoint"
+        with open(legacy, "wb") as f:
+            pickle.dump(("a.docx", (1, 2), "done"), f)
+            pickle.dump(("b.docx", (3, 4), "done"), f)
+        done = IngestCheckpoint(str(legacy)).load()
+        assert set(done) == {"a.docx", "b.docx"}
+        assert (tmp_path / "legacy.checkpoint.old").stat().st_size > 0
+        assert IngestCheckpoint(str(legacy)).load() == done
+
+        # A layout that is not pickle at all is kept, not truncated
+        foreign = tmp_path / "foreign.checkpoint"
+        foreign.write_text('{"a.docx": [1, 2]}')
+        assert IngestCheckpoint(str(foreign)).load() == {}
+        assert (tmp_path / "foreign.checkpoint.old").read_text() == '{"a.docx": [1, 2]}'
+
+        checkpoint = IngestCheckpoint(str(foreign))
+        checkpoint.record("c.docx", (5, 6), "done")
+        assert checkpoint.load() == {"c.docx": ((5, 6), "done")}
+
 
 class TestVariableEngine:
     """Tests for variable substitution"""
@@ -150,6 +389,72 @@ class TestVariableEngine:
         assert 'CISO' in result
         assert '{{' not in result
 
+    def test_conditionals_and_loops(self):
+        from core.variable_engine import VariableEngine, ClientProfile, compile_template
+
+        engine = VariableEngine()
+        template = (
+            "{{#if organization.size >= 500 and compliance.includes(\"pci_dss\")}}"
+            "Large {{#if organization.industry == \"retail\"}}retail{{/if}} merchant"
+            "{{#else}}Small{{/if}}\n"
+            "{{#each OFFICES}} - {{this}} {{/each}}"
+        )
+        large = ClientProfile(id='a', name='A', employee_count=900, industry='retail',
+                              target_frameworks=['pci_dss'], variables={'OFFICES': ['NYC', 'LA']})
+        small = ClientProfile(id='b', name='B', employee_count=20)
+
+        assert engine.render(template, large) == "Large retail merchant\n- NYC\n- LA"
+        assert engine.render(template, small) == "Small\n"
+        assert compile_template(template) is compile_template(template)
+
+    def test_render_batch_shares_identical_renders(self):
+        from core.variable_engine import VariableEngine, ClientProfile
+
+        engine = VariableEngine()
+        template = "{{ORGANIZATION_NAME}}: {{#if organization.size >= 500}}large{{#else}}small{{/if}}"
+        clients = [
+            ClientProfile(id='a', name='A', employee_count=900, variables={'ORGANIZATION_NAME': 'Acme'}),
+            ClientProfile(id='b', name='B', employee_count=600, variables={'ORGANIZATION_NAME': 'Acme'}),
+            ClientProfile(id='c', name='C', employee_count=10, variables={'ORGANIZATION_NAME': 'Acme'}),
+        ]
+
+        rendered = engine.render_batch(template, clients)
+        assert rendered == ["Acme: large", "Acme: large", "Acme: small"]
+        assert rendered[0] is rendered[1]
+        assert rendered == [engine.render(template, c) for c in clients]
+
+    def test_substitution_plan(self):
+        from core.variable_engine import SubstitutionPlan
+
+        plan = SubstitutionPlan("{{ORGANIZATION_NAME}} and {{CSO_TITLE}} for {{ORGANIZATION_NAME}}")
+        assert plan.variables == {"ORGANIZATION_NAME", "CSO_TITLE"}
+
+        rendered = plan.render({"ORGANIZATION_NAME": r"Acme \1 Corp", "UNUSED": "x"})
+        assert rendered == r"Acme \1 Corp and {{CSO_TITLE}} for Acme \1 Corp"
+        assert SubstitutionPlan("no tokens").render({}) == "no tokens"
+        assert plan.unreplaced({"ORGANIZATION_NAME": "Acme"}) == ["CSO_TITLE"]
+        assert plan.unreplaced({"ORGANIZATION_NAME": "[TODO]"}) is None
+        assert SubstitutionPlan("[TODO] {{CSO_TITLE}}").unreplaced({}) is None
+
+
+class TestIncompletenessDetector:
+    """Tests for incomplete section detection"""
+
+    def test_sections_and_framework_requirements(self):
+        from core.incompleteness import IncompletenessDetector
+
+        content = (
+            "# Purpose\nIntro [TODO: add scope]\n\n"
+            "## Incident Handling\nReport to <security contact> within XX hours.\n"
+        )
+        found = IncompletenessDetector().detect("ir-policy", content, ["soc2"])
+
+        by_reason = {item.reason: item for item in found}
+        assert by_reason["Contains placeholder: [TODO: add scope]"].section == "# Purpose"
+        assert by_reason["Contains placeholder: <security contact>"].section == "## Incident Handling"
+        assert by_reason["Contains placeholder: XX"].priority == "low"
+        assert by_reason["SOC2 requires: Incident classification criteria"].section == "## Incident Handling"
+
 
 class TestConfig:
     """Tests for configuration module"""
@@ -177,6 +482,16 @@ class TestConfig:
         assert frameworks_path.name == "frameworks"
         assert frameworks_path.exists()
 
+    def test_output_cache_db_path(self, tmp_path, monkeypatch):
+        """Test the output cache index defaults to data/ and can be moved"""
+        from core.config import AppConfig, load_config_from_env
+
+        config = AppConfig()
+        assert config.get_output_cache_db_path() == config.project_root / "data" / "output_cache.db"
+
+        monkeypatch.setenv('POLICYUPDATE_OUTPUT_CACHE_DB', str(tmp_path / "cache.db"))
+        assert load_config_from_env().get_output_cache_db_path() == tmp_path / "cache.db"
+
     def test_secret_key_not_hardcoded(self):
         """Test that secret key is dynamically generated"""
         from core.config import AppConfig
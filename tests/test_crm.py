@@ -52,6 +52,14 @@ class TestClientManager:
         assert client is not None
         assert client.name == "Name Lookup Test"
 
+    def test_set_variable(self, manager):
+        """Test setting a single client variable"""
+        client = manager.create_client("Variable Test", variables={"ORGANIZATION_NAME": "Var Co"})
+        updated = manager.set_variable(client.id, "CSO_TITLE", "CISO")
+
+        assert updated.variables == {"ORGANIZATION_NAME": "Var Co", "CSO_TITLE": "CISO"}
+        assert manager.set_variable("missing", "CSO_TITLE", "CISO") is None
+
     def test_update_client(self, manager):
         """Test updating client details"""
         client = manager.create_client("Update Test")
@@ -111,6 +119,25 @@ class TestClientManager:
         assert gen is not None
         assert gen.id is not None
 
+    def test_generation_policy_hashes(self, manager):
+        """Test that policy hashes are stored per generation for delta builds"""
+        client = manager.create_client("Delta Test")
+        manager.record_generation(client.id, 2, ["soc2"], "docx", "/tmp/full.docx")
+        assert manager.get_latest_generation(client.id, hashed_only=True) is None
+
+        gen = manager.record_generation(client.id, 2, ["soc2"], "docx", "/tmp/full.docx",
+                                        policy_hashes={"a": "h1", "b": "h2"},
+                                        variables={"EFFECTIVE_DATE": "January 1, 2025"})
+        manager.record_generation(client.id, 0, ["soc2"], "docx", "")
+
+        assert manager.get_latest_generation(client.id, hashed_only=True).id == gen.id
+        assert manager.get_generation_hashes(gen.id) == {"a": "h1", "b": "h2"}
+        assert manager.get_generation_variables(gen.id) == {"EFFECTIVE_DATE": "January 1, 2025"}
+
+        manager.delete_client(client.id)
+        assert manager.get_generation_hashes(gen.id) == {}
+        assert manager.get_generation_variables(gen.id) == {}
+
     def test_update_compliance_status(self, manager):
         """Test updating compliance status"""
         client = manager.create_client("Compliance Test")
@@ -261,11 +261,11 @@ class TestRateLimiterEdgeCases:
 
         # All clients should be tracked (or some may be cleaned up)
         # The key is that the system doesn't crash with many clients
-        assert len(limiter._entries) <= 100
+        assert len(limiter.backend._entries) <= 100
 
         # Recent entries still present after more operations
         limiter.check_rate_limit("test-client")
-        assert len(limiter._entries) <= 101
+        assert len(limiter.backend._entries) <= 101
 
 
 class TestVersioningEdgeCases:
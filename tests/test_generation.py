@@ -81,6 +81,192 @@ class TestPackageBuilder:
 
         assert substituted, "Variables should be substituted in policy content"
 
+    def test_build_packages_matches_single_builds(self, builder):
+        """Test that batch building renders the same packages as one-by-one"""
+        from generation.package_builder import ClientConfig
+
+        configs = [
+            ClientConfig(name="Acme", variables={"CSO_TITLE": "CISO"}, frameworks=["soc2"]),
+            ClientConfig(name="Globex", variables={"CSO_TITLE": "CISO"}, frameworks=["hipaa"]),
+            ClientConfig(name="Acme", variables={"CSO_TITLE": "CISO"}, frameworks=["soc2"]),
+        ]
+
+        batch = builder.build_packages(configs)
+        for config, result in zip(configs, batch):
+            single = builder.build_package(config)
+            assert [p.id for p in result.policies] == [p.id for p in single.policies]
+            assert [p.content for p in result.policies] == [p.content for p in single.policies]
+            assert result.warnings == single.warnings
+
+        # Identical clients share rendered content
+        assert batch[0].policies[0].content is batch[2].policies[0].content
+
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_parallel_render_matches_serial(self, builder, executor):
+        """Test that pooled rendering produces the serial package"""
+        from generation.package_builder import ClientConfig
+
+        config = ClientConfig(name="Acme", variables={"CSO_TITLE": "CISO"}, frameworks=["hipaa"])
+        serial = builder.build_package(config)
+        pooled = builder.build_package(config, executor=executor, workers=2)
+
+        assert [(p.id, p.title, p.content, p.incomplete_sections) for p in pooled.policies] == \
+            [(p.id, p.title, p.content, p.incomplete_sections) for p in serial.policies]
+        assert pooled.warnings == serial.warnings
+        assert pooled.incomplete_count == serial.incomplete_count
+
+    def test_stream_package_matches_build(self, builder):
+        """Test that a streamed package yields the built package's documents in order"""
+        from generation.package_builder import ClientConfig
+
+        config = ClientConfig(name="Acme", variables={"CSO_TITLE": "CISO"}, frameworks=["soc2"])
+        built = builder.build_package(config)
+        stream = builder.stream_package(config)
+
+        assert stream.total_policies == built.total_policies
+        assert stream.incomplete_count == built.incomplete_count
+        assert stream.warnings == built.warnings
+        assert [(p.id, p.content) for p in stream.iter_documents()] == \
+            [(p.id, p.content) for p in built.iter_documents()]
+        assert [(p.id, p.title, p.incomplete_sections) for p in stream.policies] == \
+            [(p.id, p.title, p.incomplete_sections) for p in built.iter_documents()]
+
+    def test_stream_export_leaves_render_cache_empty(self, builder, tmp_path):
+        """Test that a streamed export keeps no rendered documents behind"""
+        from generation.package_builder import ClientConfig
+        from generation.html_exporter import HtmlExporter
+
+        stream = builder.stream_package(ClientConfig(name="Acme", frameworks=["soc2"]))
+        HtmlExporter().export_package(stream, str(tmp_path / "acme.html"))
+
+        assert stream.total_policies > 0
+        assert len(builder.render_cache) == 0
+
+    def test_progress_events(self, builder, tmp_path):
+        """Test that building and exporting report per-policy progress"""
+        from generation.package_builder import ClientConfig
+        from generation.html_exporter import HtmlExporter
+
+        events = []
+        result = builder.build_package(ClientConfig(name="Acme", frameworks=["soc2"]),
+                                       progress=events.append)
+        renders = [e for e in events if e.stage == "render"]
+        assert len(renders) == result.total_policies
+        assert renders[-1].fraction == 1.0
+
+        events.clear()
+        output = HtmlExporter().export_package(result, str(tmp_path / "acme.html"),
+                                               progress=events.append)
+        exports = [e for e in events if e.stage == "export"]
+        assert [e.current for e in exports] == list(range(1, result.total_policies + 1))
+        assert all(a.bytes_written < b.bytes_written for a, b in zip(exports, exports[1:]))
+        assert events[-1].stage == "saved"
+        assert events[-1].bytes_written == output.stat().st_size
+
+    def test_build_delta_exports_changed_policies(self, builder):
+        """Test that a delta package holds only policies whose output changed"""
+        from generation.package_builder import ClientConfig
+
+        variables = {"CSO_TITLE": "CISO", "EFFECTIVE_DATE": "January 1, 2025"}
+        config = ClientConfig(name="Acme", variables=variables, frameworks=["soc2"])
+        full = builder.build_package(config)
+        previous = {p.id: p.content_hash for p in full.policies}
+        previous["retired-policy"] = "0" * 64
+
+        unchanged, delta = builder.build_delta(config, previous, base_generation="g1")
+        assert unchanged.policies == []
+        assert delta.removed == ["retired-policy"]
+        assert delta.unchanged == full.total_policies
+
+        changed = ClientConfig(name="Acme", variables={**variables, "CSO_TITLE": "CTO"},
+                               frameworks=["soc2"])
+        result, delta = builder.build_delta(changed, previous)
+        affected = builder.library.policies_using_variables(["CSO_TITLE"])
+        assert sorted(delta.changed) == sorted(p.id for p in full.policies if p.id in affected)
+        assert [p.id for p in result.policies] == delta.changed
+        assert delta.to_dict()["summary"]["unchanged"] == full.total_policies - len(delta.changed)
+
+    def test_build_delta_reuses_base_dates(self, builder):
+        """Test that a delta on a later day does not report dated policies as changed"""
+        from datetime import datetime
+        from unittest.mock import patch
+        from generation.package_builder import ClientConfig, dated_variables
+
+        config = ClientConfig(name="Acme", frameworks=["soc2"])
+        with patch('generation.package_builder.datetime') as clock:
+            clock.now.return_value = datetime(2025, 1, 1)
+            full = builder.build_package(config)
+        previous = {p.id: p.content_hash for p in full.policies}
+
+        with patch('generation.package_builder.datetime') as clock:
+            clock.now.return_value = datetime(2025, 3, 1)
+            moved, _ = builder.build_delta(config, previous)
+            result, delta = builder.build_delta(config, previous,
+                                                base_variables=dated_variables(full.variables_applied))
+
+        assert moved.policies  # dated policies differ when the dates are not reused
+        assert result.policies == [] and delta.unchanged == full.total_policies
+        assert result.variables_applied["EFFECTIVE_DATE"] == "January 01, 2025"
+        assert delta.incomplete_count == full.incomplete_count
+
+    def test_unreplaced_variables_order_is_stable(self, builder):
+        """Test the plan and the text scan report unreplaced variables in the same order"""
+        policy = {'id': 'order-policy', 'title': 'Order', 'category': 'testing',
+                  'body': '{{VERSION_OWNER}} signs off; {{APPROVER}} approves.'}
+        planned = builder.render_policy(policy, {})
+        # A bracket in the template forces the text scan
+        scanned = builder.render_policy(dict(policy, body=policy['body'] + ' [Note]'), {})
+
+        assert planned.incomplete_sections[0]['variables'] == ['APPROVER', 'VERSION_OWNER']
+        assert scanned.incomplete_sections[0]['variables'] == ['APPROVER', 'VERSION_OWNER']
+
+    def test_render_cache_ignores_unused_variables(self, builder):
+        """Test that renders are reused across clients differing only in unused variables"""
+        policy = {
+            'id': 'cache-policy', 'title': '{{ORGANIZATION_NAME}} Policy', 'category': 'testing',
+            'body': '{{ORGANIZATION_NAME}} is reviewed by the {{CSO_TITLE}}.',
+        }
+        first = builder.render_policy(policy, {'ORGANIZATION_NAME': 'Acme', 'CSO_TITLE': 'CISO'})
+        reused = builder.render_policy(policy, {'ORGANIZATION_NAME': 'Acme', 'CSO_TITLE': 'CISO',
+                                                'EXEC_MGMT': 'Board'})
+        changed = builder.render_policy(policy, {'ORGANIZATION_NAME': 'Acme', 'CSO_TITLE': 'CSO'})
+
+        assert reused is first
+        assert changed.content == 'Acme is reviewed by the CSO.'
+        assert builder.render_cache.stats()['hits'] == 1
+
+        edited = builder.render_policy(dict(policy, body=policy['body'] + ' Annually.'),
+                                       {'ORGANIZATION_NAME': 'Acme', 'CSO_TITLE': 'CISO'})
+        assert edited.content.endswith('Annually.')
+
+    def test_rebuild_policies_for_changed_variable(self, builder):
+        """Test that a variable change re-renders only the policies using it"""
+        from generation.package_builder import ClientConfig
+
+        config = ClientConfig(name="Acme", variables={"CSO_TITLE": "Head of Security"},
+                              frameworks=["soc2"])
+        full = builder.build_package(config)
+        updated = builder.rebuild_policies(config, ["CSO_TITLE"])
+
+        assert 0 < len(updated) < full.total_policies
+        assert any("Head of Security" in p.content for p in updated)
+        assert not any("{{CSO_TITLE}}" in p.content for p in updated)
+        assert {p.id for p in updated} <= {p.id for p in full.policies}
+
+    def test_rebuild_policies_keeps_package_dates(self, builder):
+        """Test that regenerated policies keep the dates of the package they update"""
+        from datetime import datetime
+        from generation.package_builder import ClientConfig
+
+        config = ClientConfig(name="Acme", frameworks=["soc2"])
+        updated = builder.rebuild_policies(config, ["EFFECTIVE_DATE"],
+                                           base_variables={"EFFECTIVE_DATE": "January 1, 2025",
+                                                           "CSO_TITLE": "ignored"})
+
+        today = datetime.now().strftime('%B %d, %Y')
+        assert any("January 1, 2025" in p.content for p in updated)
+        assert not any(today in p.content or "ignored" in p.content for p in updated)
+
     def test_generate_toc(self, builder):
         """Test table of contents generation"""
         from generation.package_builder import ClientConfig
@@ -113,6 +299,328 @@ class TestPackageBuilder:
         assert "Customization Checklist" in checklist
 
 
+class TestBulkRunner:
+    """Tests for multi-client bulk generation"""
+
+    @pytest.fixture
+    def jobs(self, tmp_path):
+        from generation.bulk_runner import BulkJob
+        from generation.package_builder import ClientConfig
+
+        return [
+            BulkJob(client_id=f"c{i}", config=ClientConfig(name=f"Client {i}", frameworks=["soc2"]),
+                    output_dir=str(tmp_path), formats=["html"], base_name=f"client_{i}")
+            for i in range(3)
+        ]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_run_exports_every_client(self, jobs, tmp_path, workers):
+        import json
+        from generation.bulk_runner import BulkRunner, write_results
+        from generation.package_builder import PackageBuilder
+
+        builder = PackageBuilder(str(PROJECT_ROOT / "policies"), str(PROJECT_ROOT / "config" / "frameworks"))
+        seen = []
+        runner = BulkRunner(builder, workers=workers, timeout=120)
+        results = runner.run(jobs, on_result=lambda result, progress: seen.append(progress.completed))
+
+        assert [r.client_id for r in results] == ["c0", "c1", "c2"]
+        assert all(r.status == "success" and r.formats == ["html"] for r in results)
+        assert all((tmp_path / f"client_{i}.html").exists() for i in range(3))
+        assert seen == [1, 2, 3]
+
+        write_results(str(tmp_path / "results.json"), results, runner.progress)
+        report = json.loads((tmp_path / "results.json").read_text())
+        assert report["summary"]["succeeded"] == 3
+        assert len(report["clients"]) == 3
+
+    def test_serial_timeout_covers_rendering(self, jobs):
+        """Test the per-client timeout fires during rendering, through broad exception handlers"""
+        import signal
+        import time
+        from generation.bulk_runner import BulkRunner
+        from generation.package_builder import PackageBuilder
+
+        if not hasattr(signal, 'SIGALRM'):
+            pytest.skip("Per-client timeouts need SIGALRM")
+
+        class SlowBuilder(PackageBuilder):
+            def _stall(self):
+                try:
+                    time.sleep(5)
+                except Exception:
+                    pass
+
+            def build_packages(self, configs, **kwargs):
+                self._stall()
+                return super().build_packages(configs, **kwargs)
+
+            def stream_package(self, config, **kwargs):
+                self._stall()
+                return super().stream_package(config, **kwargs)
+
+        builder = SlowBuilder(str(PROJECT_ROOT / "policies"), str(PROJECT_ROOT / "config" / "frameworks"))
+        started = time.monotonic()
+        results = BulkRunner(builder, timeout=0.2).run(jobs[:1])
+
+        assert results[0].status == "timeout"
+        assert time.monotonic() - started < 4
+
+    def test_backstop_ignores_time_spent_queued(self):
+        """Test jobs are timed from when a worker starts them, not when they were queued"""
+        import time
+        from generation.bulk_runner import BulkRunner, STARTED_POLL
+
+        runner = BulkRunner(builder=None, workers=2, timeout=10)
+        in_flight = {"running": (0, None), "queued": (1, None)}
+
+        # The running job is overdue; the queued one has no deadline yet
+        assert runner._wait_timeout(in_flight, {0: time.time() - 100}) == 0.0
+        assert 0 < runner._wait_timeout(in_flight, {0: time.time()}) <= STARTED_POLL
+        assert runner._wait_timeout({"queued": (1, None)}, {}) <= STARTED_POLL
+
+
+    def test_manifest_resumes_unfinished_clients(self, tmp_path):
+        from types import SimpleNamespace
+        from generation.bulk_runner import BulkResult
+        from generation.run_manifest import RunManifest
+
+        manifest = RunManifest(str(tmp_path / "runs.db"))
+        clients = [SimpleNamespace(id=f"c{i}", name=f"Client {i}") for i in range(3)]
+        run = manifest.create_run(clients + clients[:1], ["soc2"], ["docx"], str(tmp_path))
+        assert [c.client_id for c in run.clients] == ["c0", "c1", "c2"]
+
+        manifest.record_result(run.id, BulkResult("c0", "Client 0", "success",
+                                                  files=["a.docx"], hashes={"a.docx": "abc"}))
+        manifest.record_result(run.id, BulkResult("c1", "Client 1", "timeout", error="slow"))
+
+        run = manifest.finish_run(run.id)
+        assert run.status == "incomplete"
+        assert [c.client_id for c in run.remaining()] == ["c1", "c2"]
+        assert run.clients[0].hashes == {"a.docx": "abc"}
+
+        manifest.record_result(run.id, BulkResult("c1", "Client 1", "success"))
+        manifest.record_result(run.id, BulkResult("c2", "Client 2", "success"))
+        assert manifest.finish_run(run.id).status == "complete"
+
+    def test_unchanged_clients_come_from_cache(self, jobs, tmp_path):
+        from generation.bulk_runner import BulkRunner
+        from generation.output_cache import OutputCache
+        from generation.package_builder import PackageBuilder
+
+        builder = PackageBuilder(str(PROJECT_ROOT / "policies"), str(PROJECT_ROOT / "config" / "frameworks"))
+        cache = OutputCache(str(tmp_path / "cache"), str(tmp_path / "cache.db"))
+
+        first = BulkRunner(builder, cache=cache).run(jobs)
+        (tmp_path / "client_0.html").unlink()
+        second = BulkRunner(builder, cache=cache).run(jobs)
+
+        assert not any(r.cached for r in first)
+        assert all(r.cached and r.status == "success" for r in second)
+        assert [r.hashes for r in second] == [r.hashes for r in first]
+        assert second[0].total_policies == first[0].total_policies
+        assert (tmp_path / "client_0.html").exists()
+        assert cache.stats()["files"] == 3
+
+    def test_cached_export_is_linked_into_output_dir(self, jobs, tmp_path):
+        from generation.bulk_runner import BulkRunner
+        from generation.output_cache import OutputCache
+        from generation.package_builder import PackageBuilder
+
+        builder = PackageBuilder(str(PROJECT_ROOT / "policies"), str(PROJECT_ROOT / "config" / "frameworks"))
+        # The CLI keeps the cache in the run's output directory
+        cache = OutputCache(str(tmp_path), str(tmp_path / "cache.db"))
+        BulkRunner(builder, cache=cache).run(jobs[:1])
+
+        exported = tmp_path / "client_0.html"
+        cached = [p for p in tmp_path.glob("*.html") if p != exported]
+        assert len(cached) == 1
+        assert exported.stat().st_ino == cached[0].stat().st_ino
+        assert not list(tmp_path.glob(".*.part"))
+
+
+class TestOutputCache:
+    """Tests for the content-addressed export cache"""
+
+    def test_keys_depend_on_package_and_exporter(self, tmp_path):
+        from generation.output_cache import OutputCache
+        from generation.package_builder import PackageBuilder, ClientConfig
+        from generation.html_exporter import HtmlExporter
+
+        builder = PackageBuilder(str(PROJECT_ROOT / "policies"))
+        cache = OutputCache(str(tmp_path), str(tmp_path / "cache.db"))
+        config = ClientConfig(name="Acme", variables={"CSO_TITLE": "CISO"}, frameworks=["soc2"])
+
+        key = builder.package_key(config)
+        assert key == builder.package_key(ClientConfig(name="Acme", variables={"CSO_TITLE": "CISO"},
+                                                       frameworks=["soc2"]))
+        assert key != builder.package_key(ClientConfig(name="Acme", variables={"CSO_TITLE": "CTO"},
+                                                       frameworks=["soc2"]))
+
+        exporter = HtmlExporter()
+        assert cache.key(key, "html", exporter) != cache.key(key, "pdf", exporter)
+
+        class NextExporter(HtmlExporter):
+            EXPORTER_VERSION = "2"
+
+        assert cache.key(key, "html", exporter) != cache.key(key, "html", NextExporter())
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        from generation.output_cache import OutputCache
+
+        cache = OutputCache(str(tmp_path / "out"), str(tmp_path / "cache.db"), max_bytes=250)
+        for name in ("a", "b", "c"):
+            source = tmp_path / f"{name}.html"
+            source.write_text(name * 100)
+            cache.store(name * 64, name, "html", str(source), info={"total_policies": 1}, move=True)
+
+        # Only two 100-byte files fit; "a" was used least recently
+        assert cache.get("a" * 64) is None
+        assert cache.get("b" * 64).info == {"total_policies": 1}
+
+        source = tmp_path / "d.html"
+        source.write_text("d" * 100)
+        cache.store("d" * 64, "d", "html", str(source))
+
+        assert cache.get("c" * 64) is None
+        assert cache.get("b" * 64) is not None
+        assert sorted(p.name.split(".")[0] for p in (tmp_path / "out").iterdir()) == ["b", "d"]
+
+
+    def test_links_are_evicted_with_their_file(self, tmp_path):
+        from generation.output_cache import OutputCache
+
+        cache = OutputCache(str(tmp_path / "out"), str(tmp_path / "cache.db"), max_bytes=150)
+        source = tmp_path / "a.html"
+        source.write_text("a" * 100)
+        entry = cache.store("a" * 64, "a", "html", str(source), move=True)
+        linked = cache.link(entry, str(tmp_path / "out" / "client_a.html"))
+        assert linked.read_text() == "a" * 100
+
+        source = tmp_path / "b.html"
+        source.write_text("b" * 100)
+        cache.store("b" * 64, "b", "html", str(source), move=True)
+
+        assert not entry.path.exists()
+        assert not linked.exists()
+
+    def test_partial_paths_are_unique(self, tmp_path):
+        from generation.output_cache import OutputCache
+
+        cache = OutputCache(str(tmp_path / "out"), str(tmp_path / "cache.db"))
+        first, second = cache.partial_path("html"), cache.partial_path("html")
+
+        assert first != second
+        assert first.parent == second.parent == cache.directory
+        assert first.name.startswith(".") and first.name.endswith(".html.part")
+
+        first.write_text("exported")
+        entry = cache.store("e" * 64, "e", "html", str(first), move=True)
+        assert not first.exists() and entry.path.read_text() == "exported"
+
+
+class TestMarkdownIR:
+    """Tests for the Markdown IR shared by the exporters"""
+
+    CONTENT = "## Scope\n\nApplies to **all** staff & *contractors*.\n- Use `mfa`\n- Report incidents\n1. First\n2. Second\n"
+
+    def test_parse_blocks(self):
+        from generation.markdown_ir import parse_markdown
+
+        blocks = parse_markdown(self.CONTENT)
+        assert [b.kind for b in blocks] == ["heading", "paragraph", "list", "list"]
+        assert (blocks[0].level, blocks[0].text) == (2, "Scope")
+        assert [(s.text, s.bold, s.italic) for s in blocks[1].spans] == [
+            ("Applies to ", False, False), ("all", True, False), (" staff & ", False, False),
+            ("contractors", False, True), (".", False, False)]
+        assert not blocks[2].ordered and blocks[2].items[0][1].code
+        assert blocks[3].ordered and len(blocks[3].items) == 2
+
+    def test_lines_that_only_look_like_markup(self):
+        from generation.markdown_ir import parse_markdown
+
+        blocks = parse_markdown("#hashtag\n-5 degrees\n2024 budget\n*not closed\n####### seven")
+        assert [b.kind for b in blocks] == ["paragraph"] * 5
+        assert blocks[3].text == "*not closed"
+
+    def test_exporters_share_parsed_blocks(self, tmp_path):
+        from generation.markdown_ir import blocks_to_html
+        from generation.package_builder import PolicyDocument
+
+        policy = PolicyDocument(id="p", title="P", content=self.CONTENT, category="c",
+                                frameworks={}, variables_used=[], incomplete_sections=[])
+        assert policy.blocks is policy.blocks
+
+        html = blocks_to_html(policy.blocks)
+        assert "<h2>Scope</h2>" in html
+        assert "<p>Applies to <strong>all</strong> staff &amp; <em>contractors</em>.</p>" in html
+        assert "<ul>\n<li>Use <code>mfa</code></li>\n<li>Report incidents</li>\n</ul>" in html
+        assert "<ol>\n<li>First</li>" in html
+
+
+class TestLibraryReload:
+    """Tests for change-aware reloading of the policy cache"""
+
+    POLICY = "---\nid: {id}\ntitle: {title}\ncategory: testing\n---\n\n# {title}\n"
+
+    def _write(self, path, pid, title):
+        import os
+        path.write_text(self.POLICY.format(id=pid, title=title), encoding="utf-8")
+        # Guarantee a visible mtime change on coarse-grained filesystems
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    def test_reloads_only_changed_files(self, tmp_path):
+        from core.policy_library import PolicyLibrary
+        from generation.package_builder import PackageBuilder
+
+        policies_dir = tmp_path / "policies" / "testing"
+        policies_dir.mkdir(parents=True)
+        for pid in ("alpha-policy", "beta-policy", "gamma-policy"):
+            self._write(policies_dir / f"{pid}.md", pid, pid.title())
+
+        library = PolicyLibrary(str(tmp_path / "policies"), reload_interval=None)
+        builder = PackageBuilder(library=library)
+        before = builder.get_all_policies()
+        version = builder.library_version
+
+        self._write(policies_dir / "beta-policy.md", "beta-policy", "Beta Revised")
+        self._write(policies_dir / "delta-policy.md", "delta-policy", "Delta")
+        (policies_dir / "gamma-policy.md").unlink()
+
+        delta = builder.check_for_updates()
+        assert delta.added == ["testing/delta-policy.md"]
+        assert delta.modified == ["testing/beta-policy.md"]
+        assert delta.removed == ["testing/gamma-policy.md"]
+        assert builder.library_version == version + 1
+
+        after = builder.get_all_policies()
+        assert sorted(after) == ["alpha-policy", "beta-policy", "delta-policy"]
+        assert after["alpha-policy"] is before["alpha-policy"]
+        assert after["beta-policy"]["title"] == "Beta Revised"
+
+        assert not builder.check_for_updates()
+        assert builder.library_version == version + 1
+
+    def test_bodies_load_lazily(self, tmp_path):
+        from generation.package_builder import PackageBuilder
+
+        policies_dir = tmp_path / "policies" / "testing"
+        policies_dir.mkdir(parents=True)
+        self._write(policies_dir / "alpha-policy.md", "alpha-policy", "Alpha")
+
+        builder = PackageBuilder(str(tmp_path / "policies"))
+        policy = builder.get_all_policies()["alpha-policy"]
+        assert policy["title"] == "Alpha"
+        assert not policy.body_loaded
+
+        assert policy["body"] == "# Alpha"
+        assert policy.body_loaded
+        assert builder.release_bodies() == 1
+        assert not policy.body_loaded
+        assert policy.get("body") == "# Alpha"
+
+
 class TestDocxExporter:
     """Tests for DOCX export"""
 
@@ -148,6 +656,33 @@ class TestDocxExporter:
         assert output_path.stat().st_size > 1000  # Should be non-trivial size
 
 
+    def test_docx_export_stream(self, package_result, tmp_path):
+        """Test that a streamed export has the same paragraphs as a built one"""
+        try:
+            from generation.docx_exporter import DocxExporter
+            from docx import Document
+        except ImportError:
+            pytest.skip("python-docx not installed")
+        from generation.package_builder import PackageBuilder, ClientConfig
+
+        builder = PackageBuilder(str(PROJECT_ROOT / "policies"))
+        stream = builder.stream_package(ClientConfig(
+            name="Export Test",
+            variables={"ORGANIZATION_NAME": "Export Test Inc"},
+            frameworks=["soc2"]
+        ))
+
+        exporter = DocxExporter()
+        exporter.export_package(package_result, str(tmp_path / "built.docx"))
+        exporter.export_package(stream, str(tmp_path / "streamed.docx"))
+
+        def paragraphs(name):
+            return [p.text for p in Document(str(tmp_path / name)).paragraphs
+                    if not p.text.startswith("Generated")]
+
+        assert paragraphs("streamed.docx") == paragraphs("built.docx")
+
+
 class TestPdfExporter:
     """Tests for PDF export"""
 
@@ -13,6 +13,20 @@ from unittest.mock import Mock, patch, MagicMock
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 
+def isolated_config(tmp_path, **overrides):
+    """App config that keeps the web app's runtime databases under tmp_path"""
+    config = {
+        'TESTING': True,
+        'JOBS_DB': str(tmp_path / "jobs.db"),
+        'ADMISSION_DB': str(tmp_path / "admission.db"),
+        'RATE_LIMIT_DB': str(tmp_path / "rate_limits.db"),
+        'OUTPUT_DIR': str(tmp_path / "output"),
+        'OUTPUT_CACHE_DB': str(tmp_path / "output_cache.db"),
+    }
+    config.update(overrides)
+    return config
+
+
 class TestRateLimiter:
     """Test the rate limiter module"""
 
@@ -95,6 +109,91 @@ class TestRateLimiter:
         assert usage['minute_requests'] == 5
         assert usage['client_id'] == "usage-client"
 
+    def test_window_refills_over_time(self):
+        """Test allowance is restored gradually, in constant space per client"""
+        from web.rate_limiter import RateLimiter, RateLimitConfig
+
+        config = RateLimitConfig(requests_per_minute=6, requests_per_hour=1000, burst_size=1)
+        limiter = RateLimiter(config)
+
+        with patch('web.rate_limiter.time.time', return_value=1000.0):
+            assert all(limiter.check_rate_limit("refill")[0] for _ in range(6))
+        # One request's worth of allowance (10s) later, one more fits
+        with patch('web.rate_limiter.time.time', return_value=1010.0):
+            allowed, headers = limiter.check_rate_limit("refill")
+            assert limiter.get_usage("refill")['minute_requests'] == 6
+        assert allowed
+        assert headers['X-RateLimit-Remaining'] == '0'
+
+        entry = limiter.backend._entries["refill"]
+        assert not hasattr(entry, '__dict__')
+
+    def test_concurrent_checks_share_one_limit(self):
+        """Test threads checking the same client never exceed its limit"""
+        import threading
+        from web.rate_limiter import RateLimiter, RateLimitConfig
+
+        limiter = RateLimiter(RateLimitConfig(requests_per_minute=50, burst_size=1))
+        allowed = []
+
+        def hammer():
+            allowed.extend(limiter.check_rate_limit("shared")[0] for _ in range(40))
+
+        threads = [threading.Thread(target=hammer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(allowed) == 50
+
+    def test_idle_entries_are_dropped(self):
+        """Test cleanup forgets clients whose allowance is fully restored"""
+        from web.rate_limiter import RateLimiter, RateLimitConfig
+
+        limiter = RateLimiter(RateLimitConfig())
+        with patch('web.rate_limiter.time.time', return_value=1000.0):
+            limiter.check_rate_limit("idle")
+        with patch('web.rate_limiter.time.time', return_value=1000.0 + 7200):
+            limiter._last_cleanup = 0
+            limiter.check_rate_limit("active")
+
+        assert "idle" not in limiter.backend._entries
+        assert "active" in limiter.backend._entries
+
+    def test_sqlite_backend_shares_limit_across_processes(self, tmp_path):
+        """Test worker processes sharing a SQLite backend enforce one limit together"""
+        import multiprocessing
+        from web.rate_limiter import RateLimiter, RateLimitConfig
+
+        config = RateLimitConfig(requests_per_minute=30, burst_size=1, backend='sqlite',
+                                 state_path=str(tmp_path / "rate_limits.db"))
+        RateLimiter(config)  # Create the schema before the workers start
+
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+
+        def worker():
+            limiter = RateLimiter(config)
+            results.put(sum(limiter.check_rate_limit("shared")[0] for _ in range(20)))
+
+        processes = [context.Process(target=worker) for _ in range(4)]
+        for process in processes:
+            process.start()
+        allowed = sum(results.get(timeout=30) for _ in processes)
+        for process in processes:
+            process.join()
+
+        assert allowed == 30
+        assert RateLimiter(config).get_usage("shared")['minute_requests'] == 30
+
+    def test_unknown_backend(self):
+        """Test an unknown backend name is rejected"""
+        from web.rate_limiter import RateLimiter, RateLimitConfig
+
+        with pytest.raises(ValueError):
+            RateLimiter(RateLimitConfig(backend='redis'))
+
     def test_exempt_paths(self):
         """Test exempt paths configuration"""
         from web.rate_limiter import RateLimitConfig
@@ -128,23 +227,23 @@ class TestRateLimiter:
 class TestWebAppCreation:
     """Test Flask app creation"""
 
-    def test_create_app_without_flask(self):
+    def test_create_app_without_flask(self, tmp_path):
         """Test app creation fails gracefully without Flask"""
         # This test just ensures the module can be imported
         try:
             from web.app import create_app
             # If Flask is available, app should be creatable
-            app = create_app()
+            app = create_app(isolated_config(tmp_path))
             assert app is not None
         except ImportError:
             # If Flask not available, that's expected
             pass
 
-    def test_app_has_routes(self):
+    def test_app_has_routes(self, tmp_path):
         """Test app has expected routes"""
         try:
             from web.app import create_app
-            app = create_app()
+            app = create_app(isolated_config(tmp_path))
 
             # Check routes exist
             rules = [rule.rule for rule in app.url_map.iter_rules()]
@@ -162,11 +261,11 @@ class TestAPIEndpoints:
     """Test API endpoint responses"""
 
     @pytest.fixture
-    def client(self):
+    def client(self, tmp_path):
         """Create test client"""
         try:
             from web.app import create_app
-            app = create_app({'TESTING': True})
+            app = create_app(isolated_config(tmp_path))
             return app.test_client()
         except ImportError:
             pytest.skip("Flask not installed")
@@ -261,16 +360,147 @@ class TestAPIEndpoints:
         data = json.loads(response.data)
         assert isinstance(data, list)
 
+    def test_async_generate_job(self, client, tmp_path):
+        """Test async generation returns a job that can be polled to completion"""
+        import time
+        client.application.config['OUTPUT_DIR'] = str(tmp_path)
+
+        response = client.post('/api/generate', json={
+            'client_name': 'Async Test', 'frameworks': ['soc2'], 'format': 'html', 'async': True
+        })
+        assert response.status_code == 202
+        job = json.loads(response.data)
+        assert job['status'] == 'queued'
+        assert response.headers['Location'] == f"/api/jobs/{job['id']}"
+
+        for _ in range(300):
+            job = json.loads(client.get(f"/api/jobs/{job['id']}").data)
+            if job['status'] in ('complete', 'failed'):
+                break
+            time.sleep(0.1)
+
+        assert job['status'] == 'complete', job['error']
+        assert job['result']['client_name'] == 'Async Test'
+        assert job['result']['files'][0]['format'] == 'html'
+
+    def test_job_events_stream(self, client, tmp_path):
+        """Test job progress is streamed as server-sent events"""
+        client.application.config['OUTPUT_DIR'] = str(tmp_path)
+
+        response = client.post('/api/generate', json={
+            'client_name': 'SSE Test', 'frameworks': ['soc2'], 'format': 'html', 'async': True
+        })
+        job_id = json.loads(response.data)['id']
+
+        client.application.config['SSE_STREAM_SECONDS'] = 60
+        response = client.get(f'/api/jobs/{job_id}/events')
+        assert response.mimetype == 'text/event-stream'
+
+        events = []
+        for message in response.get_data(as_text=True).split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in message.splitlines() if ': ' in line)
+            if 'event' in fields:
+                events.append((fields['event'], json.loads(fields['data'])))
+
+        assert events[-1][0] == 'complete'
+        assert events[-1][1]['result']['client_name'] == 'SSE Test'
+        progress = [data for name, data in events if name == 'progress']
+        assert progress and progress[-1]['stage'] == 'saved'
+
+    def test_job_not_found(self, client):
+        """Test unknown job returns 404"""
+        response = client.get('/api/jobs/nonexistent')
+        assert response.status_code == 404
+
+    def test_busy_heavy_route_returns_503(self, client, tmp_path):
+        """Test a heavy request is turned away with Retry-After when the queue is full"""
+        import os
+        import sqlite3
+        import time
+        from web.app import create_app
+        from web.jobs import process_owner
+
+        db_path = tmp_path / "admission.db"
+        client = create_app(isolated_config(tmp_path, ADMISSION_DB=str(db_path))).test_client()
+
+        conn = sqlite3.connect(db_path)
+        conn.executemany(
+            'INSERT INTO admission (route, cost, state, pid, owner, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+            [('/api/generate', 10, 'waiting', os.getpid(), process_owner(), time.time())] * 8)
+        conn.commit()
+        conn.close()
+
+        response = client.get('/api/frameworks/soc2/coverage')
+        assert response.status_code == 503
+        assert int(response.headers['Retry-After']) >= 1
+
+        # Cheap requests are not queued
+        assert client.get('/api/frameworks').status_code == 200
+
+    def test_generate_rejects_non_object_body(self, client):
+        """Test a JSON array body gets the validation error, not a server error"""
+        response = client.post('/api/generate', data='[1, 2]', content_type='application/json')
+        assert response.status_code == 400
+
+    def test_failed_export_leaves_no_partial_file(self, client, tmp_path):
+        """Test an exporter error removes its half-written file from the output cache"""
+        class FailingExporter:
+            def export_package(self, result, output_path, progress=None):
+                with open(output_path, 'w') as f:
+                    f.write('<html>')
+                raise RuntimeError('disk full')
+
+        client.application.config['OUTPUT_DIR'] = str(tmp_path / "output")
+        with patch('generation.bulk_runner.load_exporter', return_value=FailingExporter()):
+            with pytest.raises(RuntimeError):
+                client.post('/api/generate', json={
+                    'client_name': 'Failing Export', 'frameworks': ['soc2'], 'format': 'html'
+                })
+        assert not list((tmp_path / "output").glob('*.part'))
+
+    def test_concurrent_identical_exports_use_separate_files(self, client, tmp_path):
+        """Test two identical requests exporting at once do not share a partial file"""
+        import threading
+
+        barrier = threading.Barrier(2, timeout=30)
+        written = []
+
+        class SlowExporter:
+            def export_package(self, result, output_path, progress=None):
+                written.append(output_path)
+                barrier.wait()
+                with open(output_path, 'w') as f:
+                    f.write('<html>' + output_path)
+
+        body = {'client_name': 'Twin Export', 'frameworks': ['soc2'], 'format': 'html'}
+        statuses = []
+
+        def post():
+            statuses.append(client.application.test_client().post('/api/generate', json=body).status_code)
+
+        with patch('generation.bulk_runner.load_exporter', return_value=SlowExporter()):
+            threads = [threading.Thread(target=post) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert statuses == [200, 200]
+        assert len(set(written)) == 2
+        output = tmp_path / "output"
+        assert not list(output.glob('*.part'))
+        assert len(list(output.glob('*.html'))) == 1
+
 
 class TestPageRoutes:
     """Test page routes render correctly"""
 
     @pytest.fixture
-    def client(self):
+    def client(self, tmp_path):
         """Create test client"""
         try:
             from web.app import create_app
-            app = create_app({'TESTING': True})
+            app = create_app(isolated_config(tmp_path))
             return app.test_client()
         except ImportError:
             pytest.skip("Flask not installed")
@@ -395,3 +625,288 @@ class TestRateLimitHeaders:
         remaining2 = int(headers2['X-RateLimit-Remaining'])
 
         assert remaining2 == remaining1 - 1
+
+    def test_root_is_exempt_only_as_exact_path(self):
+        """Test '/' in exempt_paths does not exempt every path"""
+        from web.rate_limiter import RateLimiter, RateLimitConfig
+
+        limiter = RateLimiter(RateLimitConfig(exempt_paths=['/', '/static', '/api/health']))
+
+        assert limiter._is_exempt('/')
+        assert limiter._is_exempt('/static/app.css')
+        assert limiter._is_exempt('/api/health')
+        assert not limiter._is_exempt('/api/policies')
+        assert not limiter._is_exempt('/staticfiles')
+
+    def test_limit_is_shared_between_apps(self, tmp_path):
+        """Test API responses carry limits kept in one shared SQLite backend"""
+        from web.app import create_app
+
+        config = isolated_config(tmp_path, RATE_LIMIT_BACKEND='sqlite')
+        first = create_app(config).test_client()
+        second = create_app(config).test_client()
+
+        # Freeze the clock so no allowance is restored between the requests
+        with patch('web.rate_limiter.time.time', return_value=1000.0):
+            response = first.get('/api/frameworks')
+            assert response.headers['X-RateLimit-Limit'] == '100'
+            assert response.headers['X-RateLimit-Remaining'] == '99'
+            assert second.get('/api/frameworks').headers['X-RateLimit-Remaining'] == '98'
+            assert first.get('/api/frameworks').headers['X-RateLimit-Remaining'] == '97'
+
+        assert 'X-RateLimit-Limit' not in first.get('/api/health').headers
+
+    def test_app_enforces_memory_backend_limit(self, tmp_path):
+        """Test API routes go through the in-process GCRA limiter"""
+        from web.app import create_app
+        from web.rate_limiter import MemoryRateLimitBackend, get_rate_limiter
+
+        client = create_app(isolated_config(tmp_path, RATE_LIMIT_BACKEND='memory')).test_client()
+        limiter = get_rate_limiter()
+        assert isinstance(limiter.backend, MemoryRateLimitBackend)
+        limiter.config.requests_per_minute = 3
+        limiter.config.burst_size = 3
+
+        remaining = [client.get('/api/frameworks').headers['X-RateLimit-Remaining']
+                     for _ in range(3)]
+        assert remaining == ['2', '1', '0']
+
+        response = client.get('/api/frameworks')
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) > 0
+
+    def test_expensive_route_uses_its_cost(self, tmp_path):
+        """Test a weighted route takes its cost out of the client's limit"""
+        from web.app import create_app
+
+        client = create_app(isolated_config(tmp_path)).test_client()
+
+        # Freeze the clock so no allowance is restored between the requests
+        with patch('web.rate_limiter.time.time', return_value=1000.0):
+            assert client.get('/api/frameworks').headers['X-RateLimit-Remaining'] == '99'
+            response = client.get('/api/frameworks/soc2/coverage')
+        assert response.status_code == 200
+        assert response.headers['X-RateLimit-Remaining'] == '95'
+
+
+class TestJobs:
+    """Test the background job store and runner"""
+
+    def test_job_lifecycle(self, tmp_path):
+        """Test jobs move from queued to complete or failed"""
+        from web.jobs import JobStore
+
+        store = JobStore(str(tmp_path / "jobs.db"))
+        job = store.create_job("generate", {"client_name": "Acme"})
+        assert store.get_job(job.id).status == "queued"
+
+        store.start_job(job.id)
+        assert store.get_job(job.id).status == "running"
+
+        store.finish_job(job.id, result={"files": []})
+        finished = store.get_job(job.id)
+        assert finished.status == "complete"
+        assert finished.result == {"files": []}
+        assert finished.finished_at
+
+        failed = store.create_job("generate", {})
+        store.finish_job(failed.id, error="boom")
+        assert store.get_job(failed.id).status == "failed"
+        assert [j.id for j in store.list_jobs(status="failed")] == [failed.id]
+
+    def test_runner_records_result_and_error(self, tmp_path):
+        """Test the runner stores a function's result or exception"""
+        from web.jobs import JobRunner, JobStore
+
+        runner = JobRunner(JobStore(str(tmp_path / "jobs.db")), workers=1)
+
+        def fail(params, progress):
+            raise ValueError("bad request")
+
+        ok = runner.submit("echo", {"value": 3}, lambda params, progress: {"double": params["value"] * 2})
+        bad = runner.submit("echo", {}, fail)
+        runner.shutdown()
+
+        assert runner.store.get_job(ok.id).result == {"double": 6}
+        assert runner.store.get_job(bad.id).error == "bad request"
+
+    def test_progress_and_watch(self, tmp_path):
+        """Test stored progress is replayed by watch() until the job finishes"""
+        from web.jobs import JobStore
+
+        store = JobStore(str(tmp_path / "jobs.db"))
+        job = store.create_job("generate", {})
+        assert store.get_progress(job.id) == (0, None)
+
+        store.record_progress(job.id, {"stage": "render", "current": 1, "total": 2})
+        store.record_progress(job.id, {"stage": "render", "current": 2, "total": 2})
+        assert store.get_progress(job.id) == (2, {"stage": "render", "current": 2, "total": 2})
+
+        updates = list(store.watch(job.id, interval=0, timeout=0))
+        assert updates == [("progress", 2, {"stage": "render", "current": 2, "total": 2}),
+                           ("timeout", 2, None)]
+
+        store.finish_job(job.id, result={"files": []})
+        updates = list(store.watch(job.id, after=2))
+        assert [u[0] for u in updates] == ["complete"]
+        assert updates[0][2]["result"] == {"files": []}
+
+    def test_orphaned_jobs_fail(self, tmp_path):
+        """Test jobs left by an exited process are marked failed"""
+        import sqlite3
+        from web.jobs import JobRunner, JobStore
+
+        store = JobStore(str(tmp_path / "jobs.db"))
+        job = store.create_job("generate", {})
+        conn = sqlite3.connect(store.db_path)
+        conn.execute('UPDATE jobs SET pid = -1, owner = ? WHERE id = ?', ('-1', job.id))
+        conn.commit()
+        conn.close()
+
+        JobRunner(store).shutdown()
+        assert store.get_job(job.id).status == "failed"
+
+    def test_reused_pid_does_not_keep_job_alive(self, tmp_path):
+        """Test a job from a previous process incarnation fails even if its PID is live again"""
+        import os
+        import sqlite3
+        from web.jobs import JobRunner, JobStore, process_start_time
+
+        if process_start_time(os.getpid()) is None:
+            pytest.skip("Process start times need /proc")
+
+        store = JobStore(str(tmp_path / "jobs.db"))
+        stale = store.create_job("generate", {})
+        live = store.create_job("generate", {})
+        conn = sqlite3.connect(store.db_path)
+        # Same PID as this process, but an earlier start time
+        conn.execute('UPDATE jobs SET owner = ? WHERE id = ?', (f"{os.getpid()}:1", stale.id))
+        conn.commit()
+        conn.close()
+
+        JobRunner(store).shutdown()
+        assert store.get_job(stale.id).status == "failed"
+        assert store.get_job(live.id).status == "queued"
+
+    def test_job_of_dead_worker_fails_while_runner_lives(self, tmp_path):
+        """Test another worker's orphaned job fails without a runner restarting"""
+        import multiprocessing
+        from web.jobs import JobRunner, JobStore
+
+        store = JobStore(str(tmp_path / "jobs.db"))
+        runner = JobRunner(store)
+        try:
+            context = multiprocessing.get_context('fork')
+            created = context.Queue()
+
+            def worker():
+                created.put(JobStore(store.db_path).create_job("generate", {}).id)
+
+            process = context.Process(target=worker)
+            process.start()
+            job_id = created.get(timeout=30)
+            process.join()
+
+            job = store.get_job(job_id)
+            assert job.status == "failed"
+            assert "exited" in job.error
+            assert [j.status for j in store.list_jobs()] == ["failed"]
+        finally:
+            runner.shutdown()
+
+
+class TestAdmissionControl:
+    """Test the weighted concurrency limiter"""
+
+    def test_route_costs(self):
+        """Test cost weights are matched by path pattern"""
+        from web.rate_limiter import RateLimitConfig
+
+        config = RateLimitConfig()
+        assert config.cost_for('/api/generate') == 10
+        assert config.cost_for('/api/frameworks/soc2/coverage') == 4
+        assert config.cost_for('/api/frameworks/soc2') == 1
+
+    def test_cost_counts_against_rate_limit(self):
+        """Test a weighted request uses up several requests of the limit"""
+        from web.rate_limiter import RateLimiter, RateLimitConfig
+
+        limiter = RateLimiter(RateLimitConfig(requests_per_minute=30, burst_size=5))
+        allowed, headers = limiter.check_rate_limit("weighted", cost=10)
+        assert allowed
+        assert headers['X-RateLimit-Remaining'] == '20'
+
+    def test_capacity_and_queue(self, tmp_path):
+        """Test requests beyond capacity wait, time out, or are rejected when the queue is full"""
+        import threading
+        import time
+        from web.admission import AdmissionController, AdmissionRejected
+
+        admission = AdmissionController(str(tmp_path / "admission.db"), capacity=20, max_queue=1)
+        first = admission.acquire("/api/generate", 10)
+        second = admission.acquire("/api/generate", 10)
+        assert admission.stats()['in_use'] == 20
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            admission.acquire("/api/generate", 10, timeout=0.1)
+        assert rejected.value.retry_after >= 1
+        assert admission.stats()['queued'] == 0
+
+        admitted = []
+        waiter = threading.Thread(
+            target=lambda: admitted.append(admission.acquire("/api/generate", 10, timeout=5)))
+        waiter.start()
+        for _ in range(100):
+            if admission.stats()['queued']:
+                break
+            time.sleep(0.01)
+
+        # Queue of one is full
+        with pytest.raises(AdmissionRejected):
+            admission.acquire("/api/audit/export", 4)
+
+        admission.release(first)
+        waiter.join()
+        assert admitted and admission.stats() == {
+            'capacity': 20, 'in_use': 20, 'queued': 0, 'max_queue': 1}
+
+        admission.release(second)
+        admission.release(admitted[0])
+        assert admission.stats()['in_use'] == 0
+
+    def test_slots_of_exited_processes_are_reclaimed(self, tmp_path):
+        """Test capacity held by a dead process is freed"""
+        import sqlite3
+        from web.admission import AdmissionController
+
+        admission = AdmissionController(str(tmp_path / "admission.db"), capacity=10)
+        conn = sqlite3.connect(admission.db_path)
+        conn.execute('INSERT INTO admission (route, cost, state, pid, created_at) '
+                     'VALUES (?, 10, ?, -1, 0)', ('/api/generate', 'running'))
+        conn.commit()
+        conn.close()
+
+        ticket = admission.acquire("/api/generate", 10, timeout=0)
+        assert admission.stats()['in_use'] == 10
+        admission.release(ticket)
+
+    def test_slots_of_previous_incarnation_are_reclaimed_at_startup(self, tmp_path):
+        """Test a slot left before a restart is freed even though a new process reuses its PID"""
+        import os
+        import sqlite3
+        from web.admission import AdmissionController
+        from web.jobs import process_start_time
+
+        if process_start_time(os.getpid()) is None:
+            pytest.skip("Process start times need /proc")
+
+        admission = AdmissionController(str(tmp_path / "admission.db"), capacity=20)
+        conn = sqlite3.connect(admission.db_path)
+        conn.execute('INSERT INTO admission (route, cost, state, pid, owner, created_at) '
+                     'VALUES (?, 20, ?, ?, ?, 0)',
+                     ('/api/generate', 'running', os.getpid(), f"{os.getpid()}:1"))
+        conn.commit()
+        conn.close()
+
+        admission.reclaim()
+        assert admission.stats()['in_use'] == 0